@@ -0,0 +1,90 @@
+"""Running totals behind the summary labels.
+
+The Customers and Payment History summaries used to SUM over the whole
+customers table on every reload. These tables hold the totals instead and
+are kept current by triggers (created in migrations.create_summary_tables),
+so every write path, imports included, updates them in the same transaction:
+
+    summary_totals   one row: sales, total owed/paid, remaining debt
+    customer_totals  the same per customer name
+    product_totals   payments and amount paid per payments.item_name
+    daily_totals     payments and amount paid per DATE(entry_date_and_time)
+
+check() recomputes every total from the base tables and lists the
+differences; rebuild() replaces the stored totals with the recomputed ones.
+"""
+import queries
+
+TOLERANCE = 0.005  # incremental float sums may drift by a fraction of a pesewa
+
+# table -> (key column, value columns, SELECT producing the expected rows)
+AGGREGATES = {
+    "summary_totals": ("id", ["sales", "total_owed", "total_paid", "remaining_debt"],
+                       """SELECT 1, COUNT(*), IFNULL(SUM(total_owed), 0), IFNULL(SUM(total_paid), 0), IFNULL(SUM(remaining_debt), 0)
+                          FROM customers"""),
+    "customer_totals": ("name", ["sales", "total_owed", "total_paid", "remaining_debt"],
+                        """SELECT IFNULL(name, ''), COUNT(*), IFNULL(SUM(total_owed), 0), IFNULL(SUM(total_paid), 0), IFNULL(SUM(remaining_debt), 0)
+                           FROM customers GROUP BY 1"""),
+    "product_totals": ("item_name", ["payments", "amount_paid"],
+                       """SELECT IFNULL(item_name, ''), COUNT(*), IFNULL(SUM(amount_paid), 0)
+                          FROM payments GROUP BY 1"""),
+    "daily_totals": ("day", ["payments", "amount_paid"],
+                     """SELECT IFNULL(DATE(entry_date_and_time), ''), COUNT(*), IFNULL(SUM(amount_paid), 0)
+                        FROM payments GROUP BY 1"""),
+}
+
+
+def rebuild(cursor):
+    """Recompute every stored total from customers and payments."""
+    for table, (key, columns, expected) in AGGREGATES.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"INSERT INTO {table} ({key}, {', '.join(columns)}) {expected}")
+
+
+def check(conn):
+    """Compare the stored totals with freshly computed ones.
+
+    Returns a list of readable differences; an empty list means the totals
+    are consistent.
+    """
+    problems = []
+    for table, (key, columns, expected) in AGGREGATES.items():
+        stored = {row[0]: row[1:] for row in conn.execute(f"SELECT {key}, {', '.join(columns)} FROM {table}")}
+        computed = {row[0]: row[1:] for row in conn.execute(expected)}
+        for name in sorted(set(stored) | set(computed), key=str):
+            have = stored.get(name, (0,) * len(columns))
+            want = computed.get(name, (0,) * len(columns))
+            for column, a, b in zip(columns, have, want):
+                if abs((a or 0) - (b or 0)) > TOLERANCE:
+                    problems.append(f"{table} [{name}] {column}: stored {a}, actual {b}")
+    return problems
+
+
+def outstanding(conn):
+    """Remaining debt over all sales."""
+    row = conn.execute("SELECT remaining_debt FROM summary_totals WHERE id = 1").fetchone()
+    return row[0] if row and row[0] else 0
+
+
+def customer_summary(conn, customer=""):
+    """(total paid, remaining debt) of all sales, or of the sales queries.customer_search(customer, "") lists.
+
+    The names are picked by the same search index condition as that list,
+    so the totals always cover the rows shown.
+    """
+    customer = queries.customer_name(customer)
+    if not customer:
+        row = conn.execute("SELECT total_paid, remaining_debt FROM summary_totals WHERE id = 1").fetchone()
+    else:
+        condition, params = queries.text_search("customers_fts", ["name"], customer)
+        row = conn.execute(f"""SELECT SUM(total_paid), SUM(remaining_debt) FROM customer_totals
+                               WHERE name IN (SELECT IFNULL(name, '') FROM customers WHERE {condition})""", params).fetchone()
+    if not row:
+        return 0, 0
+    return row[0] or 0, row[1] or 0
+
+
+def paid_between(conn, start_date, end_date):
+    """Amount paid on days start_date..end_date (yyyy-MM-dd, inclusive)."""
+    row = conn.execute("SELECT SUM(amount_paid) FROM daily_totals WHERE day BETWEEN ? AND ?", (start_date, end_date)).fetchone()
+    return row[0] if row and row[0] else 0
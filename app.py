@@ -1,4 +1,11 @@
 import sys
+# --profile-startup times every import and window constructor up to the first paint,
+# so its hook has to be in place before anything else is imported
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    sys.argv.remove("--profile-startup")
+    import startup_profile
+    startup_profile.start()
 #import qdarktheme 
 #from PyQt5.QtWidgets import  QStyleFactory 
 from login_2 import LoginWindow   
@@ -7,6 +14,8 @@ from PyQt5.QtWidgets import QApplication
 if __name__ == "__main__":
     app = QApplication(sys.argv) 
     app.setStyle("Fusion")
+    if PROFILE_STARTUP:
+        startup_profile.watch_first_paint(app)
     login = LoginWindow()
     login.show()
     sys.exit(app.exec_()) 
\ No newline at end of file
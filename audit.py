@@ -0,0 +1,194 @@
+"""The audit trail: who did what, written in the background.
+
+Every window used to have its own copy of log_text, which opened log.txt,
+wrote one line and closed it again on the GUI thread. They all call
+record() now, which only puts the entry on a queue. The writer thread:
+
+- appends what is queued to log.txt in one write, FLUSH_INTERVAL_S after
+  the first waiting entry or as soon as FLUSH_RECORDS are waiting;
+- starts a new log.txt when it grows past MAX_BYTES or a new day begins,
+  keeping the last BACKUP_COUNT as log.<date>-<time>-<microseconds>.txt;
+- copies each entry, with its user, action, transaction ID and amount as
+  columns, into the audit_log table of the database file that was open
+  when it was made, so reversals and edits can be looked up by index
+  (Options > Audit Log).
+
+Lines in log.txt read as before: "[timestamp] text".
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+LOG_FILE = "log.txt"
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 30
+FLUSH_INTERVAL_S = 1.0
+FLUSH_RECORDS = 100
+
+# Actions recorded, and the groups the audit viewer filters by
+LOGIN, LOGIN_FAILED = "login", "login failed"
+SALE, PAYMENT = "sale", "payment"
+PAYMENT_EDIT, PAYMENT_REVERSAL, TRANSACTION_REVERSAL = "payment edit", "payment reversal", "transaction reversal"
+STOCK_ADD, STOCK_EDIT, STOCK_DELETE, STOCK_RETURN = "stock add", "stock edit", "stock delete", "stock return"
+RECEIPT_REPRINT, TOTALS_REBUILD, SMS_BULK = "receipt reprint", "totals rebuild", "sms bulk"
+ACTIONS = [LOGIN, LOGIN_FAILED, SALE, PAYMENT, PAYMENT_EDIT, PAYMENT_REVERSAL, TRANSACTION_REVERSAL,
+           STOCK_ADD, STOCK_EDIT, STOCK_DELETE, STOCK_RETURN, RECEIPT_REPRINT, TOTALS_REBUILD, SMS_BULK]
+GROUPS = {
+    "Reversals": [PAYMENT_REVERSAL, TRANSACTION_REVERSAL, STOCK_RETURN],
+    "Edits": [PAYMENT_EDIT, STOCK_EDIT, STOCK_DELETE, TOTALS_REBUILD],
+}
+
+
+def create_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            logged_at TEXT NOT NULL,
+            user TEXT,
+            action TEXT NOT NULL,
+            transaction_id TEXT,
+            amount REAL,
+            detail TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log (action, logged_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_transaction_id ON audit_log (transaction_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_logged_at ON audit_log (logged_at)")
+
+
+class AuditRecord:
+    """One entry; `database` is the file it is mirrored into (None for none)."""
+
+    def __init__(self, user, action, detail, transaction_id=None, amount=None, database=None):
+        self.logged_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.user = user
+        self.action = action
+        self.detail = detail
+        self.transaction_id = None if transaction_id is None else str(transaction_id)
+        self.amount = amount
+        self.database = database
+
+    def line(self):
+        return f"[{self.logged_at}] {self.detail}\n"
+
+    def row(self):
+        return (self.logged_at, self.user, self.action, self.transaction_id, self.amount, self.detail)
+
+
+class AuditLog:
+    """Queue of entries and the thread that writes them; started on the first record()."""
+
+    def __init__(self, path=LOG_FILE, mirror=True):
+        self.path = path
+        self.mirror = mirror  # False keeps the trail in the text file only
+        self.database = None  # file the next entries are mirrored into
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.file_day = None  # day the current log file was started
+
+    def set_database(self, database):
+        """Mirror entries made from now on into `database` (the main window's open file)."""
+        self.database = database
+
+    def record(self, user, action, detail, transaction_id=None, amount=None):
+        """Queue an entry; returns at once."""
+        self.queue.put(AuditRecord(user, action, detail, transaction_id, amount, self.database if self.mirror else None))
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name="audit-writer", daemon=True)
+                    self.thread.start()
+
+    def flush(self):
+        """Block until everything recorded so far is written (before a database file is closed or deleted)."""
+        if self.thread is not None:
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait()
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL_S
+            while len(batch) < FLUSH_RECORDS and not isinstance(batch[-1], threading.Event):
+                try:
+                    batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            records = [entry for entry in batch if isinstance(entry, AuditRecord)]
+            try:
+                self.write(records)
+            except Exception as e:
+                print(f"Audit log: could not write {len(records)} entries: {e}")
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    entry.set()
+
+    def write(self, records):
+        if not records:
+            return
+        try:
+            self.rotate_if_needed()
+            # UTF-8 whatever the Windows code page: details carry "₵" amounts and customer names
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write("".join(record.line() for record in records))
+        except (OSError, ValueError) as e:  # ValueError: text that does not encode
+            print(f"Audit log: could not write {len(records)} entries to {self.path}: {e}")
+        # Mirrored even when the text file failed, so the batch is not lost from both
+        by_database = {}
+        for record in records:
+            if record.database:
+                by_database.setdefault(record.database, []).append(record.row())
+        for database, rows in by_database.items():
+            self.mirror_rows(database, rows)
+
+    def mirror_rows(self, database, rows):
+        if not os.path.exists(database):
+            return  # deleted meanwhile (_temp__.db on exit); connecting would create an empty file
+        # A connection of its own, closed at once so the file can be moved or deleted from the GUI thread
+        conn = sqlite3.connect(database, timeout=5)
+        try:
+            with conn:
+                create_table(conn.cursor())  # files opened before the audit_log migration
+                conn.executemany("INSERT INTO audit_log (logged_at, user, action, transaction_id, amount, detail) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Audit log: could not copy {len(rows)} entries into {database}: {e}")
+        finally:
+            conn.close()
+
+    def rotate_if_needed(self):
+        """Start a new log file past MAX_BYTES or on a new day, dropping the oldest beyond BACKUP_COUNT."""
+        if not os.path.exists(self.path):
+            self.file_day = None
+            return
+        today = datetime.now().date()
+        if self.file_day is None:
+            self.file_day = datetime.fromtimestamp(os.path.getmtime(self.path)).date()
+        if os.path.getsize(self.path) < MAX_BYTES and self.file_day == today:
+            return
+        base, extension = os.path.splitext(self.path)
+        os.replace(self.path, f"{base}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{extension}")
+        self.file_day = today
+        folder = os.path.dirname(os.path.abspath(self.path))
+        prefix = os.path.basename(base) + "."
+        stamp_length = len("20250101-120000-000000")
+        backups = sorted(name for name in os.listdir(folder)
+                         if name.startswith(prefix) and name.endswith(extension)
+                         and len(name) == len(prefix) + stamp_length + len(extension))
+        for name in backups[:-BACKUP_COUNT]:
+            os.remove(os.path.join(folder, name))
+
+
+log = AuditLog()
+atexit.register(log.flush)
+
+
+def record(user, action, detail, transaction_id=None, amount=None):
+    """Add an entry to the audit trail (see AuditLog.record)."""
+    log.record(user, action, detail, transaction_id, amount)
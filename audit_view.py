@@ -0,0 +1,61 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox
+
+import audit
+import queries
+from table_models import SqlTableView
+from filter_controller import FilterController
+
+currency_symbol = "\u20B5"
+
+
+class AuditLogDialog(QDialog):
+    """Administrators' view of the audit trail copied into the open file (the audit_log table)."""
+
+    def __init__(self, database, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Audit Log - {}".format(database))
+        self.setGeometry(200, 200, 900, 500)
+        self.data = database
+
+        layout = QVBoxLayout()
+        filter_layout = QHBoxLayout()
+        self.action_filter = QComboBox()
+        self.action_filter.addItems(["All"] + list(audit.GROUPS) + audit.ACTIONS)
+        self.transaction_filter = QLineEdit()
+        self.transaction_filter.setPlaceholderText("Transaction ID")
+        self.user_filter = QLineEdit()
+        self.user_filter.setPlaceholderText("User")
+        filter_layout.addWidget(QLabel("Action:"))
+        filter_layout.addWidget(self.action_filter)
+        filter_layout.addWidget(QLabel("Transaction:"))
+        filter_layout.addWidget(self.transaction_filter)
+        filter_layout.addWidget(QLabel("User:"))
+        filter_layout.addWidget(self.user_filter)
+        layout.addLayout(filter_layout)
+
+        self.audit_table = SqlTableView(["Time", "User", "Action", "Transaction ID", f"Amount {currency_symbol}", "Details"])
+        self.audit_table.setEditTriggers(SqlTableView.NoEditTriggers)
+        self.audit_table.setSortingEnabled(True)
+        layout.addWidget(self.audit_table)
+        self.setLayout(layout)
+
+        self.search_filter = FilterController(self.prepare_search, parent=self)
+        self.action_filter.currentIndexChanged.connect(lambda: self.search_filter.run_now())
+        self.transaction_filter.textChanged.connect(self.search_filter.schedule)
+        self.user_filter.textChanged.connect(self.search_filter.schedule)
+        self.finished.connect(self.search_filter.close)
+        audit.log.flush()  # entries still in the writer's queue show up too
+        self.search_filter.run_now()
+
+    def prepare_search(self):
+        choice = self.action_filter.currentText()
+        actions = audit.GROUPS.get(choice, [] if choice == "All" else [choice])
+        query, params = queries.audit_log(actions, self.transaction_filter.text().strip(), self.user_filter.text().strip())
+
+        def job(conn):
+            return self.audit_table.read_page(conn, query, params)
+
+        def apply(first_page):
+            self.audit_table.load(self.data, query, params, first_page)
+
+        return self.data, job, apply
@@ -0,0 +1,284 @@
+"""Copies of a store database made with SQLite's online backup API.
+
+Save As used to checkpoint the WAL and shutil.copyfile() the live file on
+the GUI thread. The window froze for as long as the copy took, and a
+commit from another connection in the middle of it (the SMS dispatcher,
+the audit writer, an import) could leave a torn copy behind.
+copy_database() uses sqlite3.Connection.backup() on a connection of its
+own instead:
+
+- PAGES_PER_STEP pages at a time, with progress after each step. A write
+  to the source between steps makes SQLite start over; after MAX_RESTARTS
+  of those the rest is copied in one step, a single read transaction,
+  which in WAL mode does not hold up the writers;
+- into "<target>.part", which is checked with PRAGMA integrity_check and
+  only then renamed to the target, so a failed or cancelled copy never
+  leaves a half-written file under the real name.
+
+take_snapshot() copies the open file into a "snapshots" folder next to it,
+named <name>.<date>-<time>.db, and keeps the newest `keep`. The shared
+`scheduler` takes one every so many hours in the background
+(Options > Preferences, SNAPSHOT_HOURS and SNAPSHOT_KEEP by default).
+"""
+import os
+import sqlite3
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QEventLoop, Qt, pyqtSignal
+from PyQt5.QtWidgets import QProgressDialog
+
+import db_manager
+
+PAGES_PER_STEP = 1024  # 4 MB at the default page size
+MAX_RESTARTS = 3
+SNAPSHOT_FOLDER = "snapshots"
+SNAPSHOT_HOURS = 24  # 0 turns scheduled snapshots off
+SNAPSHOT_KEEP = 7
+CHECK_INTERVAL_MS = 5 * 60 * 1000  # how often the scheduler looks whether a snapshot is due
+STAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+
+class BackupError(Exception):
+    """The copy failed its integrity check: the source file itself is probably damaged."""
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Restarting(Exception):
+    pass
+
+
+def integrity_problems(path):
+    """PRAGMA integrity_check of the file at `path`; [] when it is sound."""
+    conn = sqlite3.connect(path)
+    try:
+        rows = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    return [] if rows == ["ok"] else rows
+
+
+def copy_database(source, target, progress=None, pages=PAGES_PER_STEP):
+    """Copy the database at `source` to `target` while it stays in use; returns `target`.
+
+    `progress(pages copied, pages in all)` is called after each step; when
+    it returns False the copy stops, nothing is left at `target` and None
+    is returned. Raises BackupError when the copy fails its integrity check.
+    """
+    part = target + ".part"
+    if os.path.exists(part):
+        os.remove(part)
+    src = db_manager.open_reader(source)
+    dst = sqlite3.connect(part)
+    restarts = 0
+    remaining_before = None
+
+    def step(status, remaining, total):
+        nonlocal restarts, remaining_before
+        if remaining_before is not None and remaining > remaining_before:
+            restarts += 1  # the source changed and SQLite started over
+            if restarts > MAX_RESTARTS:
+                raise Restarting()
+        remaining_before = remaining
+        if progress and progress(total - remaining, total) is False:
+            raise Cancelled()
+
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=step)
+        except Restarting:
+            src.backup(dst, pages=-1)
+        dst.close()
+        problems = integrity_problems(part)
+        if problems:
+            raise BackupError(f"the copy of {os.path.basename(source)} failed its integrity check: " + "; ".join(problems[:5]))
+        os.replace(part, target)
+        return target
+    except Cancelled:
+        return None
+    finally:
+        src.close()
+        dst.close()
+        if os.path.exists(part):
+            os.remove(part)
+
+
+def snapshot_folder(database):
+    return os.path.join(os.path.dirname(os.path.abspath(database)), SNAPSHOT_FOLDER)
+
+
+def snapshots(database):
+    """Paths of the snapshots of `database`, oldest first."""
+    folder = snapshot_folder(database)
+    if not os.path.isdir(folder):
+        return []
+    stem = os.path.splitext(os.path.basename(database))[0] + "."
+    stamp_length = len(datetime.now().strftime(STAMP_FORMAT))
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if name.startswith(stem) and name.endswith(".db") and len(name) == len(stem) + stamp_length + len(".db"))
+
+
+def last_snapshot_time(database):
+    """When the newest snapshot of `database` was taken (a timestamp), or None."""
+    taken = snapshots(database)
+    return os.path.getmtime(taken[-1]) if taken else None
+
+
+def take_snapshot(database, keep=SNAPSHOT_KEEP, progress=None):
+    """Copy `database` into its snapshot folder and drop all but the newest `keep`; returns the path or None if cancelled."""
+    folder = snapshot_folder(database)
+    os.makedirs(folder, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(database))[0]
+    path = copy_database(database, os.path.join(folder, f"{stem}.{datetime.now().strftime(STAMP_FORMAT)}.db"), progress)
+    if path is not None:
+        for old in snapshots(database)[:-keep]:
+            os.remove(old)
+    return path
+
+
+class BackupJob(QRunnable):
+    def __init__(self, task):
+        super().__init__()
+        self.task = task
+
+    def run(self):
+        self.task.work()
+
+
+class BackupTask(QObject):
+    """`work(progress)` run on the global thread pool; progress(done, total) returns False once cancel() was called."""
+
+    progressed = pyqtSignal(int, int)  # from the pool thread: pages copied, pages in all
+    done = pyqtSignal(object, object)  # from the pool thread: result, exception or None
+
+    def __init__(self, work, parent=None):
+        super().__init__(parent)
+        self.run = work
+        self.cancelled = threading.Event()
+
+    def start(self):
+        QThreadPool.globalInstance().start(BackupJob(self))
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def work(self):
+        result = error = None
+
+        def progress(done, total):
+            self.progressed.emit(done, total)
+            return not self.cancelled.is_set()
+
+        try:
+            result = self.run(progress)
+        except Exception as e:
+            traceback.print_exc()
+            error = e
+        self.done.emit(result, error)
+
+
+def copy_with_progress(parent, source, target):
+    """copy_database() on the pool behind a modal progress dialog; returns `target`, or None if cancelled.
+
+    Waits in a local event loop like QDialog.exec_(), so callers read as if
+    the copy were made in place while the window keeps repainting.
+    """
+    task = BackupTask(lambda progress: copy_database(source, target, progress))
+    dialog = QProgressDialog(f"Saving {os.path.basename(target)}...", "Cancel", 0, 0, parent)
+    dialog.setWindowTitle("Save As")
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(300)
+    dialog.canceled.connect(task.cancel)
+    loop = QEventLoop()
+    outcome = {}
+
+    def show_progress(done, total):
+        dialog.setMaximum(total)
+        dialog.setValue(min(done, total))
+        if done >= total:
+            dialog.setLabelText(f"Checking {os.path.basename(target)}...")
+
+    def finished(result, error):
+        outcome.update(result=result, error=error)
+        loop.quit()
+
+    task.progressed.connect(show_progress)
+    task.done.connect(finished)
+    task.start()
+    loop.exec_()
+    dialog.reset()
+    task.deleteLater()
+    if outcome["error"] is not None:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+class SnapshotScheduler(QObject):
+    """Takes a snapshot of the open database file every `hours`, in the background."""
+
+    progressed = pyqtSignal(int)  # percent copied
+    taken = pyqtSignal(str)  # path of the new snapshot
+    failed = pyqtSignal(str, bool)  # error, whether the copy failed its integrity check
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.database = None
+        self.hours = SNAPSHOT_HOURS
+        self.keep = SNAPSHOT_KEEP
+        self.task = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+
+    def configure(self, hours, keep):
+        self.hours = hours
+        self.keep = max(1, keep)
+
+    def set_database(self, database):
+        """Snapshot `database` from now on; None for none (the unsaved _temp__.db)."""
+        self.database = database
+        if not self.timer.isActive():
+            self.timer.start(CHECK_INTERVAL_MS)
+
+    def due(self):
+        if not self.database or self.hours <= 0 or not os.path.exists(self.database):
+            return False
+        last = last_snapshot_time(self.database)
+        return last is None or time.time() - last >= self.hours * 3600
+
+    def check(self):
+        if self.task is None and self.due():
+            self.take_now()
+
+    def take_now(self):
+        """Start a snapshot of the open file unless one is running; returns whether one started."""
+        if self.task is not None or not self.database:
+            return False
+        database, keep = self.database, self.keep
+        self.task = BackupTask(lambda progress: take_snapshot(database, keep, progress), self)
+        self.task.progressed.connect(lambda done, total: self.progressed.emit(done * 100 // max(total, 1)))
+        self.task.done.connect(self.finished)
+        self.task.start()
+        return True
+
+    def finished(self, path, error):
+        self.task.deleteLater()
+        self.task = None
+        if error is not None:
+            self.failed.emit(str(error), isinstance(error, BackupError))
+        elif path is not None:
+            self.taken.emit(path)
+
+    def shutdown(self):
+        """Stop a snapshot being taken (its partial copy is removed) and wait for it; connect to QApplication.aboutToQuit."""
+        self.timer.stop()
+        if self.task is not None:
+            self.task.cancel()
+            QThreadPool.globalInstance().waitForDone()
+
+
+scheduler = SnapshotScheduler()
@@ -0,0 +1,715 @@
+"""Benchmarks for the store database.
+
+Run from the project folder, e.g.
+
+    python benchmark.py sale-insert --sales 500
+    python benchmark.py payment-history --sizes 10000 100000 1000000
+    python benchmark.py search --sizes 100000 1000000
+    python benchmark.py sale-throughput --baskets 1 10 100
+    python benchmark.py theme-switch --widgets 500
+    python benchmark.py sms-dispatch --messages 200 --latency-ms 200 --failure-rate 0.2
+    python benchmark.py sms-bulk --debtors 500
+    python benchmark.py csv-export --sizes 10000 100000
+    python benchmark.py pdf-report --rows 10000
+    python benchmark.py table-import --rows 100000
+    python benchmark.py backup --rows 200000
+
+Every benchmark works on a throw-away database in a temporary folder and
+never touches the real DATABASE.db. theme-switch needs a display (or
+QT_QPA_PLATFORM=offscreen); sms-dispatch talks to a local stand-in for the
+SMS gateway and sms-bulk to sms_manage.FakeProvider, never to the real one.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import db_manager
+import migrations
+import queries
+import sale_engine
+import sale_lines
+
+PRODUCTS = ["Cement", "Iron Rod 12mm", "Roofing Sheet", "Nails 4in", "Paint 4L"]
+SYLLABLES = ["ko", "fi", "a", "ma", "ye", "bo", "ak", "su", "ne", "ti", "ra", "do"]
+
+
+def customer_name(n):
+    """A made-up but varied customer name; 500 distinct ones."""
+    n %= 500
+    first = "".join(SYLLABLES[(n // 12 ** i) % 12] for i in range(3)).title()
+    last = "".join(SYLLABLES[(n * 7 // 12 ** i) % 12] for i in range(3)).title()
+    return f"{first} {last}"
+
+
+def sale_products(n):
+    return ", ".join((PRODUCTS[n % len(PRODUCTS)], PRODUCTS[(n + 2) % len(PRODUCTS)]))
+
+
+def create_store(path, products=PRODUCTS):
+    """Create an empty store database with the app's tables and some stock."""
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn)
+    conn.executemany(
+        "INSERT INTO inventory (item_name, date_received, unit_price, quantity_received, quantity_remaining, total_cost) VALUES (?, '2025-01-01', ?, 10000000, 10000000, 0)",
+        [(name, 10.0 + i) for i, name in enumerate(products)])
+    conn.commit()
+    conn.close()
+
+
+def record_sale(conn, n, basket=None):
+    """Write one sale line by line, the way SalesWindow.record_sale did before sale_engine."""
+    trans_id = f"INV-BENCH-{n:07d}"
+    basket = basket or [PRODUCTS[n % len(PRODUCTS)], PRODUCTS[(n + 1) % len(PRODUCTS)]]
+    cur = conn.cursor()
+    total = 0.0
+    sold = []
+    for item in basket:
+        cur.execute("SELECT unit_price, quantity_remaining FROM inventory WHERE item_name = ?", (item,))
+        unit_price, _ = cur.fetchone()
+        total += 2 * unit_price
+        sold.append((item, unit_price, 2, 0))
+        cur.execute("INSERT INTO sales (customer_name, contact, item_name, quantity, total_owed, amount_paid, remaining_debt, payment_mode) VALUES (?, ?, ?, 2, ?, 0, ?, 'Cash')",
+                    ("Bench Customer", "0240000000", item, 2 * unit_price, 2 * unit_price))
+        cur.execute("UPDATE inventory SET quantity_issued = quantity_issued + 2, quantity_remaining = quantity_remaining - 2 WHERE item_name = ?", (item,))
+    cur.execute("UPDATE sales SET amount_paid = ?, remaining_debt = 0 WHERE customer_name = ? AND remaining_debt = total_owed", (total, "Bench Customer"))
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cur.execute("INSERT INTO customers (transaction_id, name, contact, product_name, total_owed, total_paid, remaining_debt, entry_date_and_time) VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+                (trans_id, "Bench Customer", "0240000000", sale_lines.label(sold), total, total, now))
+    sale_lines.write(cur, trans_id, sold)
+    cur.execute("INSERT INTO payments (transaction_id, customer_name, item_name, amount_paid, payment_mode, entry_date_and_time) VALUES (?, ?, ?, ?, 'Cash', ?)",
+                (trans_id, "Bench Customer", sale_lines.label(sold), total, now))
+    conn.commit()
+
+
+def record_sale_batched(conn, n, basket):
+    """The same sale through sale_engine.record."""
+    sale = sale_engine.Sale(f"INV-BENCH-{n:07d}", "Bench Customer", "", "0240000000", [(item, 2, 0) for item in basket], paid=1.0)
+    sale_engine.record(conn, sale)
+
+
+def time_sales(conn, count):
+    timings = []
+    for n in range(count):
+        start = time.perf_counter()
+        record_sale(conn, n)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<36} mean {statistics.mean(timings):7.3f} ms   p95 {p95:7.3f} ms   max {timings[-1]:7.3f} ms")
+
+
+def bench_sale_insert(sales):
+    """Sale-insert latency: default rollback journal vs. the db_manager pragmas."""
+    with tempfile.TemporaryDirectory() as folder:
+        before = os.path.join(folder, "before.db")
+        create_store(before)
+        conn = sqlite3.connect(before)  # what every window did before db_manager
+        summarize("rollback journal, synchronous=FULL", time_sales(conn, sales))
+        conn.close()
+
+        for durability in ("durability", "throughput"):
+            after = os.path.join(folder, f"{durability}.db")
+            create_store(after)
+            manager = db_manager.ConnectionManager()
+            manager.set_durability(durability)
+            conn = manager.connect(after)
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            summarize(f"{mode}, synchronous={db_manager.SYNCHRONOUS[durability]}", time_sales(conn, sales))
+            manager.close_all()
+
+
+def bench_sale_throughput(baskets, sales):
+    """Sales per second for baskets of 1, 10, 100... lines: line-by-line writes vs. sale_engine."""
+    products = [f"Product {i:03d}" for i in range(max(baskets))]
+    with tempfile.TemporaryDirectory() as folder:
+        for size in baskets:
+            basket = products[:size]
+            for label, record in (("line by line", lambda conn, n: record_sale(conn, n, basket)),
+                                  ("sale_engine", lambda conn, n: record_sale_batched(conn, n, basket))):
+                path = os.path.join(folder, f"{label.replace(' ', '_')}_{size}.db")
+                create_store(path, products)
+                manager = db_manager.ConnectionManager()
+                conn = manager.connect(path)
+                # Earlier sales of the customer make the old blanket UPDATE of sales pay its real cost
+                for n in range(sales):
+                    record(conn, n)
+                start = time.perf_counter()
+                for n in range(sales, 2 * sales):
+                    record(conn, n)
+                elapsed = time.perf_counter() - start
+                print(f"{size:>4} lines/sale  {label:<13} {sales / elapsed:9.1f} sales/s  {elapsed / sales * 1000:8.3f} ms/sale")
+                manager.close_all()
+
+
+def seed_payments(path, count):
+    """Fill a store with `count` payments, two per sale, spread over one year."""
+    create_store(path)
+    conn = sqlite3.connect(path)
+    sales = (count + 1) // 2
+
+    def customer_rows():
+        for n in range(sales):
+            yield (f"INV-BENCH-{n:07d}", customer_name(n), sale_products(n), 100.0, 50.0, 50.0)
+
+    def line_rows():
+        for n in range(sales):
+            first, second = sale_products(n).split(", ")
+            yield (f"INV-BENCH-{n:07d}", 1, first, 10.0, n % 9 + 1, 0)
+            yield (f"INV-BENCH-{n:07d}", 2, second, 12.0, 2, 0)
+
+    def payment_rows():
+        for n in range(count):
+            day = n * 365 // count
+            stamp = f"2025-{day // 31 + 1:02d}-{day % 28 + 1:02d} 10:{n // 60 % 60:02d}:{n % 60:02d}"
+            yield (f"INV-BENCH-{n // 2:07d}", customer_name(n // 2), sale_products(n // 2), 25.0, "Cash", stamp, stamp)
+
+    conn.executemany("INSERT INTO customers (transaction_id, name, product_name, total_owed, total_paid, remaining_debt) VALUES (?, ?, ?, ?, ?, ?)", customer_rows())
+    conn.executemany(f"INSERT INTO sale_lines (transaction_id, line_no, {sale_lines.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", line_rows())
+    conn.executemany("INSERT INTO payments (transaction_id, customer_name, item_name, amount_paid, payment_mode, entry_date_and_time, transaction_date) VALUES (?, ?, ?, ?, ?, ?, ?)", payment_rows())
+    conn.commit()
+    conn.close()
+
+
+def load_history_per_row(conn, start_date, end_date):
+    """The old PaymentHistoryWindow.load_payment_history: one quantity lookup per payment."""
+    cursor = conn.cursor()
+    cursor.execute("""SELECT transaction_id, customer_name, item_name, amount_paid, payment_mode, cheque_number, cheque_bank, entry_date_and_time, transaction_date
+                      FROM payments WHERE DATE(entry_date_and_time) BETWEEN ? AND ? ORDER BY entry_date_and_time DESC""", (start_date, end_date))
+    records = cursor.fetchall()
+    for record in records:
+        cursor.execute("SELECT quantity FROM sale_lines WHERE transaction_id = ?", (record[0],))
+        cursor.fetchall()
+    return len(records)
+
+
+def load_history_joined(conn, start_date, end_date):
+    query, params = queries.payment_history("All Customers", "", start_date, end_date)
+    return len(conn.execute(query, params).fetchall())
+
+
+def bench_payment_history(sizes):
+    """Load time of the payment history for a full year of payments."""
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            path = os.path.join(folder, f"payments_{size}.db")
+            seed_payments(path, size)
+            manager = db_manager.ConnectionManager()
+            conn = manager.connect(path)
+            for label, load in (("per-row lookup", load_history_per_row), ("joined query", load_history_joined)):
+                start = time.perf_counter()
+                rows = load(conn, "2025-01-01", "2025-12-31")
+                elapsed = time.perf_counter() - start
+                print(f"{size:>9,} payments  {label:<15} {elapsed * 1000:10.1f} ms  ({rows:,} rows)")
+            manager.close_all()
+
+
+def bench_search(sizes):
+    """Search box queries: LIKE '%...%' on the table vs. the FTS5 trigram index."""
+    searches = [
+        ("customer name", "customers", "customers_fts", ["name"], customer_name(42).split()[0]),
+        ("name prefix", "customers", "customers_fts", ["name"], customer_name(42)[:3]),
+        ("transaction id", "customers", "customers_fts", ["transaction_id"], "BENCH-00012"),
+        ("payment product", "payments", "payments_fts", ["item_name"], "Nails"),
+    ]
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            path = os.path.join(folder, f"search_{size}.db")
+            seed_payments(path, size)
+            manager = db_manager.ConnectionManager()
+            conn = manager.connect(path)
+            for label, table, fts, columns, text in searches:
+                like = " OR ".join(f"{column} LIKE ?" for column in columns)
+                condition, params = queries.text_search(fts, columns, text)
+                for method, sql, args in (("LIKE", f"SELECT rowid FROM {table} WHERE {like}", [f"%{text}%"] * len(columns)),
+                                          ("FTS5", f"SELECT rowid FROM {table} WHERE {condition}", params)):
+                    start = time.perf_counter()
+                    rows = conn.execute(f"SELECT COUNT(*) FROM ({sql})", args).fetchone()[0]
+                    elapsed = time.perf_counter() - start
+                    print(f"{size:>9,} payments  {label:<16} {method}  {elapsed * 1000:9.2f} ms  ({rows:,} rows)")
+            manager.close_all()
+
+
+def bench_theme_switch(widgets):
+    """Time to switch to each theme with a window of `widgets` inputs on screen."""
+    from PyQt5.QtWidgets import QApplication, QWidget, QGridLayout, QLabel, QLineEdit, QPushButton, QTableWidget
+    import themes
+
+    app = QApplication.instance() or QApplication([])
+    window = QWidget()
+    grid = QGridLayout(window)
+    for i in range(widgets):
+        widget = (QLabel, QLineEdit, QPushButton)[i % 3](f"Field {i}")
+        grid.addWidget(widget, i // 12, i % 12)
+    grid.addWidget(QTableWidget(100, 8), widgets // 12 + 1, 0, 1, 12)
+    window.show()
+    app.processEvents()
+
+    themes.apply("system")
+    for theme in themes.THEMES:
+        themes.stylesheets.pop(theme, None)  # time the first, uncached switch
+        start = time.perf_counter()
+        themes.apply(theme)
+        app.processEvents()  # the repaint with the new style
+        elapsed = (time.perf_counter() - start) * 1000
+        over = "  over budget" if elapsed > themes.SWITCH_BUDGET_MS else ""
+        print(f"{widgets:>5} widgets  {theme:<11} {elapsed:8.1f} ms{over}")
+        themes.apply("system")
+        app.processEvents()
+    window.close()
+
+
+def start_gateway_stand_in(latency_ms, failure_rate, hang_rate, hang_s):
+    """A local HTTP server answering like the SMS gateway; returns (server, url, request counter)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    requests_seen = {"count": 0}
+    lock = threading.Lock()
+
+    class Gateway(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                requests_seen["count"] += 1
+            roll = random.random()
+            if roll < hang_rate:
+                time.sleep(hang_s)  # longer than the dispatcher's read timeout
+            time.sleep(latency_ms / 1000 * random.uniform(0.5, 1.5))
+            if roll < hang_rate + failure_rate / 2:
+                self.send_response(503)
+                self.end_headers()
+                return
+            body = json.dumps({"status": "error" if roll < hang_rate + failure_rate else "success"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Gateway)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/send", requests_seen
+
+
+def bench_sms_dispatch(messages, latency_ms, failure_rate, hang_rate, concurrency):
+    """Drain an outbox of `messages` SMS through the dispatcher against a flaky local gateway."""
+    from PyQt5.QtCore import QCoreApplication
+    import sms_outbox
+    import sms_dispatcher
+    import sms_manage
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    # Compress the clock: retries after tens of milliseconds, a hung request gives up after half a second
+    sms_outbox.BACKOFF_BASE_S, sms_outbox.BACKOFF_CAP_S = 0.05, 1.0
+    sms_manage.CONNECT_TIMEOUT_S, sms_manage.READ_TIMEOUT_S = 0.5, 0.5
+    server, url, requests_seen = start_gateway_stand_in(latency_ms, failure_rate, hang_rate, hang_s=1.0)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "outbox.db")
+        conn = db_manager.connect(path)
+        sender = sms_manage.SMSManager([sms_manage.FayaSMSProvider(url=url, rate_per_second=1000)])
+        dispatcher = sms_dispatcher.SmsDispatcher(sender, max_concurrent=concurrency)
+        results = {"sent": 0, "retrying": 0, "failed": 0}
+        dispatcher.sent.connect(lambda *args: results.__setitem__("sent", results["sent"] + 1))
+        dispatcher.retrying.connect(lambda *args: results.__setitem__("retrying", results["retrying"] + 1))
+        dispatcher.failed.connect(lambda *args: results.__setitem__("failed", results["failed"] + 1))
+
+        start = time.perf_counter()
+        enqueue_times = []
+        for n in range(messages):
+            before = time.perf_counter()
+            dispatcher.enqueue(path, f"+23324{n:07d}", f"Benchmark message {n}")
+            enqueue_times.append(time.perf_counter() - before)
+        dispatcher.start(path)
+        while True:
+            app.processEvents()
+            counts = sms_outbox.counts(conn)
+            if not counts.get("pending") and not counts.get("sending") and dispatcher.in_flight == 0:
+                break
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        dispatcher.shutdown()
+        transitions = conn.execute("SELECT COUNT(*) FROM sms_status_log").fetchone()[0]
+        db_manager.manager.close(path)
+    server.shutdown()
+
+    print(f"{messages} messages, {concurrency} at a time, gateway {latency_ms} ms, "
+          f"{failure_rate:.0%} errors, {hang_rate:.0%} hangs")
+    print(f"  enqueue (GUI thread)  median {statistics.median(enqueue_times) * 1000:.2f} ms  max {max(enqueue_times) * 1000:.2f} ms")
+    print(f"  drained in {elapsed:.1f} s  ({messages / elapsed:.1f} messages/s; one at a time would take about "
+          f"{messages * latency_ms / 1000:.0f} s without retries)")
+    print(f"  sent {results['sent']}  retries {results['retrying']}  failed {results['failed']}  "
+          f"requests {requests_seen['count']}  status changes logged {transitions}")
+
+
+def bench_sms_bulk(debtors, latency_ms, primary_failure_rate, rate):
+    """Debt reminders to every debtor through two fake providers, personalised and in bulk.
+
+    The primary provider sends one number per request and fails
+    `primary_failure_rate` of them; the fallback takes up to 100 numbers per
+    request. Both are limited to `rate` messages per second.
+    """
+    from PyQt5.QtCore import QCoreApplication
+    import sms_outbox
+    import sms_dispatcher
+    import sms_manage
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    sms_outbox.BACKOFF_BASE_S, sms_outbox.BACKOFF_CAP_S = 0.05, 1.0
+    template = "Dear {name}, your outstanding balance is GHS {debt:.2f}. Kindly make payment."
+    print(f"{debtors} debtors, providers limited to {rate:g} messages/s, {latency_ms} ms per request, "
+          f"primary fails {primary_failure_rate:.0%}")
+    for personalised in (True, False):
+        primary = sms_manage.FakeProvider("primary", rate_per_second=rate, latency_s=latency_ms / 1000,
+                                          failure_rate=primary_failure_rate)
+        fallback = sms_manage.FakeProvider("fallback", max_batch=100, rate_per_second=rate, latency_s=latency_ms / 1000)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "bulk.db")
+            conn = db_manager.connect(path)
+            migrations.migrate(conn)
+            with conn:
+                conn.executemany("INSERT INTO customers (name, transaction_id, contact, total_owed, total_paid, remaining_debt) "
+                                 "VALUES (?, ?, ?, ?, 0, ?)",
+                                 [(f"Debtor {n}", f"TX{n:06d}", f"+23324{n:07d}", 100 + n, 100 + n) for n in range(debtors)])
+            dispatcher = sms_dispatcher.SmsDispatcher(sms_manage.SMSManager([primary, fallback]))
+            query, params = queries.debtors()
+            start = time.perf_counter()
+            rows = conn.execute(query, params).fetchall()
+            messages = [(contact, template.format(name=name, debt=debt) if personalised else "Please settle your balance.")
+                        for contact, name, debt in rows]
+            dispatcher.enqueue_many(path, messages)
+            queued = time.perf_counter() - start
+            dispatcher.start(path)
+            dispatcher.wait()
+            elapsed = time.perf_counter() - start
+            counts = sms_outbox.counts(conn)
+            dispatcher.shutdown()
+            db_manager.manager.close(path)
+        app.processEvents()
+        print(f"  {'personalised' if personalised else 'same text   '}  queued in {queued * 1000:.0f} ms  "
+              f"drained in {elapsed:.1f} s ({len(messages) / elapsed:.0f} messages/s)  {counts}")
+        for provider in (primary, fallback):
+            print(f"    {provider.name:<8}  {provider.requests:>5} requests  {provider.health.sent:>5} sent  {provider.health.errors:>4} errors")
+
+
+def bench_csv_export(sizes):
+    """Payment history to CSV: every row in a list first (the old export) vs. streamed in chunks (table_export)."""
+    import csv
+    import tracemalloc
+    import table_export
+
+    def export_as_list(conn, file_path, headers, query, params, format_row):
+        rows = [format_row(record) for record in conn.execute(query, params)]
+        with open(file_path, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        return len(rows)
+
+    headers = ["Transaction ID", "Customer", "Items", "Amount", "Mode", "Cheque No", "Bank", "Entered", "Date", "Products"]
+    format_row = lambda record: [str(value) for value in record]
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            path = os.path.join(folder, f"export_{size}.db")
+            seed_payments(path, size)
+            conn = sqlite3.connect(path)
+            query, params = queries.payment_history("", "", "2025-01-01", "2025-12-31")
+            for label, export in (("list of rows", export_as_list), ("streamed", table_export.write_csv)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                rows = export(conn, os.path.join(folder, "export.csv"), headers, query, params, format_row)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{size:>9,} payments  {label:<13} {elapsed * 1000:9.1f} ms  peak {peak / 1024 / 1024:7.1f} MB  ({rows:,} rows)")
+            conn.close()
+
+
+def bench_pdf_report(rows):
+    """Render the payment history as a paginated PDF report, the way Export PDF does."""
+    import tracemalloc
+    import pdf_report
+
+    headers = ["Transaction ID", "Customer", "Product", "Amount Paid \u20B5", "Mode", "Cheque No.", "Bank", "Date", "Payment Date"]
+
+    def format_row(record):
+        # As PaymentHistoryWindow.format_payment_row: the sale's products and quantities in the product cell
+        texts = [str(value) for value in record[:9]]
+        if record[9]:
+            texts[2] = sale_lines.format_summary(record[9])
+        return texts
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, f"report_{rows}.db")
+        seed_payments(path, rows)
+        conn = sqlite3.connect(path)
+        query, params = queries.payment_history("", "", "2025-01-01", "2025-12-31")
+        pdf_path = os.path.join(folder, "report.pdf")
+        progress_calls = []
+        start = time.perf_counter()
+        written = pdf_report.write_pdf(conn, pdf_path, headers, query, params, format_row,
+                                       lambda done: progress_calls.append(done), title="Payment Records")
+        elapsed = time.perf_counter() - start
+        # tracemalloc slows reportlab down several times over, so the peak comes from a second run
+        tracemalloc.start()
+        pdf_report.write_pdf(conn, pdf_path, headers, query, params, format_row, title="Payment Records")
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        with open(pdf_path, "rb") as file:
+            pages = file.read().count(b"/Type /Page\n")
+        size = os.path.getsize(pdf_path)
+        conn.close()
+    print(f"{written:,} payments  {elapsed:.1f} s  ({written / elapsed:,.0f} rows/s)  {pages:,} pages  "
+          f"{size / 1024 / 1024:.1f} MB file  peak {peak / 1024 / 1024:.1f} MB  {len(progress_calls)} progress updates")
+
+
+def bench_table_import(rows):
+    """Import another store's payments and sales: the old fetchall() copy, table_import's chunked upsert and table_merge's ATTACH."""
+    import tracemalloc
+    import table_import
+    import table_merge
+
+    def import_as_list(source, target, table):
+        # The old ImportTableDialog.import_from_database with "Overwrite Table"
+        source_conn, target_conn = sqlite3.connect(source), sqlite3.connect(target)
+        columns = [row[1] for row in source_conn.execute(f"PRAGMA table_info({table})")]
+        records = source_conn.execute(f"SELECT * FROM {table}").fetchall()
+        target_conn.execute(f"DROP TABLE IF EXISTS {table}")
+        target_conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})")
+        target_conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' for _ in columns)})", records)
+        migrations.refresh_derived_tables(target_conn.cursor())
+        target_conn.commit()
+        source_conn.close()
+        target_conn.close()
+        return len(records)
+
+    def import_chunked(source, target, table, overwrite):
+        conn = sqlite3.connect(target)
+        reader = table_import.DatabaseSource(source, table)
+        reader.open()
+        result = table_import.import_rows(conn, table, reader, overwrite)
+        reader.close()
+        conn.close()
+        return result
+
+    def import_attached(source, target, table, overwrite):
+        conn = sqlite3.connect(target)
+        result = table_merge.merge_tables(conn, source, [table], overwrite)
+        conn.close()
+        return result.tables[0]
+
+    def measure(function, seed_target, *args):
+        """Run on a fresh target for the time, then again under tracemalloc (which slows it down) for the peak."""
+        timings = []
+        for traced in (False, True):
+            target = os.path.join(folder, f"target_{len(timings)}.db")
+            seed_target(target)
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            result = function(branch, target, *args)
+            timings.append(time.perf_counter() - start)
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            os.remove(target)
+        return result, timings[0], peak
+
+    def half_merged(target):
+        # Already has half of the branch's sales: the old code failed on the UNIQUE transaction_id
+        create_store(target)
+        conn = sqlite3.connect(target)
+        conn.executemany("INSERT INTO customers (transaction_id, name, total_owed) VALUES (?, ?, 0)",
+                         [(f"INV-BENCH-{n:07d}", customer_name(n)) for n in range(0, (rows + 1) // 2, 2)])
+        conn.commit()
+        conn.close()
+
+    def report(table, label, count, elapsed, peak, extra=""):
+        print(f"{table:<9}  {label:<19} {count:>9,} rows  {elapsed:6.2f} s  ({count / elapsed:9,.0f} rows/s)  peak {peak / 1024 / 1024:6.1f} MB{extra}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        branch = os.path.join(folder, "branch.db")
+        seed_payments(branch, rows)
+        for table in ("payments", "customers"):
+            count, elapsed, peak = measure(import_as_list, create_store, table)
+            report(table, "fetchall, overwrite", count, elapsed, peak)
+            result, elapsed, peak = measure(import_chunked, create_store, table, True)
+            report(table, "chunked, overwrite", result.read, elapsed, peak)
+            merge, elapsed, peak = measure(import_attached, create_store, table, True)
+            report(table, "attached, overwrite", merge.source_rows, elapsed, peak)
+        result, elapsed, peak = measure(import_chunked, half_merged, "customers", False)
+        report("customers", "chunked, upsert", result.read, elapsed, peak, f"  {result.inserted:,} added, {result.updated:,} updated")
+        merge, elapsed, peak = measure(import_attached, half_merged, "customers", False)
+        report("customers", "attached, upsert", merge.source_rows, elapsed, peak, f"  {merge.added:,} added, {merge.updated:,} updated")
+        with tempfile.TemporaryDirectory() as preview:
+            target = os.path.join(preview, "preview.db")
+            half_merged(target)
+            conn = sqlite3.connect(target)
+            start = time.perf_counter()
+            plan = table_merge.merge_tables(conn, branch, dry_run=True)
+            print(f"dry run of every table in {(time.perf_counter() - start) * 1000:.0f} ms:")
+            print("  " + "\n  ".join(merge.line(True) for merge in plan.tables))
+            conn.close()
+
+
+def bench_backup(rows, writes_per_s):
+    """Save As: checkpoint and shutil.copyfile() (the old way) vs. backup.copy_database(), idle and while sales are written."""
+    import shutil
+    import backup
+
+    def copy_file(source, target):
+        conn = sqlite3.connect(source)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        shutil.copyfile(source, target)
+
+    def copy_stepped(source, target):
+        steps = []
+        last = [time.perf_counter()]
+
+        def progress(done, total):
+            now = time.perf_counter()
+            steps.append((done, now - last[0]))
+            last[0] = now
+
+        backup.copy_database(source, target, progress)
+        check = time.perf_counter() - last[0]
+        restarts = sum(1 for before, after in zip(steps, steps[1:]) if after[0] < before[0])
+        return (f"  {len(steps)} steps (longest {max(gap for _, gap in steps[1:] or steps) * 1000:.0f} ms), {restarts} restarts, "
+                f"integrity check {check * 1000:.0f} ms, all off the GUI thread")
+
+    sale_numbers = iter(range(rows, rows * 10))
+
+    def writer(path, stop, latencies):
+        conn = sqlite3.connect(path, timeout=db_manager.BUSY_TIMEOUT_MS / 1000)
+        while not stop.is_set():
+            start = time.perf_counter()
+            record_sale(conn, next(sale_numbers))
+            latencies.append(time.perf_counter() - start)
+            time.sleep(1 / writes_per_s)
+        conn.close()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "store.db")
+        seed_payments(path, rows)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL")  # as db_manager.connect() leaves every store file
+        conn.close()
+        print(f"{rows:,} payments, {os.path.getsize(path) / 1024 / 1024:.1f} MB file")
+        for busy in (False, True):
+            for label, copy in (("copyfile", copy_file), ("backup API", copy_stepped)):
+                stop, latencies = threading.Event(), []
+                thread = threading.Thread(target=writer, args=(path, stop, latencies)) if busy else None
+                if thread:
+                    thread.start()
+                    time.sleep(0.2)
+                target = os.path.join(folder, "copy.db")
+                start = time.perf_counter()
+                extra = copy(path, target) or ""
+                elapsed = time.perf_counter() - start
+                stop.set()
+                if thread:
+                    thread.join()
+                    extra += f"  sale commits: max {max(latencies) * 1000:.0f} ms over {len(latencies)}"
+                problems = backup.integrity_problems(target)
+                print(f"{'while selling' if busy else 'idle':<13}  {label:<10} {elapsed * 1000:8.0f} ms  "
+                      f"{'ok' if not problems else problems[0]}{extra}")
+                os.remove(target)
+
+        taken = []
+        for _ in range(backup.SNAPSHOT_KEEP + 2):
+            start = time.perf_counter()
+            taken.append(backup.take_snapshot(path, backup.SNAPSHOT_KEEP))
+            elapsed = time.perf_counter() - start
+            time.sleep(1.01)  # snapshots are named to the second
+        kept = backup.snapshots(path)
+        print(f"{len(taken)} snapshots (last took {elapsed * 1000:.0f} ms), {len(kept)} kept, newest kept: {kept[-1] == taken[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sale_insert = commands.add_parser("sale-insert", help="latency of recording a sale")
+    sale_insert.add_argument("--sales", type=int, default=500)
+
+    payment_history = commands.add_parser("payment-history", help="load time of the payment history view")
+    payment_history.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+
+    search = commands.add_parser("search", help="search box queries with and without the full-text index")
+    search.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+
+    sale_throughput = commands.add_parser("sale-throughput", help="sales per second by basket size")
+    sale_throughput.add_argument("--baskets", type=int, nargs="+", default=[1, 10, 100])
+    sale_throughput.add_argument("--sales", type=int, default=200)
+
+    theme_switch = commands.add_parser("theme-switch", help="time to apply each theme")
+    theme_switch.add_argument("--widgets", type=int, default=500)
+
+    sms_dispatch = commands.add_parser("sms-dispatch", help="SMS outbox throughput against a flaky local gateway")
+    sms_dispatch.add_argument("--messages", type=int, default=200)
+    sms_dispatch.add_argument("--latency-ms", type=int, default=200)
+    sms_dispatch.add_argument("--failure-rate", type=float, default=0.2)
+    sms_dispatch.add_argument("--hang-rate", type=float, default=0.05)
+    sms_dispatch.add_argument("--concurrency", type=int, default=3)
+
+    sms_bulk = commands.add_parser("sms-bulk", help="debt reminder blast through rate-limited fake providers with failover")
+    sms_bulk.add_argument("--debtors", type=int, default=500)
+    sms_bulk.add_argument("--latency-ms", type=int, default=50)
+    sms_bulk.add_argument("--primary-failure-rate", type=float, default=0.5)
+    sms_bulk.add_argument("--rate", type=float, default=50)
+
+    csv_export = commands.add_parser("csv-export", help="time and peak memory of exporting the payment history to CSV")
+    csv_export.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+
+    pdf_report = commands.add_parser("pdf-report", help="time and peak memory of a paginated payment report")
+    pdf_report.add_argument("--rows", type=int, default=10000)
+
+    table_import = commands.add_parser("table-import", help="importing another store's tables, whole vs. chunked with upsert")
+    table_import.add_argument("--rows", type=int, default=100000)
+
+    backup = commands.add_parser("backup", help="Save As and snapshots: copyfile vs. the online backup API, idle and while selling")
+    backup.add_argument("--rows", type=int, default=200000)
+    backup.add_argument("--writes-per-s", type=float, default=20)
+
+    args = parser.parse_args()
+    if args.command == "sale-insert":
+        bench_sale_insert(args.sales)
+    elif args.command == "payment-history":
+        bench_payment_history(args.sizes)
+    elif args.command == "search":
+        bench_search(args.sizes)
+    elif args.command == "sale-throughput":
+        bench_sale_throughput(args.baskets, args.sales)
+    elif args.command == "theme-switch":
+        bench_theme_switch(args.widgets)
+    elif args.command == "sms-dispatch":
+        bench_sms_dispatch(args.messages, args.latency_ms, args.failure_rate, args.hang_rate, args.concurrency)
+    elif args.command == "sms-bulk":
+        bench_sms_bulk(args.debtors, args.latency_ms, args.primary_failure_rate, args.rate)
+    elif args.command == "csv-export":
+        bench_csv_export(args.sizes)
+    elif args.command == "pdf-report":
+        bench_pdf_report(args.rows)
+    elif args.command == "table-import":
+        bench_table_import(args.rows)
+    elif args.command == "backup":
+        bench_backup(args.rows, args.writes_per_s)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 import sqlite3 
+from itertools import groupby
+from operator import itemgetter
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QDialog,
                              QMessageBox, QTableWidget, QTableWidgetItem, QHBoxLayout, QSplitter, QDialogButtonBox)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QRegExpValidator 
 from PyQt5.QtCore import QRegExp
+import db_manager
+import queries
+import sale_lines
+from table_models import SqlTableView
+from filter_controller import FilterController
+from query_executor import executor
 #from PyQt5.QtCore import QPropertyAnimation, QEasingCurve, QSize
 
 currency_symbol = "\u20B5"
@@ -14,6 +22,9 @@ class ManageCustomersWindow(QWidget):
         self.setWindowTitle("Manage Customers")
         self.data = database
         self.main_window = main_window
+        self.history_cache = {}  # (database key, customer name) -> transaction history rows
+        self.history_generation = 0  # bumped on every invalidation, so a history read before it is not cached
+        db_manager.manager.subscribe(self.invalidate_history)
         self.setGeometry(200, 200, 900, 500)  # Increased width to accommodate both tables
         self.initUI()
 
@@ -23,14 +34,13 @@ class ManageCustomersWindow(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search by name, location, or contact")
-        self.search_input.textChanged.connect(self.load_customers)
+        self.search_filter = FilterController(self.prepare_customers, parent=self)
+        self.search_input.textChanged.connect(self.search_filter.schedule)
 
-        self.customer_records_table = QTableWidget()
-        self.customer_records_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.customer_records_table.setColumnCount(3)
-        self.customer_records_table.setHorizontalHeaderLabels(["Customer Name", "Location", "Contact"])
+        self.customer_records_table = SqlTableView(["Customer Name", "Location", "Contact"])
+        self.customer_records_table.setEditTriggers(SqlTableView.NoEditTriggers)
         self.customer_records_table.setSortingEnabled(True)
-        self.customer_records_table.itemSelectionChanged.connect(self.view_transaction_history)
+        self.customer_records_table.selectionModel().selectionChanged.connect(self.view_transaction_history)
 
         self.add_button = QPushButton("Add Customer")
         self.edit_button = QPushButton("Edit Customer")
@@ -118,11 +128,10 @@ class ManageCustomersWindow(QWidget):
         if dialog.exec_() == QDialog.Accepted:
             name, location, contact = name_input.text(), location_input.text(), contact_input.text()
             if name and location and contact:
-                conn = sqlite3.connect(self.data)
+                conn = db_manager.connect(self.data)
                 cursor = conn.cursor()
-                cursor.execute("INSERT INTO customers_data (name, location, contact) VALUES (?, ?, ?)", (name, location, contact))
-                conn.commit()
-                conn.close()
+                with conn:  # rolled back on error, so the shared connection is not left mid-transaction
+                    cursor.execute("INSERT INTO customers_data (name, location, contact) VALUES (?, ?, ?)", (name, location, contact))
                 self.load_customers()
 
     def edit_customer(self):
@@ -131,9 +140,9 @@ class ManageCustomersWindow(QWidget):
             QMessageBox.warning(self, "Error", "Please select a customer to edit.")
             return
 
-        name = self.customer_records_table.item(selected_row, 0).text()
-        location = self.customer_records_table.item(selected_row, 1).text()
-        contact = self.customer_records_table.item(selected_row, 2).text()
+        name = self.customer_records_table.text(selected_row, 0)
+        location = self.customer_records_table.text(selected_row, 1)
+        contact = self.customer_records_table.text(selected_row, 2)
 
         dialog = QDialog(self)
         dialog.setWindowTitle("Edit Customer")
@@ -162,11 +171,10 @@ class ManageCustomersWindow(QWidget):
         if dialog.exec_() == QDialog.Accepted:
             new_name, new_location, new_contact = name_input.text(), location_input.text(), contact_input.text()
             if new_name and new_location and new_contact:
-                conn = sqlite3.connect(self.data)
+                conn = db_manager.connect(self.data)
                 cursor = conn.cursor()
-                cursor.execute("UPDATE customers_data SET name = ?, location = ?, contact = ? WHERE name = ?", (new_name, new_location, new_contact, name))
-                conn.commit()
-                conn.close()
+                with conn:
+                    cursor.execute("UPDATE customers_data SET name = ?, location = ?, contact = ? WHERE name = ?", (new_name, new_location, new_contact, name))
                 self.load_customers()
 
     def delete_customer(self):
@@ -174,34 +182,29 @@ class ManageCustomersWindow(QWidget):
         if selected_row == -1:
             QMessageBox.warning(self, "Error", "Please select a customer to delete.")
             return
-        name = self.customer_records_table.item(selected_row, 0).text()
+        name = self.customer_records_table.text(selected_row, 0)
         confirm = QMessageBox.question(self, "Confirm Deletion", f"Are you sure you want to delete {name}?", QMessageBox.Yes | QMessageBox.No)
         if confirm == QMessageBox.Yes:
-            conn = sqlite3.connect(self.data)
+            conn = db_manager.connect(self.data)
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM customers_data WHERE name = ?", (name,))
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute("DELETE FROM customers_data WHERE name = ?", (name,))
             self.load_customers()
 
+    def prepare_customers(self):
+        """(database, job, apply) of the customer search; see FilterController."""
+        query, params = queries.customer_records(self.search_input.text().strip())
+
+        def job(conn):
+            return self.customer_records_table.read_page(conn, query, params)
+
+        def apply(first_page):
+            self.customer_records_table.load(self.data, query, params, first_page)
+
+        return self.data, job, apply
+
     def load_customers(self):
-        search_text = self.search_input.text().strip()
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        query = "SELECT name, location, contact FROM customers_data"
-        params = ()
-
-        if search_text:
-            query += " WHERE name LIKE ? OR location LIKE ? OR contact LIKE ?"
-            params = (f"%{search_text}%", f"%{search_text}%", f"%{search_text}%")
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        self.customer_records_table.setRowCount(len(rows))
-        for i, row in enumerate(rows):
-            for j, value in enumerate(row):
-                self.customer_records_table.setItem(i, j, QTableWidgetItem(str(value)))
-        conn.close()
+        self.search_filter.run_now()
 
     def view_transaction_history(self):
         selected_row = self.customer_records_table.currentRow()
@@ -210,7 +213,7 @@ class ManageCustomersWindow(QWidget):
             self.history_label.setVisible(False)
             return
         
-        name = self.customer_records_table.item(selected_row, 0).text()
+        name = self.customer_records_table.text(selected_row, 0)
         self.history_label.setText(f"Transaction History of {name}")
         self.load_transactions(name)
         self.transaction_history_table.setVisible(True)
@@ -218,50 +221,54 @@ class ManageCustomersWindow(QWidget):
         self.main_window.adjust_window_size()
         
 
-    def format_products_and_quantities(self, products, quantities):
-        product_list = products.split(", ")
-        quantity_list = quantities.split(", ")
-        formatted_text = "\n".join(f"{p.ljust(20)} - {q.rjust(3)}" for p, q in zip(product_list, quantity_list))
-        return formatted_text
+    def invalidate_history(self, key, customer=None):
+        """Drop cached histories after a payment, sale or reversal (all of them if customer is None)."""
+        self.history_generation += 1
+        for cached in list(self.history_cache):
+            if cached[0] == key and customer in (None, cached[1]):
+                del self.history_cache[cached]
+
+    def fetch_transactions(self, conn, customer_name):
+        """Yield the history rows of a customer: each sale followed by its payments."""
+        query, params = queries.transaction_history(customer_name)
+        for _, rows in groupby(conn.execute(query, params), key=itemgetter(0)):
+            rows = list(rows)
+            _, transaction_id, product_name, lines, total_paid, total_owed, remaining_debt, date = rows[0][:8]
+            products = sale_lines.format_summary(lines) or product_name
+            yield (transaction_id, products, total_paid, total_owed, remaining_debt, date)
+
+            for item_name, amount_paid, payment_date in (row[9:] for row in rows if row[8] is not None):
+                yield (transaction_id, products, amount_paid, '', '', payment_date)
 
     def load_transactions(self, customer_name):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT transaction_id, product_name, quantity, total_paid, total_owed, remaining_debt, transaction_date 
-            FROM customers WHERE name = ? ORDER BY transaction_id
-        """, (customer_name,))
-        transactions = cursor.fetchall()
-        
-        all_rows = []
-        for transaction in transactions:
-            transaction_id, product_name, quantity, total_paid, total_owed, remaining_debt, date = transaction
-            formatted_products = self.format_products_and_quantities(product_name, quantity)
-            
-            all_rows.append((transaction_id, formatted_products, total_paid, total_owed, remaining_debt, date))
-            
-            cursor.execute("""
-                SELECT item_name, amount_paid, transaction_date
-                FROM payments WHERE transaction_id = ?
-            """, (transaction_id,))
-            payments = cursor.fetchall()
-            
-            if payments:
-                payment_products = ", ".join([p[0] for p in payments])
-                formatted_payment_products = self.format_products_and_quantities(payment_products, quantity)
-                for payment in payments:
-                    item_name, amount_paid, payment_date = payment
-                    all_rows.append((transaction_id, formatted_payment_products, amount_paid, '', '', payment_date))
-        
-        self.transaction_history_table.setRowCount(len(all_rows))
-        for i, row in enumerate(all_rows):
+        key = (db_manager.manager.key(self.data), customer_name)
+        rows = self.history_cache.get(key)
+        if rows is not None:
+            executor.cancel(self.transaction_history_table)  # a customer picked earlier must not replace these
+            self.show_transactions(rows)
+            return
+
+        generation = self.history_generation
+
+        def apply(rows):
+            if generation == self.history_generation:
+                self.history_cache[key] = rows
+            self.show_transactions(rows)
+
+        executor.submit(self.data, lambda conn: list(self.fetch_transactions(conn, customer_name)), apply,
+                        self.transaction_history_table)
+
+    def show_transactions(self, rows):
+        table = self.transaction_history_table
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
             for j, value in enumerate(row):
-                self.transaction_history_table.setItem(i, j, QTableWidgetItem(str(value)))
-        
-        self.transaction_history_table.resizeColumnsToContents()
-        self.transaction_history_table.resizeRowsToContents()
-        conn.close()
+                table.setItem(i, j, QTableWidgetItem(str(value)))
+
+        table.resizeColumnsToContents()
+        table.resizeRowsToContents()
+        table.setUpdatesEnabled(True)
     
     def mousePressEvent(self, event):
         if self.transaction_history_table.isVisible():
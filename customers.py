@@ -6,23 +6,22 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget,
 from PyQt5.QtCore import Qt, QTimer, QDate, QStringListModel
 from PyQt5.QtWidgets import QGridLayout,QInputDialog, QHBoxLayout, QTextEdit, QGroupBox, QAction, QSizePolicy, QCompleter
 from PyQt5.QtGui import QPalette, QFont
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 import payment
 import edit_inventory #import EditTransactionWindow
-import datetime
+import db_manager
+import queries
+import sale_lines
+import aggregates
+import audit
+from table_models import SqlTableView
+from filter_controller import FilterController
+from query_executor import executor
+import sms_dispatcher
 #from manage_customer import ManageCustomersWindow
 from customer_manage import ManageCustomersWindow
 
 currency_symbol = "\u20B5"
-
-def log_text(text):
-    # Get the current timestamp
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Open the file in append mode (creates the file if it doesn't exist)
-    with open("log.txt", "a") as file:
-        # Write the timestamp followed by the input text
-        file.write(f"[{timestamp}] {text}\n")
+DEBT_REMINDER = "Dear {name}, your outstanding balance with {company} is GHS {debt:.2f}. Kindly make payment. Thank you."
 
 
 class CustomersWindow(QWidget ):
@@ -37,10 +36,11 @@ class CustomersWindow(QWidget ):
     
     def initUI(self):
         layout = QVBoxLayout()
-        self.customer_table = QTableWidget()
-        self.customer_table.setColumnCount(9)
-        self.customer_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.customer_table.setHorizontalHeaderLabels(["Customer","Transaction ID", "Contact", "Location", "Items Bought",  f"Total Owed {currency_symbol}", f"Total Paid {currency_symbol} ", f"Remaining Debt {currency_symbol}","Transaction Date"])
+        # Items Bought (4) shows product_name with the quantity column folded in
+        self.customer_table = SqlTableView(["Customer","Transaction ID", "Contact", "Location", "Items Bought",  f"Total Owed {currency_symbol}", f"Total Paid {currency_symbol} ", f"Remaining Debt {currency_symbol}","Transaction Date"],
+                                           format_row=self.format_customer_row, monospace_columns=[4], sort_columns=[1, 2, 3, 4, 5, 7, 8, 9, 10])
+        self.longest_product_name = 1
+        self.customer_table.setEditTriggers(SqlTableView.NoEditTriggers)
         
         # Enable sorting
         self.customer_table.setSortingEnabled(True)
@@ -63,9 +63,9 @@ class CustomersWindow(QWidget ):
         self.end_date.setCalendarPopup(True)
         self.end_date.setDate(QDate.currentDate())   
 
-        self.load_customers()
-        self.customer_filter.textChanged.connect(self.load_search)
-        self.product_filter.textChanged.connect(self.load_search)
+        self.search_filter = FilterController(self.prepare_search, parent=self)
+        self.customer_filter.textChanged.connect(self.search_filter.schedule)
+        self.product_filter.textChanged.connect(self.search_filter.schedule)
         self.start_date.dateChanged.connect(self.load_search)
         self.end_date.dateChanged.connect(self.load_search)
 
@@ -95,6 +95,9 @@ class CustomersWindow(QWidget ):
             self.trans_reverse = QPushButton("Reverse Transaction", self)
             #self.trans_reverse.setFixedSize(150, 20)  # Width: 100, Height: 50
             self.trans_reverse.clicked.connect(self.reverse_transaction)        
+
+            self.debt_reminder_button = QPushButton("Send Debt Reminders", self)
+            self.debt_reminder_button.clicked.connect(self.send_debt_reminders)
          
         h_layout = QHBoxLayout()
         h_layout.addWidget(self.payment_button)  
@@ -102,6 +105,7 @@ class CustomersWindow(QWidget ):
         if self.main_window.user_manager.logged_in_role == "Administrator":
             h_layout.addWidget(self.edit_transaction_button)
             h_layout.addWidget(self.trans_reverse)
+            h_layout.addWidget(self.debt_reminder_button)
             
         # Adding Manage Customers Button in CustomersWindow
         #self.manage_customers_button = QPushButton("Customer Database")
@@ -117,8 +121,7 @@ class CustomersWindow(QWidget ):
         #layout.addLayout(button_layout)
         #layout.addWidget(self.customer_table)
         self.setLayout(layout)
-        self.load_customers() 
-        self.load_search()
+        self.load_search()  # the table and the summary in one query; MainWindow reloads it when the data changes
         
         
         # Define open_manage_customers function in CustomersWindow
@@ -133,7 +136,7 @@ class CustomersWindow(QWidget ):
             QMessageBox.warning(self, "Error", "Please select a transaction to edit.")
             return
 
-        trans_id = self.customer_table.item(selected_row, 1).text()  # Transaction ID
+        trans_id = self.customer_table.text(selected_row, 1)  # Transaction ID
 
         # Admin Authentication
         password, ok = QInputDialog.getText(self, "Admin Authentication", "Enter Your Password:", QLineEdit.Password)
@@ -143,15 +146,14 @@ class CustomersWindow(QWidget ):
             return
 
         # Fetch transaction details
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT name, location, contact, unit_price, product_name,  quantity, bulk_discount, total_paid, transaction_id, entry_date_and_time
+            SELECT name, location, contact, total_paid, transaction_id, entry_date_and_time
             FROM customers WHERE transaction_id = ?
         """, (trans_id,))
         transaction_data = cursor.fetchone()
-        conn.close()
 
         if not transaction_data:
             QMessageBox.warning(self, "Error", "Transaction not found.")
@@ -164,96 +166,43 @@ class CustomersWindow(QWidget ):
         self.load_search()
 
 
-    def load_search(self):        
-        """Load payments based on filters and update summary statistics."""
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT item_name FROM inventory")
-        itemss = cursor.fetchall()
-        longest_pro_name = max(len(p[0]) for p in itemss) if itemss else 1
+    def format_customer_row(self, row):
+        """Displayed texts of a customers row: the sale's products and quantities (row[5]) go into column 4."""
+        texts = [str(value) for value in row[:4]]
+        texts.append(sale_lines.format_summary(row[5], self.longest_product_name))
+        texts.extend(str(value) for value in row[6:])
+        return texts
 
-        customer = self.customer_filter.text().strip()
+    def longest_product_name_in(self, conn):
+        result = conn.execute("SELECT MAX(LENGTH(item_name)) FROM inventory").fetchone()
+        return result[0] if result and result[0] else 1
+
+    def prepare_search(self):
+        """(database, job, apply) of the search for the current filters; see FilterController."""
+        customer = queries.customer_name(self.customer_filter.text().strip())
         product = self.product_filter.text().strip()
-        
-        query = """SELECT name, transaction_id, contact, location, product_name, 
-                quantity, total_owed, total_paid, remaining_debt, transaction_date 
-        FROM customers"""
-        conditions = []
-        params = []
-
-        if customer and customer != "All Customers":
-            conditions.append("name LIKE ?")
-            params.append(f'%{customer}%')
-            
-        if product:
-            conditions.append("product_name LIKE ?")
-            params.append(f"%{product}%")
+        query, params = queries.customer_search(customer, product)
+
+        def job(conn):
+            first_page = self.customer_table.read_page(conn, query, params)
+            if product:
+                result = conn.execute(f"SELECT SUM(remaining_debt), SUM(total_paid) FROM ({query})", params).fetchone()
+                total_outstanding = result[0] if result and result[0] else 0
+                total_paid = result[1] if result and result[1] else 0
+            else:
+                total_paid, total_outstanding = aggregates.customer_summary(conn, customer)
+            return self.longest_product_name_in(conn), first_page, total_paid, total_outstanding
 
-        if conditions:
-            filters = " WHERE " + " AND ".join(conditions)
-            query += filters
-        else:
-            filters = ""
-
-        query += " ORDER BY transaction_id DESC"
-        cursor.execute(query, params)
-        records = cursor.fetchall()
-
-        monospaced_font = QFont("Courier New", 10)  # Use a monospaced font consolas
-        self.customer_table.setRowCount(len(records)) 
-        self.customer_table.setWordWrap(True)  # Enable word wrap
-
-        for i, row in enumerate(records):
-            for j, value in enumerate(row):
-                if j == 4:  # Index 4 corresponds to 'product_name'
-                    try:                        
-                        product_names = value.split(", ")
-                        quantities = row[5].split(", ")
-
-                        # Ensure lists are the same length
-                        if len(product_names) != len(quantities):
-                            continue  # Skip this row if there's a mismatch
-
-                        # Format product names and quantities for alignment
-                        formatted_lines = [
-                            f"{p.ljust(longest_pro_name)}  -  {q.rjust(3)}"
-                            for p, q in zip(product_names, quantities)
-                        ]
-                        combined_text = "\n".join(formatted_lines)
-
-                        cell_value = QTableWidgetItem(combined_text)
-                        cell_value.setFont(monospaced_font)  # Set monospaced font
-                        cell_value.setTextAlignment(Qt.AlignLeft | Qt.AlignTop)
-                        
-                        # Allow cell to expand vertically
-                        self.customer_table.setItem(i, j, cell_value)
-                    
-                    except:
-                        pass
-
-                elif j == 5:  # Skip quantity column (index 5)
-                    continue
-                else:
-                    if j > 5:
-                        j -= 1
-                    cell_value = QTableWidgetItem(str(value))
-                    self.customer_table.setItem(i, j, cell_value)
-
-        # Resize row heights to fit contents
-        self.customer_table.resizeRowsToContents()
-
-        cursor.execute("SELECT SUM(remaining_debt) FROM customers"+filters, params)
-        result = cursor.fetchone()
-        total_outstanding = result[0] if result and result[0] else 0
-
-        cursor.execute("SELECT SUM(total_paid) FROM customers"+filters, params)
-        result = cursor.fetchone()
-        total_paid = result[0] if result and result[0] else 0
-
-        self.summary_label.setText(f"<b> <font color='blue' size =3> Total Paid: {currency_symbol} {total_paid:.2f} </font> | <font color='red' size =3 >Total Outstanding: {currency_symbol} {total_outstanding:.2f} </font>  | <font size=3 color='green' >Total Sales Value: {currency_symbol} {total_outstanding+total_paid:.2f}</font></b>")
-
-        conn.close()
+        def apply(result):
+            self.longest_product_name, first_page, total_paid, total_outstanding = result
+            self.customer_table.load(self.data, query, params, first_page)
+            self.summary_label.setText(f"<b> <font color='blue' size =3> Total Paid: {currency_symbol} {total_paid:.2f} </font> | <font color='red' size =3 >Total Outstanding: {currency_symbol} {total_outstanding:.2f} </font>  | <font size=3 color='green' >Total Sales Value: {currency_symbol} {total_outstanding+total_paid:.2f}</font></b>")
+
+        return self.data, job, apply
+
+    def load_search(self):        
+        """Load payments based on filters and update summary statistics."""
+        self.search_filter.run_now()
 
         
         
@@ -265,67 +214,22 @@ class CustomersWindow(QWidget ):
 
     def load_customers(self):
         """ Fetch customer records and update the table """ 
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
+        self.search_filter.cancel()  # a search still running would replace this list
+        query, params = queries.customers(self.checkbox_debtors.isChecked())
 
-        cursor.execute("SELECT item_name FROM inventory")
-        itemss = cursor.fetchall()
-        longest_pro_name = max(len(p[0]) for p in itemss) if itemss else 1
+        def job(conn):
+            return self.longest_product_name_in(conn), self.customer_table.read_page(conn, query, params)
 
-        try:
-            if self.checkbox_debtors.isChecked():
-                cursor.execute("SELECT name, transaction_id, contact, location, product_name, quantity, total_owed, total_paid, remaining_debt, transaction_date FROM customers WHERE remaining_debt > 0 ORDER BY remaining_debt DESC")
-            else:
-                cursor.execute("SELECT name, transaction_id, contact, location, product_name, quantity, total_owed, total_paid, remaining_debt, transaction_date FROM customers ORDER BY name ASC")
-
-            rows = cursor.fetchall()
-            self.customer_table.setRowCount(len(rows))
-
-            monospaced_font = QFont("Courier New", 10)  # Use a monospaced font
-
-            for i, row in enumerate(rows):
-                for j, value in enumerate(row):
-                    if j == 4:  # Index 4 corresponds to 'product_name'
-                        try:                            
-                            product_names = value.split(", ")
-                            quantities = row[5].split(", ")
-
-                            # Ensure lists are the same length
-                            if len(product_names) != len(quantities):
-                                continue  # Skip this row if there's a mismatch
-
-                            # Format product names and quantities for alignment
-                            formatted_lines = [
-                                f"{p.ljust(longest_pro_name)}  -  {q.rjust(3)}"
-                                for p, q in zip(product_names, quantities)
-                            ]
-                            combined_text = "\n".join(formatted_lines)
-
-                            cell_value = QTableWidgetItem(combined_text)
-                            cell_value.setFont(monospaced_font)  # Set monospaced font
-                            cell_value.setTextAlignment(Qt.AlignLeft | Qt.AlignTop)
-                            self.customer_table.setItem(i, j, cell_value)
-                        except:
-                            pass
-
-                    elif j == 5:  # Skip quantity column (index 5)
-                        continue
-                    else:
-                        if j > 5:
-                            j -= 1
-                        cell_value = QTableWidgetItem(str(value))
-                        self.customer_table.setItem(i, j, cell_value)
-
-            self.customer_table.viewport().update()
-
-        except sqlite3.Error as e:
+        def apply(result):
+            self.longest_product_name, first_page = result
+            self.customer_table.load(self.data, query, params, first_page)
+
+        def failed(e):
             QMessageBox.critical(self, "Database Error", f"Error loading customers: {str(e)}")
 
-        finally:
-            conn.close()
+        # Same channel as the search, so whichever was asked for last is shown
+        executor.submit(self.data, job, apply, self.search_filter, failed)
 
-    
-    
     def reverse_transaction(self):
         """ Reverse a selected transaction and restore previous state. """
         selected_row = self.customer_table.currentRow()
@@ -333,9 +237,9 @@ class CustomersWindow(QWidget ):
             QMessageBox.warning(self, "Error", "Please select a payment to reverse.")
             return
 
-        trans_id = self.customer_table.item(selected_row, 1).text()  # Get transaction ID and payment date 
-        customer = self.customer_table.item(selected_row, 0).text()  # Get customer name
-        amount_paid = float(self.customer_table.item(selected_row, 6).text())  # Get paid amount 
+        trans_id = self.customer_table.text(selected_row, 1)  # Get transaction ID and payment date 
+        customer = self.customer_table.text(selected_row, 0)  # Get customer name
+        amount_paid = float(self.customer_table.text(selected_row, 6))  # Get paid amount 
 
         # Admin Authentication
         password, ok = QInputDialog.getText(self, "Admin Authentication", "Enter Your Password:", QLineEdit.Password)
@@ -351,47 +255,74 @@ class CustomersWindow(QWidget ):
         if confirm != QMessageBox.Yes:
             return
 
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
         
         
-        #fetch quantity and product name from customers table 
-        cursor.execute("SELECT * FROM customers WHERE transaction_id = ?", (trans_id,))
-        cus = cursor.fetchone()
-        product, quantity = cus[5], cus[7] 
-        # update inventory by adding back the quantity
-        # first check if customer bought multiple products 
-        try:
-            product = product.split(", ")  # split products
-            quantity = list(map(int, quantity.split(", ")))
-            #unit_cost = list(map(float, unit_cost.split(", ")))
-            for i, item in enumerate(product):
-                cursor.execute("""UPDATE inventory SET  quantity_issued = quantity_issued - ?,
-                            quantity_remaining = quantity_remaining + ?
-                            WHERE item_name = ?""", 
-                            (quantity[i], quantity[i], item)
-                            )
-                log = f"{self.main_window.user_manager.logged_in_user} updated inventories owing to reverse of transaction transaction id: {trans_id}."
-                log_text(log)
-        except:
-            pass
-            
-        # delete customer record
-        cursor.execute("DELETE FROM customers WHERE transaction_id = ?", (trans_id,))
-        # delete payment record
-        cursor.execute("DELETE FROM payments WHERE transaction_id =  ?", (trans_id,))
-        conn.commit()
-        conn.close()
+        lines = sale_lines.read(conn, trans_id)
+        # One transaction on the shared connection: committed together, or rolled back if any write fails
+        with conn:
+            # put the quantities sold back into stock
+            cursor.executemany("""UPDATE inventory SET quantity_issued = quantity_issued - ?,
+                                  quantity_remaining = quantity_remaining + ?
+                                  WHERE item_name = ?""",
+                               [(quantity, quantity, item) for item, _, quantity, _ in lines])
+
+            # delete customer record
+            cursor.execute("DELETE FROM customers WHERE transaction_id = ?", (trans_id,))
+            sale_lines.delete(cursor, trans_id)
+            # delete payment record
+            cursor.execute("DELETE FROM payments WHERE transaction_id =  ?", (trans_id,))
+        db_manager.manager.notify_changed(self.data, customer)
+        if lines:
+            log = f"{self.main_window.user_manager.logged_in_user} updated inventories owing to reverse of transaction transaction id: {trans_id}."
+            audit.record(self.main_window.user_manager.logged_in_user, audit.STOCK_RETURN, log, trans_id)
         
         log = f"{self.main_window.user_manager.logged_in_user} reversed transaction id: {trans_id}."
-        log_text(log)
+        audit.record(self.main_window.user_manager.logged_in_user, audit.TRANSACTION_REVERSAL, log, trans_id, amount_paid)
         self.load_customers()  # Refresh table
         QMessageBox.information(self, "Success", "Transaction reversed successfully.")
         return
           
         
+    def send_debt_reminders(self):
+        """ Queue an SMS to every debtor; the SMS dispatcher sends them in the background. """
+        template, ok = QInputDialog.getMultiLineText(self, "Debt Reminders",
+                                                     "Message ({name}, {debt} and {company} are filled in per debtor;\n"
+                                                     "a message without them goes out in bulk):", DEBT_REMINDER)
+        if not ok or not template.strip():
+            return
+        company = self.main_window.company_name
+        query, params = queries.debtors()
+
+        def job(conn):
+            return conn.execute(query, params).fetchall()
+
+        def apply(rows):
+            try:
+                messages = [(contact, template.format(name=name, debt=debt, company=company)) for contact, name, debt in rows]
+            except (KeyError, IndexError, ValueError) as e:
+                QMessageBox.warning(self, "Debt Reminders", f"The message has an unknown placeholder: {e}")
+                return
+            if not messages:
+                QMessageBox.information(self, "Debt Reminders", "No debtor with a contact number.")
+                return
+            confirm = QMessageBox.question(self, "Debt Reminders", f"Send a reminder to {len(messages)} debtors?",
+                                           QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if confirm != QMessageBox.Yes:
+                return
+            sms_dispatcher.dispatcher.enqueue_many(self.data, messages)
+            audit.record(self.main_window.user_manager.logged_in_user, audit.SMS_BULK,
+                         f"{self.main_window.user_manager.logged_in_user} queued debt reminders to {len(messages)} debtors.")
+            QMessageBox.information(self, "Debt Reminders", f"{len(messages)} reminders queued; they are sent in the background.")
+
+        def failed(e):
+            QMessageBox.critical(self, "Database Error", f"Error reading debtors: {str(e)}")
+
+        executor.submit(self.data, job, apply, on_error=failed)
+
     def add_column_if_not_exists(self, table_name, column_name, column_type):
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
         
         # Check if the column exists
@@ -404,6 +335,4 @@ class CustomersWindow(QWidget ):
             conn.commit()
             print(f"Column '{column_name}' added to '{table_name}'.")
         else:
-            pass # print(f"Column '{column_name}' already exists in '{table_name}'.")
-
-        conn.close()        
\ No newline at end of file
+            pass # print(f"Column '{column_name}' already exists in '{table_name}'.")
\ No newline at end of file
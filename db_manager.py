@@ -0,0 +1,217 @@
+import os
+import sqlite3
+import urllib.request
+from contextlib import contextmanager
+
+import migrations
+
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+PAGE_CACHE_KIB = 16384  # 16 MB page cache per connection
+BUSY_TIMEOUT_MS = 5000
+
+# Durability setting (Options > Preferences) -> PRAGMA synchronous.
+# In WAL mode NORMAL never corrupts the file; at worst the last commits
+# before a power cut are lost. FULL syncs the WAL on every commit.
+# Files on a network drive keep the rollback journal, always with FULL.
+SYNCHRONOUS = {"durability": "FULL", "throughput": "NORMAL"}
+DEFAULT_DURABILITY = "throughput"
+DRIVE_REMOTE = 4  # GetDriveTypeW() of a mapped network drive
+
+
+def is_remote(path):
+    """Whether `path` is on a network share: a UNC path, or on Windows a mapped network drive."""
+    path = os.path.abspath(path)
+    if path.startswith(("\\\\", "//")):
+        return True
+    if os.name != "nt":
+        return False
+    import ctypes
+    drive = os.path.splitdrive(path)[0]
+    return bool(drive) and ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+
+
+class ConnectionManager:
+    """Owns one long-lived connection per database file.
+
+    Windows used to call sqlite3.connect() in every method and close it a few
+    lines later. They now ask the manager for the shared connection of their
+    database file and leave it open; the manager closes it when the main window
+    switches to another file or exits.
+    """
+
+    def __init__(self):
+        self._connections = {}
+        self.durability = DEFAULT_DURABILITY
+        self.opens = 0  # total connections opened since start-up
+        self.action_opens = {}  # user action -> connections opened during it
+        self.last_action = None
+        self._listeners = []
+        self._closing = []
+        self._remote = set()  # keys of the open files that are on a network drive
+
+    def key(self, path):
+        """Normalised form of `path`, the same for every spelling of one file."""
+        return os.path.normcase(os.path.abspath(path))
+
+    def connect(self, path):
+        """Return the shared connection for `path`, opening, migrating and repairing it on first use."""
+        key = self.key(path)
+        conn = self._connections.get(key)
+        if conn is None:
+            conn = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+            if is_remote(path):
+                self._remote.add(key)
+            self._configure(conn, key in self._remote)
+            migrations.migrate(conn)  # bring older files up to the current schema
+            migrations.repair_derived_tables(conn)  # an import or merge cut short leaves its triggers dropped
+            self._connections[key] = conn
+            self.opens += 1
+        return conn
+
+    def _configure(self, conn, remote=False):
+        """Put a local store database in WAL mode so readers no longer block on writers.
+
+        WAL keeps its index in shared memory, which only works when every
+        client is on the same machine. SQLite cannot tell that a file is on a
+        network drive, and two PCs using WAL on one shared file can corrupt it.
+        So a `remote` file (see is_remote) is put back to the rollback journal
+        (the mode is stored in the file, and a local open may have set WAL),
+        and it always syncs every commit.
+        """
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA journal_mode = {'DELETE' if remote else 'WAL'}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous(remote)}")
+        conn.execute(f"PRAGMA cache_size = -{PAGE_CACHE_KIB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+    def set_durability(self, mode):
+        """Switch between 'durability' and 'throughput' on every open connection."""
+        if mode not in SYNCHRONOUS:
+            mode = DEFAULT_DURABILITY
+        self.durability = mode
+        for key, conn in self._connections.items():
+            conn.execute(f"PRAGMA synchronous = {self.synchronous(key in self._remote)}")
+
+    def synchronous(self, remote):
+        return "FULL" if remote else SYNCHRONOUS[self.durability]
+
+    def checkpoint(self, path=None, mode="PASSIVE"):
+        """Copy WAL pages back into the database file.
+
+        PASSIVE never waits on readers or writers and is what the idle
+        scheduler runs; TRUNCATE also empties the -wal file and is used before
+        the database file itself is copied.
+        """
+        if path is None:
+            connections = list(self._connections.values())
+        elif self.is_open(path):
+            connections = [self._connections[self.key(path)]]
+        else:
+            return
+        for conn in connections:
+            if not conn.in_transaction:
+                conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+    def is_open(self, path):
+        return self.key(path) in self._connections
+
+    def close(self, path):
+        """Close the shared connection of `path` (e.g. before deleting the file)."""
+        for callback in list(self._closing):
+            callback(path)
+        self._remote.discard(self.key(path))
+        conn = self._connections.pop(self.key(path), None)
+        if conn is not None:
+            conn.close()
+            self.notify_changed(path)
+
+    def close_all(self):
+        for callback in list(self._closing):
+            callback(None)
+        for key, conn in list(self._connections.items()):
+            conn.close()
+            self.notify_changed(key)
+        self._connections.clear()
+        self._remote.clear()
+
+    def subscribe(self, callback):
+        """Call `callback(key, customer)` whenever a write touches customer records or stock.
+
+        `key` is the changed file as returned by key(); `customer` is the
+        customer name, or None when any customer may be affected.
+        """
+        self._listeners.append(callback)
+
+    def subscribe_close(self, callback):
+        """Call `callback(path)` before the file at `path` (None: every file) is closed.
+
+        For the other holders of connections to a file, such as the query
+        executor's pool threads, so that nothing keeps it open once close()
+        returns and it can be deleted (Windows refuses while a handle is open).
+        """
+        self._closing.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def notify_changed(self, path, customer=None):
+        """Announce a committed write to `customer`'s sales or payments, or to the stock, in `path`."""
+        for callback in list(self._listeners):
+            callback(self.key(path), customer)
+
+    def switch(self, old_path, new_path):
+        """Swap the shared connection when the main window changes database file."""
+        if old_path and self.key(old_path) != self.key(new_path):
+            self.close(old_path)
+        return self.connect(new_path)
+
+    @contextmanager
+    def action(self, name):
+        """Count the connections opened while a user action runs."""
+        start = self.opens
+        try:
+            yield
+        finally:
+            opened = self.opens - start
+            self.action_opens[name] = self.action_opens.get(name, 0) + opened
+            self.last_action = (name, opened)
+
+    def report(self):
+        """Return a summary of connection opens per user action, and those of the last one."""
+        actions = ", ".join(f"{name}: {count}" for name, count in sorted(self.action_opens.items()))
+        summary = f"Connections opened: {self.opens} ({actions or 'no actions recorded'})"
+        if self.last_action is not None:
+            summary += "\nLast action: {} opened {}".format(*self.last_action)
+        return summary
+
+
+manager = ConnectionManager()
+
+
+def connect(path):
+    """Shortcut for manager.connect(path)."""
+    return manager.connect(path)
+
+
+def reader_uri(path):
+    """The read-only file: URI of `path`.
+
+    The authority is left empty: a UNC path becomes file:////server/share/...
+    (Path.as_uri() gives file://server/share/..., which SQLite refuses with
+    "invalid uri authority") and a drive path file:///C:/...
+    """
+    return "file:" + urllib.request.pathname2url(os.path.abspath(path)) + "?mode=ro"
+
+
+def open_reader(path, check_same_thread=True):
+    """Open a read-only connection for a worker thread.
+
+    The shared connections belong to the GUI thread. Workers get their own,
+    and in WAL mode their reads never wait on the GUI's writes.
+    """
+    conn = sqlite3.connect(reader_uri(path), uri=True, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=check_same_thread)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{PAGE_CACHE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
@@ -1,4 +1,4 @@
-import sys, csv, pandas as pd
+import sys, csv
 import sqlite3, os, subprocess
 import hashlib 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QDoubleSpinBox,
@@ -7,12 +7,13 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget,
 from PyQt5.QtCore import Qt, QTimer, QDate, QStringListModel
 from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QTextEdit, QGroupBox, QAction, QSizePolicy, QCompleter
 from PyQt5.QtGui import QPalette, QDoubleValidator
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 from PyQt5.QtGui import QRegExpValidator
 from PyQt5.QtCore import QRegExp
 
 from datetime import datetime
 from contextlib import contextmanager
+import db_manager
+import sale_lines
 
 class TransactionIDGenerator:
     def __init__(self, db_path):
@@ -21,14 +22,14 @@ class TransactionIDGenerator:
 
     @contextmanager
     def _get_cursor(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA busy_timeout = 5000")  # Handle concurrent access
+        """Context manager for the shared database connection"""
+        conn = db_manager.connect(self.db_path)  # busy_timeout set by db_manager
         try:
             yield conn.cursor()
             conn.commit()
-        finally:
-            conn.close()
+        except Exception:
+            conn.rollback()
+            raise
 
     def _init_sequence_table(self):
         """Create sequence table if not exists"""
@@ -47,7 +48,8 @@ class TransactionIDGenerator:
 
         with self._get_cursor() as cursor:
             # Start immediate transaction to lock the database
-            cursor.execute("BEGIN IMMEDIATE")
+            if not cursor.connection.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
             
             # Get or create today's sequence
             cursor.execute("""
@@ -142,23 +144,15 @@ class EditTransactionWindow(QDialog):
 
     def load_products(self):
         """Load products into table.""" 
-        conn = sqlite3.connect(self.database)
+        conn = db_manager.connect(self.database)
         cursor = conn.cursor()
         cursor.execute("SELECT DISTINCT item_name FROM inventory")
         product_names = [row[0] for row in cursor.fetchall()] 
         
-        previous_param = [self.transaction_data[x] for x in range(4,7)]
-        previous_selected_products = previous_param[0].split(", ")
-        previous_selected_qty = previous_param[1].split(", ")
-        previous_selected_bulk_discount = previous_param[2].split(", ") 
-                
-        # Create a dictionary mapping items in list_two to their corresponding values in list_three
-        value_map = dict(zip(previous_selected_products, zip(previous_selected_qty, previous_selected_bulk_discount)))
-        #print(value_map)
-        # Generate list_four by checking each item in list_one against the mapping
-        list_four = [value_map.get(item, [0,0]) for item in product_names]
-        self.previous_combination = list_four                                  
-        conn.close()
+        # item -> (quantity, bulk discount) sold in this transaction
+        self.previous_lines = {item: (quantity, bulk_discount)
+                               for item, _, quantity, bulk_discount in sale_lines.read(conn, self.trans_id)}
+        list_four = [self.previous_lines.get(item, (0, 0)) for item in product_names]
 
         self.product_table.setRowCount(len(product_names))
         
@@ -199,83 +193,68 @@ class EditTransactionWindow(QDialog):
         location = self.customer_location.text().strip()
         contact = self.customer_contact.text().strip()
 
-        conn = sqlite3.connect(self.database)
+        conn = db_manager.connect(self.database)
         cursor = conn.cursor()
 
         selection = self.get_selected_products()
         total_owed = 0
-        insufficient_stock_items = []
-        items = ""
-        qty = ""
-        b_disc = "" 
-        u_price = ""  
-        
-        for i, row in enumerate(selection):
-            item, quantity, bulk_discount  = row
-            if quantity <=0: continue 
+        lines = []
+        sold = {}  # item -> quantity in the edited transaction
+        stock = {}  # item -> quantity remaining in inventory
+
+        for item, quantity, bulk_discount in selection:
+            if quantity <= 0:
+                continue
             cursor.execute("SELECT unit_price, quantity_remaining FROM inventory WHERE item_name = ?", (item,))
-            result = cursor.fetchone() 
-            if quantity > result[1]:
-                QMessageBox.warning(self, "Stock Warning", f"Not enough stock for: {', '.join(insufficient_stock_items)}. These items were not added.")     
-                conn.close()
-                return
-                
-            if quantity <= result[1]:
-                #items.append(item) # json.dumps(items) 
-                adder = ", "
-                items += item + adder 
-                qty += str(quantity) + adder 
-                b_disc += str(bulk_discount) + adder 
-                u_price += str(result[0]) + adder 
-                                        
-                if not result:
-                    QMessageBox.warning(self, "Error", f"Item '{item}' not found in inventory.")
-                    continue
-                if quantity <= 0: continue
-                
-                unit_price, stock_remaining = result
-                if quantity > stock_remaining:
-                    insufficient_stock_items.append(item)
-                    continue  # Skip this item
-                
-                applied_price = unit_price
-                if bulk_discount > 0:
-                    applied_price = bulk_discount  
-                item_total = quantity * applied_price
-                total_owed += item_total  # Accumulate total owed 
-
-                prev_qty = int(self.previous_combination[i][0])
-                new_qty = quantity - prev_qty
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity_issued = quantity_issued + ?, quantity_remaining = quantity_remaining - ? 
-                    WHERE item_name = ?
-                """, (new_qty, new_qty, item)) 
+            result = cursor.fetchone()
+            if not result:
+                QMessageBox.warning(self, "Error", f"Item '{item}' not found in inventory.")
+                continue
+            unit_price, stock[item] = result
+            sold[item] = sold.get(item, 0) + quantity
+
+            applied_price = unit_price
+            if bulk_discount > 0:
+                applied_price = bulk_discount
+            total_owed += quantity * applied_price  # Accumulate total owed
+            lines.append((item, unit_price, quantity, bulk_discount))
+
+        # Only the difference to what was sold before leaves (or returns to) stock
+        changes = {item: sold.get(item, 0) - self.previous_lines.get(item, (0, 0))[0]
+                   for item in set(sold) | set(self.previous_lines)}
+        insufficient_stock_items = [item for item, change in changes.items() if change > 0 and change > stock[item]]
+        if insufficient_stock_items:
+            QMessageBox.warning(self, "Stock Warning", f"Not enough stock for: {', '.join(insufficient_stock_items)}. The transaction was not changed.")
+            return
 
+        remaining_debt = total_owed - float(self.transaction_data[3])
+        items = sale_lines.label(lines)
 
-        if insufficient_stock_items:
-            QMessageBox.warning(self, "Stock Warning", f"Not enough stock for: {', '.join(insufficient_stock_items)}. These items were not added.")
-
-        remaining_debt = total_owed - int(self.transaction_data[7])
-        items,u_price,qty,b_disc = items[:-2],u_price[:-2],qty[:-2], b_disc[:-2]
-                
-        cursor.execute("""
-            UPDATE customers SET name= ?, location=?, contact=?, product_name=?, unit_price=?, quantity=?, bulk_discount=?, total_owed =?,  remaining_debt = ? 
-            WHERE transaction_id = ?  
-        """, (name, location, contact, items,u_price,qty,b_disc, total_owed, remaining_debt, self.transaction_data[8]))
+        # One transaction on the shared connection: committed together, or rolled back if any write fails
+        with conn:
+            cursor.executemany("""
+                UPDATE inventory 
+                SET quantity_issued = quantity_issued + ?, quantity_remaining = quantity_remaining - ? 
+                WHERE item_name = ?
+            """, [(change, change, item) for item, change in changes.items() if change])
+
+            cursor.execute("""
+                UPDATE customers SET name= ?, location=?, contact=?, product_name=?, total_owed =?,  remaining_debt = ? 
+                WHERE transaction_id = ?  
+            """, (name, location, contact, items, total_owed, remaining_debt, self.trans_id))
+            sale_lines.write(cursor, self.trans_id, lines)
         
-        #update payments table
-        '''
-        cursor.execute("""
-            UPDATE payments SET customer_name= ?, item_name=? 
-            WHERE transaction_id = ? AND entry_date_and_time = ?
-        """, (name,   items, self.transaction_data[9], self.transaction_data[10]))'''        
-        cursor.execute("""
-            UPDATE payments SET customer_name= ?, item_name=? 
-            WHERE transaction_id = ?
-        """, (name,   items, self.transaction_data[8]))
-        conn.commit()
-        conn.close()
+            #update payments table
+            '''
+            cursor.execute("""
+                UPDATE payments SET customer_name= ?, item_name=? 
+                WHERE transaction_id = ? AND entry_date_and_time = ?
+            """, (name,   items, self.transaction_data[9], self.transaction_data[10]))'''        
+            cursor.execute("""
+                UPDATE payments SET customer_name= ?, item_name=? 
+                WHERE transaction_id = ?
+            """, (name,   items, self.trans_id))
+        db_manager.manager.notify_changed(self.database)  # the customer may have been renamed
 
         QMessageBox.information(self, "Success", "Transaction updated successfully.")
         self.accept()  # Close window
@@ -283,7 +262,7 @@ class EditTransactionWindow(QDialog):
         
     def load_customer_suggestions(self):
         """ Load customer data for auto-completion and set up bi-directional auto-fill """
-        conn = sqlite3.connect(self.database)
+        conn = db_manager.connect(self.database)
         cursor = conn.cursor()
 
         try:
@@ -324,9 +303,6 @@ class EditTransactionWindow(QDialog):
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Database Error", f"Error loading customers: {str(e)}")
 
-        finally:
-            conn.close()
-
     def update_from_name(self):
         """ Auto-fill contact & location when customer name is changed """
         customer_name = self.customer_name.text().strip()
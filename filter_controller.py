@@ -0,0 +1,52 @@
+"""Debounced, cancellable search for the filter boxes.
+
+The search boxes used to re-run their query and rebuild the table on every
+keystroke. A FilterController waits until typing pauses, runs the query on
+the shared query_executor pool, interrupts a query that a newer keystroke
+has made pointless, and applies only the result of the latest one.
+"""
+from PyQt5.QtCore import QObject, QTimer
+
+from query_executor import executor
+
+FILTER_DELAY_MS = 250  # pause in typing before the query runs
+
+
+class FilterController(QObject):
+    """Runs one window's filter query off the GUI thread.
+
+    `prepare()` is called on the GUI thread once the input settles and returns
+    (database, job, apply): `job(conn)` runs on a pool thread and returns a
+    result, `apply(result)` gets that result back on the GUI thread unless a
+    newer request has been made in the meantime.
+    """
+
+    def __init__(self, prepare, delay_ms=FILTER_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.prepare = prepare
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.submit)
+
+    def schedule(self, *args):
+        """Restart the debounce timer; connect textChanged and friends here."""
+        self.timer.start()
+
+    def submit(self):
+        database, job, apply = self.prepare()
+        executor.submit(database, job, apply, self)
+
+    def run_now(self):
+        """Run the query without waiting for typing to pause (initial loads, refresh after a write)."""
+        self.timer.stop()
+        self.submit()
+
+    def cancel(self):
+        """Forget pending results and stop the query that is running."""
+        self.timer.stop()
+        executor.cancel(self)
+
+    def close(self):
+        """Drop everything outstanding (for controllers owned by a dialog)."""
+        self.cancel()
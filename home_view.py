@@ -1,19 +1,9 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout, QMenu, QAction, QGridLayout
 from PyQt5.QtGui import QFont, QPixmap
 from PyQt5.QtCore import Qt
-import datetime, os,sys
+import os,sys
 
 
-
-def log_text(text):
-    # Get the current timestamp
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Open the file in append mode (creates the file if it doesn't exist)
-    with open("log.txt", "a") as file:
-        # Write the timestamp followed by the input text
-        file.write(f"[{timestamp}] {text}\n")
-
 class HomeView(QWidget):
     def __init__(self, main_window, user_manager):
         super().__init__()
@@ -186,7 +176,6 @@ class HomeView(QWidget):
         #self.bg_label.setGeometry(0, 0, self.width(), self.height())
 
 
-
 def resource_path(relative_path):
     """ Get the absolute path to a resource, works for PyInstaller """
     if getattr(sys, 'frozen', False):  # If the app is run as a bundled executable
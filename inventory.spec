@@ -5,7 +5,7 @@ a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[('rosemer.jpg', '.')],
+    datas=[('rosemer.jpg', '.'), ('stylesheets/*.qss', 'stylesheets')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
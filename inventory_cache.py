@@ -0,0 +1,52 @@
+"""Inventory prices and stock held in memory for the sales dialog.
+
+SalesWindow.calculate_total_due used to run SELECT unit_price FROM inventory
+on every spin-box change and match the result to the product table by row
+position. An InventoryCache reads the inventory once, keeps it by item id,
+and is read again only after db_manager announces a write to the file.
+"""
+import db_manager
+
+
+class InventoryCache:
+    """Item id -> (item_name, unit_price, quantity_remaining) of one database file.
+
+    `on_change()` is called after another window committed a write to the
+    file, so the owner can refresh whatever it computed from the cache.
+    Call close() when the owner goes away.
+    """
+
+    def __init__(self, database, on_change=None):
+        self.database = database
+        self.key = db_manager.manager.key(database)
+        self.on_change = on_change
+        self.items = {}
+        self.stale = True
+        db_manager.manager.subscribe(self.changed)
+
+    def reload(self):
+        conn = db_manager.connect(self.database)
+        rows = conn.execute("SELECT id, item_name, unit_price, quantity_remaining FROM inventory ORDER BY id").fetchall()
+        self.items = {row[0]: row[1:] for row in rows}
+        self.stale = False
+
+    def snapshot(self):
+        """{item id: (item_name, unit_price, quantity_remaining)}, in inventory order."""
+        if self.stale:
+            self.reload()
+        return self.items
+
+    def price(self, item_id):
+        item = self.snapshot().get(item_id)
+        return (item[1] or 0) if item else 0
+
+    def changed(self, key, customer=None):
+        if key != self.key:
+            return
+        self.stale = True
+        # A file being closed announces itself too; reading it would reopen it
+        if self.on_change is not None and db_manager.manager.is_open(self.database):
+            self.on_change()
+
+    def close(self):
+        db_manager.manager.unsubscribe(self.changed)
@@ -1,16 +1,8 @@
 from PyQt5.QtWidgets import QMessageBox, QMainWindow, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton
 from user_mgt import UserManager
-import datetime, os
-from themes import *
-
-def log_text(text):
-    # Get the current timestamp
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Open the file in append mode (creates the file if it doesn't exist)
-    with open("log.txt", "a") as file:
-        # Write the timestamp followed by the input text
-        file.write(f"[{timestamp}] {text}\n")
+import os
+import audit
+import themes
 
 
 class LoginWindow(QMainWindow):
@@ -51,11 +43,11 @@ class LoginWindow(QMainWindow):
         if self.user_manager.authenticate_user(username, password):
             self.open_main_window()
             log = f"{username} Logged in."
-            log_text(log)
+            audit.record(username, audit.LOGIN, log)
             #QMessageBox.information(self, "Success", f"Welcome {username}!")
         else:      
             log = f"{username} attempted to log in but failed"
-            log_text(log)
+            audit.record(username, audit.LOGIN_FAILED, log)
             QMessageBox.warning(self, "Login Failed", "Invalid credentials!")      
             
     def showEvent(self, event):
@@ -65,58 +57,12 @@ class LoginWindow(QMainWindow):
         super().showEvent(event)
     
     def set_theme(self, theme):
-        """ Apply the selected theme """
-        if theme == "light":
-            self.setStyleSheet(LIGHT_THEME)
-        if theme == "sunset_glo":
-            self.setStyleSheet(SUNSET_GLOW)
-        if theme == "neon_nit":
-            self.setStyleSheet(NEON_NIGHTS)
-        if theme == "galaxy":
-            self.setStyleSheet(GALAXY_EXPLORER)
-        elif theme == "dark":
-            self.setStyleSheet(DARK_THEME)
-        elif theme == "system":
-            self.setStyleSheet("")  # Uses system default
-        elif theme == "dark1":
-            self.setStyleSheet(DARK_THEME_1)
-        elif theme == "dark2":
-            self.setStyleSheet(DARK_THEME_2)
-        elif theme == "light1":
-            self.setStyleSheet(LIGHT_THEME_1)
-        elif theme == "light2":
-            self.setStyleSheet(LIGHT_THEME_2)
-        elif theme == "neon":
-            self.setStyleSheet(NEON_CYBERPUNK)
-        elif theme == "electric":
-            self.setStyleSheet(ELECTRIC_FOREST)
-        elif theme == "sunset":
-            self.setStyleSheet(SUNSET_GRADIENT)
-        elif theme == "ocean":
-            self.setStyleSheet(OCEAN_DEPTHS)
-        elif theme == "candy":
-            self.setStyleSheet(CANDY_LAND)
-        elif theme == "material":
-            self.setStyleSheet(MATERIAL_DARK)
-        elif theme == "fiber":
-            self.setStyleSheet(FIBERS)
-        elif theme == "combi":
-            self.setStyleSheet(COMBINEAR)
-        elif theme == "mac":
-            self.setStyleSheet(MAC)
-
-        # Save theme choice
-        with open("theme_settings.txt", "w") as file:
-            file.write(theme)
+        """ Apply the selected theme to the whole application and save the choice """
+        themes.choose(theme)
 
     def load_theme(self):
         """ Load the last used theme from settings """
-        if os.path.exists("theme_settings.txt"):
-            with open("theme_settings.txt", "r") as file:
-                theme = file.read().strip()
-                self.set_theme(theme)
-        else:
-            self.set_theme('fiber')
+        themes.apply_saved()
 
 
     def open_main_window(self):
@@ -1,6 +1,6 @@
-import sqlite3, os, csv, shutil
+import sqlite3, os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, 
-                             QMessageBox, QTableWidget, QTableWidgetItem, QHBoxLayout, QComboBox, QTextEdit, QDialog, QSpinBox, QDateEdit, QDialogButtonBox, QCheckBox, QMenuBar, QMenu, QFileDialog)
+                             QMessageBox, QTableWidget, QTableWidgetItem, QHBoxLayout, QComboBox, QTextEdit, QDialog, QSpinBox, QDateEdit, QDialogButtonBox, QCheckBox, QMenuBar, QMenu, QFileDialog, QProgressBar)
 
 from PyQt5.QtCore import Qt, QTimer, QDate, QStringListModel, QEvent
 from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QTextEdit, QGroupBox, QAction, QSizePolicy, QCompleter
@@ -13,16 +13,25 @@ from payment_history import PaymentHistoryWindow
 from payment import PaymentWindow
 from edit_inventory import EditInventoryDialog
 from sales import SalesWindow
-from csv_to_pdf import csv_to_pdf
 from user_mgt import UserManagementDialog
 from home_view import HomeView
-import datetime
 from import_tables import ImportTableDialog
 #from manage_customer import ManageCustomersWindow
 from customer_manage import ManageCustomersWindow
-from themes import *
+import themes
+import audit
+import db_manager
+import migrations
+import queries
+import aggregates
+from table_models import SqlTableView
+from query_executor import executor
+import sms_dispatcher
+import table_export
+import backup
 
 currency_symbol = "\u20B5"
+CHECKPOINT_IDLE_MS = 30 * 1000  # checkpoint the WAL after 30 s without user activity
 
 
 #add this method to handle dynamic tabel contect changes
@@ -40,12 +49,14 @@ class MainWindow(QMainWindow):
     def __init__(self, user_manager):
         super().__init__()
         self.user_manager = user_manager # User system integrated
+        db_manager.manager.set_durability(self.get_database_durability())
         self.create_database("_temp__.db")
         
         self.setGeometry(100, 100, 740, 450)
         self.database_name = self.get_last_opened_database()  # Load last used file or default 
         self.setWindowTitle("Home - {}".format(self.database_name))
         self.company_name = self.get_company_name()
+        audit.log.set_database(self.database_name)  # the audit trail is copied into the open file
         # Create a stacked widget to manage multiple views
         self.stacked_widget = QStackedWidget(self)
         self.setCentralWidget(self.stacked_widget)
@@ -62,23 +73,23 @@ class MainWindow(QMainWindow):
         self.inventory_view = QWidget()
         self.stacked_widget.addWidget(self.inventory_view)  # Index 0
 
-        # Create Customer View
-        self.customer_view = CustomersWindow(self.database_name, self)
-        self.stacked_widget.addWidget(self.customer_view)  # Index 1
-        
         self.window_titles = ("Inventory", "Sales Records", "Payment Records", 'Home', "Customer Records")
-        # Create Payment View
-        self.payment_history_view = PaymentHistoryWindow(self.database_name, self)
-        self.stacked_widget.addWidget(self.payment_history_view)  # Index 2
-        #Create Hove view
-        
-        self.home_view = HomeView(self, self.user_manager)
-        self.stacked_widget.addWidget(self.home_view) #index 3
-        self.stacked_widget.setCurrentIndex(3)
-        # Show the main view initially                
-        
-        self.customer_base = ManageCustomersWindow(self.database_name, self)
-        self.stacked_widget.addWidget(self.customer_base) #index 4
+        # The other views are built the first time they are shown (see view());
+        # until then an empty placeholder holds their index
+        self.views = {}
+        self.view_factories = {
+            1: lambda: CustomersWindow(self.database_name, self),          # Index 1
+            2: lambda: PaymentHistoryWindow(self.database_name, self),     # Index 2
+            3: lambda: HomeView(self, self.user_manager),                  # Index 3
+            4: lambda: ManageCustomersWindow(self.database_name, self),    # Index 4
+        }
+        for index in self.view_factories:
+            self.stacked_widget.addWidget(QWidget())
+        # Built views whose data changed since they last loaded it
+        self.dirty_views = set()
+        db_manager.manager.subscribe(self.data_changed)
+        # Show the home view initially
+        self.stacked_widget.setCurrentWidget(self.home_view)
 
         self.stacked_widget.currentChanged.connect(self.adjust_window_size)
        
@@ -87,18 +98,139 @@ class MainWindow(QMainWindow):
         self.logout_timeout = self.get_user_logout_time() * 60 * 1000  # Convert minutes to milliseconds
         self.inactivity_timer = QTimer(self)
         self.inactivity_timer.timeout.connect(self.auto_logout)
+        # Checkpoint the WAL once the counter goes quiet
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.setSingleShot(True)
+        self.checkpoint_timer.timeout.connect(db_manager.manager.checkpoint)
         self.reset_inactivity_timer()
 
         # Track user activity
         self.installEventFilter(self)
         
         self.initUI() 
+        self.init_busy_indicator()
+        self.init_sms_dispatcher()
+        self.init_snapshots()
         self.load_theme()
         
 
 
         #self._current_tables[self.inventory_tabl] 
     
+    def view(self, index):
+        """The view at `index` of the stacked widget, built on first use."""
+        view = self.views.get(index)
+        if view is None:
+            view = self.views[index] = self.view_factories[index]()
+            placeholder = self.stacked_widget.widget(index)
+            self.stacked_widget.blockSignals(True)  # currentChanged would resize for a view half swapped in
+            self.stacked_widget.insertWidget(index, view)
+            self.stacked_widget.removeWidget(placeholder)
+            self.stacked_widget.blockSignals(False)
+            placeholder.deleteLater()
+        return view
+
+    @property
+    def customer_view(self):
+        return self.view(1)
+
+    @property
+    def payment_history_view(self):
+        return self.view(2)
+
+    @property
+    def home_view(self):
+        return self.view(3)
+
+    @property
+    def customer_base(self):
+        return self.view(4)
+
+    def data_changed(self, key, customer=None):
+        """Mark the built data views stale after a write to the open file; each reloads when next shown."""
+        if key == db_manager.manager.key(self.database_name):
+            self.dirty_views.update(index for index in (1, 2, 4) if index in self.views)
+
+    def refresh_view(self, index):
+        """Reload a built view if its data changed since it was loaded."""
+        if index not in self.dirty_views or index not in self.views:
+            return
+        self.dirty_views.discard(index)
+        view = self.views[index]
+        view.data = self.database_name
+        if index == 1:
+            view.load_search()
+        elif index == 2:
+            view.load_customers()
+            view.load_payment_history()
+        elif index == 4:
+            view.load_customers()
+
+    def reload_views(self):
+        """Mark every built data view stale and reload the one on screen."""
+        self.dirty_views.update(index for index in (1, 2, 4) if index in self.views)
+        self.refresh_view(self.get_current_view())
+
+    def init_busy_indicator(self):
+        """Indeterminate progress bar in the status bar while a view is loading."""
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)
+        self.busy_indicator.setMaximumWidth(120)
+        self.busy_indicator.setTextVisible(False)
+        self.busy_indicator.hide()
+        self.statusBar().addPermanentWidget(self.busy_indicator)
+        # Only loads that take a noticeable time show it, so quick ones do not flicker
+        self.busy_timer = QTimer(self)
+        self.busy_timer.setSingleShot(True)
+        self.busy_timer.setInterval(200)
+        self.busy_timer.timeout.connect(self.busy_indicator.show)
+        executor.busy_changed.connect(self.show_busy)
+        QApplication.instance().aboutToQuit.connect(executor.shutdown)
+
+    def init_sms_dispatcher(self):
+        """Send the SMS outbox of the open file in the background and report each result in the status bar."""
+        dispatcher = sms_dispatcher.dispatcher
+        dispatcher.sent.connect(lambda sms_id, recipient: self.statusBar().showMessage(f"SMS sent to {recipient}", 5000))
+        dispatcher.retrying.connect(lambda sms_id, recipient, error: self.statusBar().showMessage(f"SMS to {recipient} not sent ({error}); will retry", 5000))
+        dispatcher.failed.connect(lambda sms_id, recipient, error: self.statusBar().showMessage(f"SMS to {recipient} failed: {error}", 10000))
+        QApplication.instance().aboutToQuit.connect(dispatcher.shutdown)
+        dispatcher.start(self.database_name)
+
+    def init_snapshots(self):
+        """Snapshot the open file every so many hours (see backup.py) and report it in the status bar."""
+        scheduler = backup.scheduler
+        scheduler.configure(*self.get_snapshot_settings())
+        scheduler.progressed.connect(lambda percent: self.statusBar().showMessage(f"Taking a snapshot... {percent}%", 2000))
+        scheduler.taken.connect(lambda path: self.statusBar().showMessage(f"Snapshot saved to {path}", 5000))
+        scheduler.failed.connect(self.snapshot_failed)
+        QApplication.instance().aboutToQuit.connect(scheduler.shutdown)
+        scheduler.set_database(self.snapshot_database())
+        scheduler.check()
+
+    def snapshot_database(self):
+        """The open file, or None for the unsaved _temp__.db which is not snapshotted."""
+        return None if self.database_name == "_temp__.db" else self.database_name
+
+    def snapshot_failed(self, error, damaged):
+        if damaged:
+            QMessageBox.warning(self, "Snapshot", f"The snapshot was not kept: {error}.\n\n"
+                                "The database file may be damaged; restore the latest good snapshot "
+                                f"from {backup.snapshot_folder(self.database_name)}.")
+        else:
+            self.statusBar().showMessage(f"Snapshot failed: {error}", 10000)
+
+    def take_snapshot(self):
+        if not backup.scheduler.take_now():
+            QMessageBox.information(self, "Snapshot", "Save the database to a file first." if self.snapshot_database() is None
+                                    else "A snapshot is already being taken.")
+
+    def show_busy(self, busy):
+        if busy:
+            self.busy_timer.start()
+        else:
+            self.busy_timer.stop()
+            self.busy_indicator.hide()
+
     def initUI(self):
         self.menubar = self.menuBar()     
         
@@ -131,6 +263,15 @@ class MainWindow(QMainWindow):
         settings_action = self.settings_menu.addAction("Preferences") 
         
         settings_action.triggered.connect(self.open_settings_dialog)
+        if self.user_manager.logged_in_role == 'Administrator':
+            check_totals_action = self.settings_menu.addAction("Check Summary Totals")
+            check_totals_action.triggered.connect(self.check_summary_totals)
+            audit_log_action = self.settings_menu.addAction("Audit Log")
+            audit_log_action.triggered.connect(self.open_audit_log)
+            snapshot_action = self.settings_menu.addAction("Take Snapshot Now")
+            snapshot_action.triggered.connect(self.take_snapshot)
+            connections_action = self.settings_menu.addAction("Connection Statistics")
+            connections_action.triggered.connect(self.show_connection_statistics)
 
         if self.user_manager.logged_in_role == 'Administrator':
             add_user_action = self.user_menu.addAction("Add User")
@@ -151,15 +292,13 @@ class MainWindow(QMainWindow):
         new_action.triggered.connect(self.new_file)
         open_action.triggered.connect(self.open_file)
         save_as_action.triggered.connect(self.save_database_as)
-        export_action.triggered.connect(lambda: self.export_to_csv("None", True))
+        export_action.triggered.connect(lambda: self.export_to_csv())
         export_pdf.triggered.connect(self.export_to_pdf)
         import_action.triggered.connect(self.import_file)
         exit_action.triggered.connect(self.closeEvent)                       
         
-        self.inventory_table = QTableWidget()
-        self.inventory_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.inventory_table.setColumnCount(7)
-        self.inventory_table.setHorizontalHeaderLabels(["Item Name", "Date Received", f"Unit Price {currency_symbol}", "Quantity Received", "Quantity Issued", "Quantity Remaining", f"Total Cost {currency_symbol}"])
+        self.inventory_table = SqlTableView(["Item Name", "Date Received", f"Unit Price {currency_symbol}", "Quantity Received", "Quantity Issued", "Quantity Remaining", f"Total Cost {currency_symbol}"])
+        self.inventory_table.setEditTriggers(SqlTableView.NoEditTriggers)
         
         # Enable sorting
         self.inventory_table.setSortingEnabled(True)
@@ -219,12 +358,57 @@ class MainWindow(QMainWindow):
             return result[0]
         return "Enter Your Company name in Settings"
 
+    def get_database_durability(self):
+        """Retrieve the durability/throughput choice for store databases."""
+        conn = sqlite3.connect(self.user_manager.database)
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM settings WHERE key='db_durability'")
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else db_manager.DEFAULT_DURABILITY
+
+    def get_snapshot_settings(self):
+        """Hours between automatic snapshots (0 for none) and how many to keep."""
+        conn = sqlite3.connect(self.user_manager.database)
+        cursor = conn.cursor()
+        cursor.execute("SELECT key, value FROM settings WHERE key IN ('snapshot_hours', 'snapshot_keep')")
+        values = dict(cursor.fetchall())
+        conn.close()
+        return int(values.get("snapshot_hours", backup.SNAPSHOT_HOURS)), int(values.get("snapshot_keep", backup.SNAPSHOT_KEEP))
+
     def open_user_management(self):
         """Open the User Management Dialog."""
         user_mgmt_dialog = UserManagementDialog(self.user_manager, self)
         user_mgmt_dialog.exec_()
              
     
+    def check_summary_totals(self):
+        """Compare the running summary totals with the sales and payments, and offer to rebuild them."""
+        conn = db_manager.connect(self.database_name)
+        problems = aggregates.check(conn)
+        if not problems:
+            QMessageBox.information(self, "Summary Totals", "All summary totals match the sales and payment records.")
+            return
+
+        shown = "\n".join(problems[:15]) + (f"\n... and {len(problems) - 15} more" if len(problems) > 15 else "")
+        reply = QMessageBox.question(self, "Summary Totals", f"{len(problems)} totals differ from the records:\n\n{shown}\n\nRebuild them now?",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if reply == QMessageBox.Yes:
+            with conn:
+                aggregates.rebuild(conn.cursor())
+            audit.record(self.user_manager.logged_in_user, audit.TOTALS_REBUILD,
+                         f"{self.user_manager.logged_in_user} rebuilt the summary totals ({len(problems)} differences)")
+            self.reload_views()
+
+    def show_connection_statistics(self):
+        """Connections opened per user action (db_manager.manager.action), to spot actions that reconnect."""
+        QMessageBox.information(self, "Connection Statistics", db_manager.manager.report())
+
+    def open_audit_log(self):
+        from audit_view import AuditLogDialog
+        dialog = AuditLogDialog(self.database_name, self)
+        dialog.exec_()
+
     def open_settings_dialog(self):
         """Open the Settings Dialog."""
         dialog = SettingsDialog(self.user_manager)
@@ -242,7 +426,10 @@ class MainWindow(QMainWindow):
         elif self.current_widget == 4 :
             table = self.customer_base.customer_records_table
             table2 = self.customer_base.transaction_history_table
-        else: table = self.payment_history_view.payment_table # PaymentHistoryWindow(self.database_name, self).payment_table 
+        elif self.current_widget == 2 or 2 in self.views:
+            table = self.payment_history_view.payment_table # PaymentHistoryWindow(self.database_name, self).payment_table 
+        else:
+            return  # the home view before any records were opened: nothing to size the window to
         
         # Get current tab's table widget
         if self.isMaximized():  
@@ -392,15 +579,16 @@ class MainWindow(QMainWindow):
         
         
     def open_payment_window(self):
-        payment_window = PaymentWindow(self.database_name,self)
-        payment_window.exec_()
-        self.load_inventory()
+        with db_manager.manager.action("payment"):
+            payment_window = PaymentWindow(self.database_name,self)
+            payment_window.exec_()
+            self.load_inventory()
     
     
     # Define open_manage_customers function in CustomersWindow
     def open_manage_customers(self):
         self.setWindowTitle("Customer Records - {}".format(self.database_name))  
-        self.customer_base.load_customers()         
+        self.refresh_view(4)
         self.file_menu.menuAction().setVisible(True)
         self.user_menu.menuAction().setVisible(False)
         self.settings_menu.menuAction().setVisible(False)
@@ -409,17 +597,14 @@ class MainWindow(QMainWindow):
         self.home_action.setVisible(True)
         self.inventory_action.setVisible(True)
         self.customers_action.setVisible(True)
-        self.stacked_widget.setCurrentIndex(4)  
+        self.stacked_widget.setCurrentWidget(self.customer_base)
         self.set_window_title()
         self.adjust_window_size()
     
         
     def open_payment_history(self):
         self.setWindowTitle("Sales/Payment Records - {}".format(self.database_name))
-        self.payment_history_view.data = self.database_name
-        #self.customer_view.load_customers()
-        self.payment_history_view.load_customers()
-        self.payment_history_view.load_payment_history()
+        self.refresh_view(2)
         self.file_menu.menuAction().setVisible(True)
         self.user_menu.menuAction().setVisible(False)
         self.settings_menu.menuAction().setVisible(False)
@@ -427,7 +612,7 @@ class MainWindow(QMainWindow):
         self.home_action.setVisible(True)
         self.inventory_action.setVisible(True)
         self.customers_action.setVisible(True)
-        self.stacked_widget.setCurrentIndex(2)
+        self.stacked_widget.setCurrentWidget(self.payment_history_view)
         #history_window = PaymentHistoryWindow(self.database_name,self)
         #history_window.exec_()
         self.set_window_title()
@@ -438,9 +623,8 @@ class MainWindow(QMainWindow):
         #self.customers_window = CustomersWindow(self.database_name)
         #self.customers_window.exec_() 
         self.setWindowTitle("Sales - {}".format(self.database_name))        
-        self.customer_view.data = self.database_name
-        self.customer_view.load_customers()
-        self.stacked_widget.setCurrentIndex(1) 
+        self.refresh_view(1)
+        self.stacked_widget.setCurrentWidget(self.customer_view)
         self.file_menu.menuAction().setVisible(True)
         self.user_menu.menuAction().setVisible(False)
         self.customers_action.setVisible(False)
@@ -469,7 +653,7 @@ class MainWindow(QMainWindow):
         
     def show_home(self):
         """Switch to Home View"""
-        self.stacked_widget.setCurrentIndex(3)
+        self.stacked_widget.setCurrentWidget(self.home_view)
         self.set_window_title()
         self.file_menu.menuAction().setVisible(False)
         self.user_menu.menuAction().setVisible(True)
@@ -486,9 +670,9 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "No item selected.")
             return
         
-        item_name = self.inventory_table.item(selected_row, 0).text()
-        current_quantity = int(self.inventory_table.item(selected_row, 3).text())
-        current_price = float(self.inventory_table.item(selected_row, 2).text())
+        item_name = self.inventory_table.text(selected_row, 0)
+        current_quantity = int(self.inventory_table.text(selected_row, 3))
+        current_price = float(self.inventory_table.text(selected_row, 2))
         
         dialog = EditInventoryDialog(item_name, current_quantity, current_price, self)
         if dialog.exec_() == QDialog.Accepted:
@@ -498,24 +682,24 @@ class MainWindow(QMainWindow):
                 return 
                 
             new_total_cost = new_quantity * new_price
-            temp_issued = self.inventory_table.item(selected_row, 4).text()
+            temp_issued = self.inventory_table.text(selected_row, 4)
             if temp_issued == "" or temp_issued == None or temp_issued == "None":
                 qty_issued = 0
             else:
-                qty_issued = int(self.inventory_table.item(selected_row, 4).text())
+                qty_issued = int(self.inventory_table.text(selected_row, 4))
             qty_remaining = new_quantity - qty_issued
             
-            conn = sqlite3.connect(self.database_name)
+            conn = db_manager.connect(self.database_name)
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE inventory 
-                SET quantity_received = ?, unit_price = ?, total_cost = ?, quantity_remaining = ?, user_logged = ?
-                WHERE item_name = ?
-            """, (new_quantity, new_price, new_total_cost, qty_remaining, self.user_manager.logged_in_user, item_name))
-            conn.commit()
-            conn.close()
+            with conn:  # rolled back on error, so the shared connection is not left mid-transaction
+                cursor.execute("""
+                    UPDATE inventory 
+                    SET quantity_received = ?, unit_price = ?, total_cost = ?, quantity_remaining = ?, user_logged = ?
+                    WHERE item_name = ?
+                """, (new_quantity, new_price, new_total_cost, qty_remaining, self.user_manager.logged_in_user, item_name))
+            db_manager.manager.notify_changed(self.database_name)
             log = f"{self.user_manager.logged_in_user} edit {item_name} in stock"
-            log_text(log)
+            audit.record(self.user_manager.logged_in_user, audit.STOCK_EDIT, log, amount=new_total_cost)
             self.load_inventory()
     
     def delete_inventory_item(self):
@@ -525,73 +709,43 @@ class MainWindow(QMainWindow):
             return
         confirm = QMessageBox.question(self, "Confirm Deletion", "Are you sure you want to delete this item?", QMessageBox.Yes | QMessageBox.No)
         if confirm == QMessageBox.Yes:
-            item_name = self.inventory_table.item(selected_row, 0).text()
-            conn = sqlite3.connect(self.database_name)
+            item_name = self.inventory_table.text(selected_row, 0)
+            conn = db_manager.connect(self.database_name)
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM inventory WHERE item_name = ?", (item_name,))
-            conn.commit()
-            conn.close()            
+            with conn:
+                cursor.execute("DELETE FROM inventory WHERE item_name = ?", (item_name,))
+            db_manager.manager.notify_changed(self.database_name)
             log = f"{self.user_manager.logged_in_user} deleted {item_name} from stock"
-            log_text(log)
+            audit.record(self.user_manager.logged_in_user, audit.STOCK_DELETE, log)
             self.load_inventory()
     
     def new_file(self):
         self.current_db = "_temp__.db"
-        conn = sqlite3.connect(self.current_db)
-        cursor = conn.cursor()
-        cursor.execute("VACUUM")  # Reset database
-        conn.commit()
-        conn.close()
         #QMessageBox.information(self, "New File", "A new inventory database has been created.")
         filepath, _ = QFileDialog.getSaveFileName(self, "Create New Database", "", "Database Files (*.db)")
         if filepath:
             try:
                 if filepath == self.database_name:
-                    os.remove(self.database_name)  
-                self.database_name = filepath
-                self.set_window_title()        
-                self.create_database(self.database_name)
-                self.customer_view.data = self.database_name
-                self.payment_history_view.data = self.database_name
-                self.customer_view.load_customers()
-                self.payment_history_view.load_customers()
-                self.payment_history_view.load_payment_history()
-                self.load_inventory()
-            except FileNotFoundError:   
-                self.set_window_title()                     
-                self.create_database(self.database_name)
-                self.customer_view.data = self.database_name
-                self.payment_history_view.data = self.database_name
-                self.customer_view.load_customers()
-                self.payment_history_view.load_customers()
-                self.payment_history_view.load_payment_history()
-                self.load_inventory()
+                    db_manager.manager.close(self.database_name)
+                    os.remove(self.database_name)
+            except FileNotFoundError:
+                pass
+            with db_manager.manager.action("new file"):
+                self.create_database(filepath)
+                self.switch_database(filepath)
                 
         
     def open_sales_window(self, parent_window):
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT item_name FROM inventory")
-        items = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        
-        self.sales_window = SalesWindow(self.database_name, parent_window)
-        self.sales_window.exec_()
-        #QMessageBox.information(self, "Info", "Sale recorded successfully!")
-        self.load_inventory()
+        with db_manager.manager.action("new sale"):
+            self.sales_window = SalesWindow(self.database_name, parent_window)
+            self.sales_window.exec_()
+            #QMessageBox.information(self, "Info", "Sale recorded successfully!")
+            self.load_inventory()
         
     
     def load_inventory(self):
-        conn = sqlite3.connect(self.database_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT item_name, date_received, unit_price, quantity_received, quantity_issued, quantity_remaining, total_cost FROM inventory")
-        rows = cursor.fetchall()
-        conn.close()
-        
-        self.inventory_table.setRowCount(len(rows))
-        for row_idx, row_data in enumerate(rows):
-            for col_idx, data in enumerate(row_data):
-                self.inventory_table.setItem(row_idx, col_idx, QTableWidgetItem(str(data)))
+        query, params = queries.inventory()
+        self.inventory_table.load_in_background(self.database_name, query, params)
     
     def open_add_inventory_dialog(self):
         self.dialog = QDialog(self)
@@ -634,19 +788,19 @@ class MainWindow(QMainWindow):
             return
         
         total_cost = float(unit_price) * int(quantity)
-        conn = sqlite3.connect(self.database_name)
+        conn = db_manager.connect(self.database_name)
         cursor = conn.cursor()
-        cursor.execute("INSERT INTO inventory (item_name, date_received, unit_price, quantity_received, quantity_remaining, total_cost, user_logged) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                       (item_name, date_received, float(unit_price), int(quantity), int(quantity), total_cost, self.user_manager.logged_in_user))
-        conn.commit()
-        conn.close()
+        with conn:
+            cursor.execute("INSERT INTO inventory (item_name, date_received, unit_price, quantity_received, quantity_remaining, total_cost, user_logged) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           (item_name, date_received, float(unit_price), int(quantity), int(quantity), total_cost, self.user_manager.logged_in_user))
+        db_manager.manager.notify_changed(self.database_name)
         self.item_name_input.clear()
         self.quantity_input.setValue(0)
         self.unit_price_input.clear()
         self.dialog.accept()
         self.load_inventory()
         log = f"{self.user_manager.logged_in_user} added {item_name} to stock"
-        log_text(log)
+        audit.record(self.user_manager.logged_in_user, audit.STOCK_ADD, log, amount=total_cost)
         QMessageBox.information(self, "Success", "Item added successfully.") 
     
     def set_window_title(self):
@@ -662,20 +816,23 @@ class MainWindow(QMainWindow):
         filepath, _ = QFileDialog.getOpenFileName(self, "Open Database", "", "Database Files (*.db)")
         # print("file path is ", self.database_name)
         if  filepath:
-            self.database_name = filepath
-            self.set_window_title()
-            self.customer_view.data = self.database_name
-            self.payment_history_view.data = self.database_name
-            self.customer_view.load_customers()
-            self.payment_history_view.load_customers()
-            self.payment_history_view.load_payment_history()
-            self.customer_base.data = self.database_name
-            self.customer_base.load_customers()
-            self.load_inventory()
-            self.customer_view.load_search()
-            self.adjust_window_size()
+            with db_manager.manager.action("open file"):
+                self.switch_database(filepath)
             
             #QMessageBox.information(self, "Open File", f"Opened {self.database_name}")
+
+    def switch_database(self, filepath):
+        """ Swap the shared connection and point every view at another database file """
+        audit.log.flush()  # entries made so far belong to the file being closed
+        db_manager.manager.switch(self.database_name, filepath)
+        self.database_name = filepath
+        audit.log.set_database(filepath)
+        sms_dispatcher.dispatcher.start(filepath)
+        backup.scheduler.set_database(self.snapshot_database())
+        self.set_window_title()
+        self.load_inventory()
+        self.reload_views()
+        self.adjust_window_size()
             
     def get_current_view(self):
         self.current_widget = self.stacked_widget.currentIndex()
@@ -683,97 +840,34 @@ class MainWindow(QMainWindow):
         return self.current_widget
     
     def set_theme(self, theme):
-        """ Apply the selected theme """
-        if theme == "light":
-            self.setStyleSheet(LIGHT_THEME)
-        if theme == "sunset_glo":
-            self.setStyleSheet(SUNSET_GLOW)
-        if theme == "neon_nit":
-            self.setStyleSheet(NEON_NIGHTS)
-        if theme == "galaxy":
-            self.setStyleSheet(GALAXY_EXPLORER)
-        elif theme == "dark":
-            self.setStyleSheet(DARK_THEME)
-        elif theme == "system":
-            self.setStyleSheet("")  # Uses system default
-        elif theme == "dark1":
-            self.setStyleSheet(DARK_THEME_1)
-        elif theme == "dark2":
-            self.setStyleSheet(DARK_THEME_2)
-        elif theme == "light1":
-            self.setStyleSheet(LIGHT_THEME_1)
-        elif theme == "light2":
-            self.setStyleSheet(LIGHT_THEME_2)
-        elif theme == "neon":
-            self.setStyleSheet(NEON_CYBERPUNK)
-        elif theme == "electric":
-            self.setStyleSheet(ELECTRIC_FOREST)
-        elif theme == "sunset":
-            self.setStyleSheet(SUNSET_GRADIENT)
-        elif theme == "ocean":
-            self.setStyleSheet(OCEAN_DEPTHS)
-        elif theme == "candy":
-            self.setStyleSheet(CANDY_LAND)
-        elif theme == "material":
-            self.setStyleSheet(MATERIAL_DARK)
-        elif theme == "fiber":
-            self.setStyleSheet(FIBERS)
-        elif theme == "combi":
-            self.setStyleSheet(COMBINEAR)
-        elif theme == "mac":
-            self.setStyleSheet(MAC)
-
-        # Save theme choice
-        with open("theme_settings.txt", "w") as file:
-            file.write(theme)
+        """ Apply the selected theme to the whole application and save the choice """
+        themes.choose(theme)
 
     def load_theme(self):
         """ Load the last used theme from settings """
-        if os.path.exists("theme_settings.txt"):
-            with open("theme_settings.txt", "r") as file:
-                theme = file.read().strip()
-                self.set_theme(theme)
-        else:
-            self.set_theme('fiber')
+        themes.apply_saved()
     
-    def export_to_csv(self, ff="None", show_success = True):
+    def current_table(self):
+        """The table of the view on screen and its title, for the export menu (the home view exports the sales records)."""
         self.get_current_view()
-        table = self.inventory_table if self.current_widget == 0 else self.payment_history_view.payment_table if self.current_widget == 2 else self.customer_base.customer_records_table if self.current_widget == 4 else self.customer_view.customer_table
-        """Export payment records to CSV."""    
-        if ff == "None":
-            file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "CSV Files (*.csv)", options=QFileDialog.Options())
-        else:
-            file_path = os.getcwd()+'\\'+ff +".csv"
+        index = self.current_widget if self.current_widget in (0, 2, 4) else 1
+        table = self.inventory_table if index == 0 else self.payment_history_view.payment_table if index == 2 else self.customer_base.customer_records_table if index == 4 else self.customer_view.customer_table
+        return table, self.window_titles[index]
+
+    def export_to_csv(self):
+        """Export every row of the current view's query (with its filters) to CSV, not only the pages loaded so far."""
+        table, _ = self.current_table()
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "CSV Files (*.csv)", options=QFileDialog.Options())
         if file_path:
-            data = []
-            for row in range(table.rowCount()):
-                row_data = [table.item(row, col).text() if table.item(row, col) else "" for col in range(table.columnCount())]
-                data.append(row_data)
-
-            headers = self.get_table_headers(table)
-            with open(file_path, mode="w", newline="", encoding="utf-8") as file:
-                writer = csv.writer(file)
-                writer.writerow(headers)
-                writer.writerows(data)
-
-            if(show_success): QMessageBox.information(self, "Success", "Export completed successfully!")
+            table_export.export_csv(self, table, file_path)
     
-    def get_table_headers(self, table_widget):
-        """Retrieve the column headers of the given QTableWidget."""
-        headers = []
-        for col in range(table_widget.columnCount()):
-            headers.append(table_widget.horizontalHeaderItem(col).text())
-        return headers        
-
 
     def export_to_pdf(self):
-        """Export payment records to a PDF file."""
-        #first convert to csv, then convert from csv to pdf using reportlab module        
-        self.export_to_csv("temp",False)
+        """Export the current view's table to a PDF file."""
+        table, title = self.current_table()
         file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "PDF Files (*.pdf)", options=QFileDialog.Options())
         if file_path:         
-            csv_to_pdf("temp.csv", file_path)
-            os.remove('temp.csv')
+            table_export.export_pdf(self, table, file_path, title)
     
     def save_database_as(self):
         options = QFileDialog.Options()
@@ -782,134 +876,36 @@ class MainWindow(QMainWindow):
         )
 
         if file_path:
+            if db_manager.manager.key(file_path) == db_manager.manager.key(self.database_name):
+                QMessageBox.information(self, "Save As", "The database is already saved in that file.")
+                return
             try:
-                shutil.copyfile(self.database_name, file_path)
-                self.database_name = file_path
-                self.customer_view.data = self.database_name
-                self.payment_history_view.data = self.database_name
-                self.customer_view.load_customers()
-                self.payment_history_view.load_customers()
-                self.payment_history_view.load_payment_history()
-                self.load_inventory()
-                self.set_window_title()
+                # Copied page by page on a worker while the file stays in use (see backup.py)
+                if backup.copy_with_progress(self, self.database_name, file_path) is None:
+                    return  # cancelled
+                with db_manager.manager.action("save as"):
+                    self.switch_database(file_path)
                 QMessageBox.information(self, "Success", "Database saved successfully.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save database: {str(e)}")
                 
     
     def create_database(self, db_name):
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-                
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_name TEXT,
-                date_received TEXT,
-                unit_price REAL,
-                quantity_received INTEGER,
-                quantity_issued INTEGER DEFAULT 0,
-                quantity_remaining INTEGER,
-                total_cost REAL,
-                user_logged TEXT
-            )
-        """)        
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sms_queue (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                recipient TEXT NOT NULL,
-                message TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_name TEXT,
-                location TEXT,
-                contact TEXT,
-                item_name TEXT,
-                quantity INTEGER,
-                unit_price REAL,
-                total_owed REAL,
-                amount_paid REAL DEFAULT 0,
-                remaining_debt REAL,
-                sale_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                payment_mode TEXT,
-                cheque_number TEXT,
-                cheque_bank TEXT,
-                cheque_clearance_date TEXT,
-                transaction_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                user_logged TEXT                
-            )
-        """)
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS customers_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                location TEXT,
-                contact TEXT UNIQUE       
-            )
-        """)
-
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS payments (
-                id INTEGER PRIMARY KEY  AUTOINCREMENT,
-                transaction_id TEXT,
-                customer_name TEXT NOT NULL,
-                item_name TEXT,
-                amount_paid REAL NOT NULL,
-                payment_mode TEXT NOT NULL,
-                cheque_number TEXT,
-                cheque_bank TEXT,
-                cheque_clearance_date TEXT,
-                entry_date_and_time TEXT, --  unique identifier used to query the table
-                transaction_date TEXT, 
-                user_logged TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                transaction_id TEXT UNIQUE,
-                name TEXT,
-                location TEXT,
-                contact TEXT,
-                product_name TEXT,
-                unit_price TEXT,
-                quantity TEXT,
-                bulk_discount TEXT DEFAULT NULL,
-                prompt_payment_discount TEXT DEFAULT NULL,
-                total_owed REAL DEFAULT 0,
-                total_paid REAL DEFAULT 0,
-                remaining_debt REAL DEFAULT 0,
-                entry_date_and_time TEXT,
-                transaction_date, TEXT,
-                user_logged TEXT
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        """ Create (or upgrade) a store database; the schema lives in migrations.py """
+        conn = db_manager.connect(db_name)
+        migrations.migrate(conn)
     
 
     def import_file(self):
         gs = ImportTableDialog(self)
         gs.exec_()
         self.load_inventory()
-        self.customer_view.load_customers()
-        self.customer_view.load_search
-        self.payment_history_view.load_payment_history()
+        self.reload_views()
     
         
     def closeEvent(self, event):
         """ Prompt to save or delete '_temp__.db' before exiting """
+        audit.log.flush()  # before the file may be deleted
         if self.database_name == "_temp__.db":
             reply = QMessageBox.question(self, "Exit", 
                                          "Do you want to save before exiting?", 
@@ -917,15 +913,18 @@ class MainWindow(QMainWindow):
 
             if reply == QMessageBox.Yes:
                 self.save_database_as()  # Save the database
+                db_manager.manager.close_all()
                 os.remove("_temp__.db")  # Delete the file
                 self.save_last_opened_database()
                 event.accept()  # Allow closing
             elif reply == QMessageBox.No:
+                db_manager.manager.close_all()
                 os.remove("_temp__.db")  # Delete the file
                 event.accept()  # Allow closing
             else:
                 event.ignore()  # Cancel exit
         else:
+            db_manager.manager.close_all()
             try:
                 os.remove("_temp__.db")  # Delete the file
                 self.save_last_opened_database()
@@ -947,6 +946,7 @@ class MainWindow(QMainWindow):
     def reset_inactivity_timer(self):
         """Reset the inactivity timer when user is active."""
         self.inactivity_timer.start(self.logout_timeout)
+        self.checkpoint_timer.start(CHECKPOINT_IDLE_MS)
 
     def auto_logout(self):
         """Log out the user after inactivity timeout."""
@@ -982,6 +982,24 @@ class SettingsDialog(QDialog):
         layout.addWidget(QLabel("Logout Timer (Any User):"))
         layout.addWidget(self.logout_timer_input)
 
+        # Database Durability (Admin Only)
+        self.durability_input = QComboBox()
+        self.durability_input.addItem("Throughput (faster sales)", "throughput")
+        self.durability_input.addItem("Durability (sync every commit)", "durability")
+        layout.addWidget(QLabel("Database Mode (Admin Only):"))
+        layout.addWidget(self.durability_input)
+
+        # Automatic Snapshots (Admin Only)
+        self.snapshot_hours_input = QComboBox()
+        for label, hours in (("Off", 0), ("Every hour", 1), ("Every 4 hours", 4), ("Every 12 hours", 12), ("Daily", 24)):
+            self.snapshot_hours_input.addItem(label, hours)
+        self.snapshot_keep_input = QSpinBox()
+        self.snapshot_keep_input.setRange(1, 100)
+        layout.addWidget(QLabel("Automatic Snapshots (Admin Only):"))
+        layout.addWidget(self.snapshot_hours_input)
+        layout.addWidget(QLabel("Snapshots to Keep:"))
+        layout.addWidget(self.snapshot_keep_input)
+
         # Load existing settings
         self.load_settings()
 
@@ -1004,6 +1022,19 @@ class SettingsDialog(QDialog):
                 self.company_name_input.setText(result[0])
         else:
             self.company_name_input.setDisabled(True)  # Disable for non-admin users
+            self.durability_input.setDisabled(True)
+            self.snapshot_hours_input.setDisabled(True)
+            self.snapshot_keep_input.setDisabled(True)
+
+        # Load database durability
+        cursor.execute("SELECT value FROM settings WHERE key='db_durability'")
+        result = cursor.fetchone()
+        index = self.durability_input.findData(result[0] if result else db_manager.DEFAULT_DURABILITY)
+        self.durability_input.setCurrentIndex(max(index, 0))
+
+        # Load automatic snapshots
+        self.snapshot_hours_input.setCurrentIndex(max(self.snapshot_hours_input.findData(backup.scheduler.hours), 0))
+        self.snapshot_keep_input.setValue(backup.scheduler.keep)
 
         # Load logout timer (for all users)
         cursor.execute("SELECT value FROM user_settings WHERE username=?", (self.user_manager.logged_in_user,))
@@ -1014,6 +1045,12 @@ class SettingsDialog(QDialog):
 
     def save_settings(self):
         """Save the settings to the database."""
+        # Validate before writing anything, so a bad value leaves every setting as it was
+        logout_timer = self.logout_timer_input.text().strip()
+        if not logout_timer.isdigit():
+            QMessageBox.warning(self, "Invalid Input", "Please enter a valid number for the logout timer.")
+            return
+
         conn = sqlite3.connect(self.user_manager.database)
         cursor = conn.cursor()
 
@@ -1023,26 +1060,23 @@ class SettingsDialog(QDialog):
             if company_name:
                 cursor.execute("INSERT INTO settings (key, value) VALUES ('company_name', ?) ON CONFLICT(key) DO UPDATE SET value=?",
                                (company_name, company_name))
+            durability = self.durability_input.currentData()
+            cursor.execute("INSERT INTO settings (key, value) VALUES ('db_durability', ?) ON CONFLICT(key) DO UPDATE SET value=?",
+                           (durability, durability))
+            hours, keep = self.snapshot_hours_input.currentData(), self.snapshot_keep_input.value()
+            cursor.executemany("INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                               [("snapshot_hours", str(hours)), ("snapshot_keep", str(keep))])
 
         # Save Logout Timer (For All Users)
-        logout_timer = self.logout_timer_input.text().strip()
-        if logout_timer.isdigit():
-            cursor.execute("INSERT INTO user_settings (username, key, value) VALUES (?, 'logout_timer', ?) ON CONFLICT(username, key) DO UPDATE SET value=?",
-                           (self.user_manager.logged_in_user, logout_timer, logout_timer))
-        else:
-            QMessageBox.warning(self, "Invalid Input", "Please enter a valid number for the logout timer.")
-            return
+        cursor.execute("INSERT INTO user_settings (username, key, value) VALUES (?, 'logout_timer', ?) ON CONFLICT(username, key) DO UPDATE SET value=?",
+                       (self.user_manager.logged_in_user, logout_timer, logout_timer))
 
         conn.commit()
         conn.close()
+
+        # Only what was saved takes effect
+        if self.user_manager.logged_in_role == "Administrator":
+            db_manager.manager.set_durability(durability)
+            backup.scheduler.configure(hours, keep)
         QMessageBox.information(self, "Success", "Settings saved successfully!")
         self.accept()
-
-def log_text(text):
-    # Get the current timestamp
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Open the file in append mode (creates the file if it doesn't exist)
-    with open("log.txt", "a") as file:
-        # Write the timestamp followed by the input text
-        file.write(f"[{timestamp}] {text}\n")
\ No newline at end of file
@@ -0,0 +1,381 @@
+"""Versioned schema migrations for store databases.
+
+The schema version lives in the database file itself (PRAGMA user_version).
+db_manager runs migrate() every time it opens a file, so databases created by
+older versions of the app pick up new tables and indexes on first open, and
+then repair_derived_tables(), which puts back derived triggers that an
+interrupted import left dropped.
+
+To change the schema append a new (version, description, function) entry to
+MIGRATIONS; never edit a migration that has already shipped.
+"""
+import aggregates
+import audit
+import sale_lines
+import sms_outbox
+
+
+def create_base_tables(cursor):
+    """Tables the app has always created in MainWindow.create_database."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_name TEXT,
+            date_received TEXT,
+            unit_price REAL,
+            quantity_received INTEGER,
+            quantity_issued INTEGER DEFAULT 0,
+            quantity_remaining INTEGER,
+            total_cost REAL,
+            user_logged TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sms_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_name TEXT,
+            location TEXT,
+            contact TEXT,
+            item_name TEXT,
+            quantity INTEGER,
+            unit_price REAL,
+            total_owed REAL,
+            amount_paid REAL DEFAULT 0,
+            remaining_debt REAL,
+            sale_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            payment_mode TEXT,
+            cheque_number TEXT,
+            cheque_bank TEXT,
+            cheque_clearance_date TEXT,
+            transaction_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            user_logged TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS customers_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            location TEXT,
+            contact TEXT UNIQUE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS payments (
+            id INTEGER PRIMARY KEY  AUTOINCREMENT,
+            transaction_id TEXT,
+            customer_name TEXT NOT NULL,
+            item_name TEXT,
+            amount_paid REAL NOT NULL,
+            payment_mode TEXT NOT NULL,
+            cheque_number TEXT,
+            cheque_bank TEXT,
+            cheque_clearance_date TEXT,
+            entry_date_and_time TEXT, --  unique identifier used to query the table
+            transaction_date TEXT,
+            user_logged TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE,
+            name TEXT,
+            location TEXT,
+            contact TEXT,
+            product_name TEXT,
+            unit_price TEXT,
+            quantity TEXT,
+            bulk_discount TEXT DEFAULT NULL,
+            prompt_payment_discount TEXT DEFAULT NULL,
+            total_owed REAL DEFAULT 0,
+            total_paid REAL DEFAULT 0,
+            remaining_debt REAL DEFAULT 0,
+            entry_date_and_time TEXT,
+            transaction_date, TEXT,
+            user_logged TEXT
+        )
+    """)
+
+
+def create_lookup_indexes(cursor):
+    """Indexes for the columns every screen filters or joins on."""
+    indexes = [
+        ("idx_inventory_item_name", "inventory", "item_name", ["item_name"]),
+        ("idx_payments_transaction_id", "payments", "transaction_id", ["transaction_id"]),
+        ("idx_payments_entry_date", "payments", "entry_date_and_time", ["entry_date_and_time"]),
+        ("idx_payments_entry_day", "payments", "DATE(entry_date_and_time)", ["entry_date_and_time"]),
+        ("idx_customers_name", "customers", "name", ["name"]),
+        ("idx_customers_remaining_debt", "customers", "remaining_debt", ["remaining_debt"]),
+    ]
+    for name, table, expression, columns in indexes:
+        # Imported or hand-made files may lack a column; skip rather than refuse to open them
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if set(columns) <= existing:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({expression})")
+
+
+# Text columns searched with LIKE '%...%' -> FTS5 shadow index over them.
+# The trigram tokenizer indexes every three-character substring, so both
+# MATCH on a quoted phrase and LIKE on the index find text anywhere in a
+# value, the same as the LIKE filters did, without scanning the table.
+SEARCH_INDEXES = {
+    "customers_fts": ("customers", ["name", "location", "contact", "product_name", "transaction_id"]),
+    "customers_data_fts": ("customers_data", ["name", "location", "contact"]),
+    "payments_fts": ("payments", ["item_name"]),
+    "inventory_fts": ("inventory", ["item_name"]),
+}
+
+
+def create_search_index(cursor, names=None):
+    """Create the FTS5 indexes (all, or those in `names`) and the triggers that keep them in sync, then rebuild them.
+
+    Safe to run again, e.g. after a table was replaced by an import, which
+    drops the table's triggers along with it.
+    """
+    for fts, (table, columns) in SEARCH_INDEXES.items():
+        if names is not None and fts not in names:
+            continue
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if not set(columns) <= existing:
+            continue
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{c}" for c in columns)
+        old_values = ", ".join(f"old.{c}" for c in columns)
+        cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column_list}, content='{table}', tokenize='trigram')")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+                               INSERT INTO {fts}(rowid, {column_list}) VALUES (new.rowid, {new_values});
+                           END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+                               INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+                           END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+                               INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+                               INSERT INTO {fts}(rowid, {column_list}) VALUES (new.rowid, {new_values});
+                           END""")
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+# Trigger name prefix -> the table it is on and the columns it watches
+TOTALS_TRIGGERS = {
+    "customers_totals": ("customers", ["name", "total_owed", "total_paid", "remaining_debt"]),
+    "payments_totals": ("payments", ["item_name", "amount_paid", "entry_date_and_time"]),
+}
+
+
+def create_summary_tables(cursor):
+    """Running totals for the summary labels (see aggregates.py) and the triggers that maintain them.
+
+    Like create_search_index this is safe to run again after an import replaced
+    customers or payments; the totals are rebuilt from the tables either way.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS summary_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            sales INTEGER DEFAULT 0,
+            total_owed REAL DEFAULT 0,
+            total_paid REAL DEFAULT 0,
+            remaining_debt REAL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS customer_totals (
+            name TEXT PRIMARY KEY,
+            sales INTEGER DEFAULT 0,
+            total_owed REAL DEFAULT 0,
+            total_paid REAL DEFAULT 0,
+            remaining_debt REAL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_totals (
+            item_name TEXT PRIMARY KEY,
+            payments INTEGER DEFAULT 0,
+            amount_paid REAL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_totals (
+            day TEXT PRIMARY KEY,
+            payments INTEGER DEFAULT 0,
+            amount_paid REAL DEFAULT 0
+        )
+    """)
+
+    # customers -> summary_totals, customer_totals
+    add_sale = """
+        INSERT INTO customer_totals (name, sales, total_owed, total_paid, remaining_debt)
+        VALUES (IFNULL(new.name, ''), 1, IFNULL(new.total_owed, 0), IFNULL(new.total_paid, 0), IFNULL(new.remaining_debt, 0))
+        ON CONFLICT(name) DO UPDATE SET sales = sales + 1, total_owed = total_owed + excluded.total_owed,
+            total_paid = total_paid + excluded.total_paid, remaining_debt = remaining_debt + excluded.remaining_debt;
+        UPDATE summary_totals SET sales = sales + 1, total_owed = total_owed + IFNULL(new.total_owed, 0),
+            total_paid = total_paid + IFNULL(new.total_paid, 0), remaining_debt = remaining_debt + IFNULL(new.remaining_debt, 0);
+    """
+    remove_sale = """
+        UPDATE customer_totals SET sales = sales - 1, total_owed = total_owed - IFNULL(old.total_owed, 0),
+            total_paid = total_paid - IFNULL(old.total_paid, 0), remaining_debt = remaining_debt - IFNULL(old.remaining_debt, 0)
+        WHERE name = IFNULL(old.name, '');
+        DELETE FROM customer_totals WHERE name = IFNULL(old.name, '') AND sales <= 0;
+        UPDATE summary_totals SET sales = sales - 1, total_owed = total_owed - IFNULL(old.total_owed, 0),
+            total_paid = total_paid - IFNULL(old.total_paid, 0), remaining_debt = remaining_debt - IFNULL(old.remaining_debt, 0);
+    """
+    # payments -> product_totals, daily_totals
+    add_payment = """
+        INSERT INTO product_totals (item_name, payments, amount_paid) VALUES (IFNULL(new.item_name, ''), 1, IFNULL(new.amount_paid, 0))
+        ON CONFLICT(item_name) DO UPDATE SET payments = payments + 1, amount_paid = amount_paid + excluded.amount_paid;
+        INSERT INTO daily_totals (day, payments, amount_paid) VALUES (IFNULL(DATE(new.entry_date_and_time), ''), 1, IFNULL(new.amount_paid, 0))
+        ON CONFLICT(day) DO UPDATE SET payments = payments + 1, amount_paid = amount_paid + excluded.amount_paid;
+    """
+    remove_payment = """
+        UPDATE product_totals SET payments = payments - 1, amount_paid = amount_paid - IFNULL(old.amount_paid, 0)
+        WHERE item_name = IFNULL(old.item_name, '');
+        DELETE FROM product_totals WHERE item_name = IFNULL(old.item_name, '') AND payments <= 0;
+        UPDATE daily_totals SET payments = payments - 1, amount_paid = amount_paid - IFNULL(old.amount_paid, 0)
+        WHERE day = IFNULL(DATE(old.entry_date_and_time), '');
+        DELETE FROM daily_totals WHERE day = IFNULL(DATE(old.entry_date_and_time), '') AND payments <= 0;
+    """
+    triggers = [("customers_totals", add_sale, remove_sale), ("payments_totals", add_payment, remove_payment)]
+    for prefix, add, remove in triggers:
+        table, columns = TOTALS_TRIGGERS[prefix]
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if not set(columns) <= existing:
+            continue
+        watched = ", ".join(columns)
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {prefix}_insert AFTER INSERT ON {table} BEGIN {add} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {prefix}_delete AFTER DELETE ON {table} BEGIN {remove} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {prefix}_update AFTER UPDATE OF {watched} ON {table} BEGIN {remove} {add} END")
+
+    aggregates.rebuild(cursor)
+
+
+def create_sale_lines(cursor):
+    """One row per product sold (see sale_lines.py), filled in from the old joined strings."""
+    sale_lines.create_table(cursor)
+    sale_lines.backfill(cursor)
+
+
+def create_inventory_search_index(cursor):
+    """Search index on inventory item names for the sales product picker."""
+    create_search_index(cursor, ["inventory_fts"])
+
+
+def create_sms_outbox(cursor):
+    """Retry bookkeeping on sms_queue and its status log (see sms_outbox.py)."""
+    sms_outbox.create_table(cursor)
+
+
+def create_audit_log(cursor):
+    """Indexed copy of the audit trail (see audit.py)."""
+    audit.create_table(cursor)
+
+
+def recreate_search_indexes(cursor):
+    """Create the search indexes that migration 3 skipped in files made before create_search_index was fixed (all but customers_fts)."""
+    create_search_index(cursor)
+
+
+def refresh_derived_tables(cursor):
+    """Re-attach the triggers of, and rebuild, everything derived from the base tables.
+
+    Run after a base table was replaced wholesale (an import dropping and
+    re-creating it takes its triggers along). Sales imported from a file
+    that predates sale_lines get their lines here too, and an imported
+    sms_queue gets the outbox columns back.
+    """
+    create_sale_lines(cursor)
+    create_search_index(cursor)
+    create_summary_tables(cursor)
+    create_sms_outbox(cursor)
+
+
+def missing_derived_triggers(cursor):
+    """Names of the search index and totals triggers that refresh_derived_tables would create but the file lacks."""
+    expected = set()
+    for prefix, (table, columns) in {**SEARCH_INDEXES, **TOTALS_TRIGGERS}.items():
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if set(columns) <= existing:
+            expected.update(f"{prefix}_{event}" for event in ("insert", "delete", "update"))
+    present = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    return sorted(expected - present)
+
+
+def repair_derived_tables(conn):
+    """Run refresh_derived_tables when a derived trigger is missing; returns the names that were missing.
+
+    An import or merge drops the triggers on the tables it writes and
+    restores them at the end (table_import.suspend_triggers). If the app
+    dies in between, the file is left without them and the search index and
+    totals silently stop following the base tables; this puts them back and
+    rebuilds what they feed the next time the file is opened.
+    """
+    cursor = conn.cursor()
+    missing = missing_derived_triggers(cursor)
+    if not missing:
+        return missing
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        refresh_derived_tables(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return missing
+
+
+MIGRATIONS = [
+    (1, "base tables", create_base_tables),
+    (2, "indexes on hot lookup columns", create_lookup_indexes),
+    (3, "full-text search index", create_search_index),
+    (4, "summary totals per customer, product and day", create_summary_tables),
+    (5, "sale line items", create_sale_lines),
+    (6, "inventory search index", create_inventory_search_index),
+    (7, "SMS outbox", create_sms_outbox),
+    (8, "audit log", create_audit_log),
+    (9, "missing search indexes", recreate_search_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every migration newer than the file's schema version.
+
+    Each step runs in its own transaction together with the version bump, so a
+    failed step leaves the file at the previous version. Returns the list of
+    versions applied.
+    """
+    applied = []
+    current = schema_version(conn)
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            step(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    if applied:
+        conn.execute("PRAGMA optimize")
+    return applied
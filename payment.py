@@ -6,27 +6,18 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget,
 from PyQt5.QtCore import Qt, QTimer, QDate, QStringListModel
 from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QTextEdit, QGroupBox, QAction, QSizePolicy, QCompleter
 from PyQt5.QtGui import QPalette, QDoubleValidator
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 
 from datetime import datetime
-import requests
+import db_manager
+import audit
+import queries
+import sale_lines
+import sms_dispatcher
+from query_executor import executor
 
 
 currency_symbol = "\u20B5"
 
-FAYASMS_API_KEY = "your_fayasms_api_key"
-FAYASMS_SENDER_ID = "YourBusinessName"
-
-
-def log_text(text):
-    # Get the current timestamp
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Open the file in append mode (creates the file if it doesn't exist)
-    with open("log.txt", "a") as file:
-        # Write the timestamp followed by the input text
-        file.write(f"[{timestamp}] {text}\n")
-
 
 class PaymentWindow(QDialog):
     def __init__(self, database, parent=None):
@@ -114,7 +105,7 @@ class PaymentWindow(QDialog):
             
     def load_customer_and_transaction_data(self):
         """ Load customer names and transaction IDs into the autocomplete list """
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
 
         # Load Customer Names
@@ -125,8 +116,6 @@ class PaymentWindow(QDialog):
         cursor.execute("SELECT transaction_id FROM customers WHERE remaining_debt > 0")
         transactions = [row[0] for row in cursor.fetchall()]
 
-        conn.close()
-
         # Combine both for Autocomplete
         combined_list = customers + transactions
         model = QStringListModel(combined_list)
@@ -136,39 +125,41 @@ class PaymentWindow(QDialog):
         """ When customer name or transaction ID is entered, update transaction list """
         input_text = self.customer_input.text().strip()
         if input_text:
-            conn = sqlite3.connect(self.data)
+            conn = db_manager.connect(self.data)
             cursor = conn.cursor()
 
             if input_text.startswith("INV-".casefold()):  # If transaction ID is entered
-                cursor.execute("SELECT name FROM customers WHERE transaction_id LIKE ?",  (f'%{input_text}%',))
+                cursor.execute(*queries.customer_of_transaction(input_text))
                 result = cursor.fetchone()
                 if result:
                     customer_name = result[0]
                     self.customer_input.setText(customer_name)  # Auto-fill customer name
                     self.transaction_combo.setCurrentText(input_text)  # Select transaction ID
             else:
-                cursor.execute("SELECT transaction_id FROM customers WHERE name LIKE ? AND remaining_debt > 0", (f'%{input_text}%',))
+                cursor.execute(*queries.open_transactions(input_text))
                 transactions = [row[0] for row in cursor.fetchall()]
                 self.transaction_combo.clear()
                 self.transaction_combo.addItems(transactions)
 
-            conn.close()
-
     def update_total_debt(self): 
         customer = self.customer_input.text().strip()
         trans_id =  self.transaction_combo.currentText()
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
         if trans_id == "":
-            cursor.execute("SELECT SUM(remaining_debt) FROM customers WHERE name = ?", (customer,))
+            query, params = "SELECT SUM(remaining_debt) FROM customers WHERE name = ?", (customer,)
         else:
-            cursor.execute("SELECT remaining_debt FROM customers WHERE transaction_id = ?", (trans_id,))
-        result = cursor.fetchone()
-        total_debt = result[0] if result and result[0] else 0
-        self.total_debt_label.setText(f"Total Debt: {total_debt}")
-        self.amount_paid.setPlaceholderText(str(total_debt))
-        self.owing = total_debt
-        conn.close()
+            query, params = "SELECT remaining_debt FROM customers WHERE transaction_id = ?", (trans_id,)
+
+        def job(conn):
+            result = conn.execute(query, params).fetchone()
+            return result[0] if result and result[0] else 0
+
+        def apply(total_debt):
+            self.total_debt_label.setText(f"Total Debt: {total_debt}")
+            self.amount_paid.setPlaceholderText(str(total_debt))
+            self.owing = total_debt
+
+        # Typing a name fires this per keystroke; only the last lookup is shown
+        executor.submit(self.data, job, apply, self.total_debt_label)
 
     def toggle_cheque_details(self):
         self.cheque_details.setVisible(self.payment_mode.currentText() == "Cheque")
@@ -197,22 +188,21 @@ class PaymentWindow(QDialog):
             QMessageBox.warning(self, "Error", "Please enter a valid payment amount.")
             return
 
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
 
         # Fetch unpaid sales for this customer, ordered by sale date        
-        cursor.execute("SELECT  product_name, total_paid, unit_price, quantity, total_owed, remaining_debt, contact FROM customers WHERE name = ? AND transaction_id = ?", (customer,trans_id))
+        cursor.execute("SELECT  product_name, total_paid, total_owed, remaining_debt, contact FROM customers WHERE name = ? AND transaction_id = ?", (customer,trans_id))
         result = cursor.fetchone()
 
         if not result:
             QMessageBox.warning(self, "Error", "Customer not found.")
-            conn.close()
             return
                 
          
         remaining_payment = amount_paid
         
-        product, total_paid, unit_price, quantity, total_owed, remaining_debt, contact = result
+        product, total_paid, total_owed, remaining_debt, contact = result
         
         if amount_paid > remaining_debt:
             QMessageBox.warning(self, "Error", "Amount paid exceeds remaining debt.")
@@ -224,26 +214,27 @@ class PaymentWindow(QDialog):
 
         
         
-        # Update customers table
-        cursor.execute("""
-            UPDATE customers
-            SET  total_paid = ?, remaining_debt = ?
-            WHERE transaction_id = ?
-        """, ( total_paid, remaining_debt, trans_id))
-     
-
-        # Log the payment in the payments table, including product details
-        cursor.execute("""
-            INSERT INTO payments (transaction_id,customer_name, item_name, amount_paid, payment_mode, cheque_number, cheque_bank, cheque_clearance_date, entry_date_and_time,transaction_date, user_logged)
-            VALUES (?, ?,?, ?, ?, ?,  ?, ?, CURRENT_TIMESTAMP,?, ?)
-        """, (trans_id, customer,  product, remaining_payment, payment_mode, cheque_number, cheque_bank, cheque_clearance_date, tran_date, self.parent_window.user_manager.logged_in_user))
+        # One transaction on the shared connection: committed together, or rolled back if either write fails
+        with conn:
+            # Update customers table
+            cursor.execute("""
+                UPDATE customers
+                SET  total_paid = ?, remaining_debt = ?
+                WHERE transaction_id = ?
+            """, ( total_paid, remaining_debt, trans_id))
+         
+
+            # Log the payment in the payments table, including product details
+            cursor.execute("""
+                INSERT INTO payments (transaction_id,customer_name, item_name, amount_paid, payment_mode, cheque_number, cheque_bank, cheque_clearance_date, entry_date_and_time,transaction_date, user_logged)
+                VALUES (?, ?,?, ?, ?, ?,  ?, ?, CURRENT_TIMESTAMP,?, ?)
+            """, (trans_id, customer,  product, remaining_payment, payment_mode, cheque_number, cheque_bank, cheque_clearance_date, tran_date, self.parent_window.user_manager.logged_in_user))
         log = f"{self.parent_window.user_manager.logged_in_user} received payment of GHS {remaining_payment} from {customer} in respect of transaction id: {trans_id}."
-        log_text(log)
+        audit.record(self.parent_window.user_manager.logged_in_user, audit.PAYMENT, log, trans_id, remaining_payment)
         #previous_payment = total_paid 
-        self.receipt_data = [trans_id, customer, product,  quantity,  result[5], remaining_payment, remaining_debt, payment_mode,cheque_bank,]
+        self.receipt_data = [trans_id, customer, sale_lines.read(conn, trans_id), result[3], remaining_payment, remaining_debt, payment_mode,cheque_bank,]
         
-        conn.commit()
-        conn.close()
+        db_manager.manager.notify_changed(self.data, customer)
         
         if self.send_sms.isChecked():
             company = self.parent_window.company_name
@@ -251,7 +242,7 @@ class PaymentWindow(QDialog):
             if remaining_debt > 0:
                 sms_message += f'\nRemaining debt is GHS {remaining_debt}'
                 
-            self.send_sms_notification(contact,  sms_message)
+            sms_dispatcher.dispatcher.enqueue(self.data, contact, sms_message)  # sent in the background
             #QMessageBox.information(self, "Success", "Sale recorded successfully.")
             
         #show print receipt before closing window
@@ -259,69 +250,6 @@ class PaymentWindow(QDialog):
             self.show_print_dialog()
         self.accept()
         
-    def create_sms_table(self):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sms_queue (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                recipient TEXT NOT NULL,
-                message TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
-        conn.close()
-    
-
-    def faya_sms(self, recipient, message):
-        url = "https://fayasms.com/api/v1/send"
-        data = {
-            "key": FAYASMS_API_KEY,
-            "sender_id": FAYASMS_SENDER_ID,
-            "to": recipient,
-            "message": message
-        }
-
-        try:
-            response = requests.post(url, json=data)
-            response_json = response.json()
-            if response_json.get("status") == "success":
-                return True  # SMS sent successfully
-            else:
-                return False  # SMS failed
-        except requests.exceptions.RequestException:
-            return False  # Device is offline
-    
-    
-    def send_sms_notification(self, contact, message):        
-        sent = self.faya_sms(contact, message)
-        if not sent:
-            self.queue_sms(contact, message) 
-    
-    def queue_sms(self, recipient, message):
-        self.create_sms_table()
-        
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO sms_queue (recipient, message) VALUES (?, ?)", (recipient, message))
-        conn.commit()
-        conn.close()
-        
-    def send_queued_sms(self):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, recipient, message FROM sms_queue WHERE status = 'pending'")
-        queued_sms = cursor.fetchall()
-
-        for sms_id, recipient, message in queued_sms:
-            if self.send_sms_notification(recipient, message):  # If SMS is sent successfully
-                cursor.execute("DELETE FROM sms_queue WHERE id = ?", (sms_id,))  # Remove from queue
-
-        conn.commit()
-        conn.close()
-
     def show_print_dialog(self):
         self.print_payment_receipt()
         self.accept()
@@ -339,7 +267,7 @@ class PaymentWindow(QDialog):
     def generate_payment_receipt(self):
         """Generate a detailed sales receipt with bulk discounts and prompt payment discounts."""
         # Unpack receipt data
-        trans_id, customer, items,  quantity,  past_debt, paid, remaining_debt, payment_mode,cheque_bank, = self.receipt_data 
+        trans_id, customer, lines, past_debt, paid, remaining_debt, payment_mode,cheque_bank, = self.receipt_data 
         sale_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         #{self.parent_window.company_name}
         receipt_text = f"""
@@ -358,19 +286,13 @@ class PaymentWindow(QDialog):
         -----------------------------------
         """
 
-        items = items.split(", ")
-        #unit_price = list(map(float, unit_price.split(", ")))
-        quantity = list(map(int, quantity.split(", ")))
-        #bulk_discounted_price = list(map(float, bulk_discounted_price.split(", ")))
-        #prompt_payment_discount = list(map(float, prompt_payment_discount.split(", ")))
-        
         # Handle multiple items
-        for i in range(len(items)):
+        for i, (item, unit_price, quantity, bulk_discounted_price) in enumerate(lines):
             #original_price = unit_price[i]
             #discounted_price = bulk_discounted_price[i] if bulk_discounted_price[i] > 0 else original_price
             #prompt_discount = prompt_payment_discount[i]
 
-            receipt_text += f"        {items[i]} - {quantity[i]} units\n" if i != 0 else f"{items[i]} - {quantity[i]} units\n"
+            receipt_text += f"        {item} - {quantity} units\n" if i != 0 else f"{item} - {quantity} units\n"
             #receipt_text += f"        Unit Price: GHS {original_price:.2f}\n"
            
             '''
@@ -403,6 +325,7 @@ class PaymentWindow(QDialog):
 
     def print_payment_receipt(self):
         """ Print the sales receipt or save as PDF if no printer is available """
+        from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
         receipt_text = self.generate_payment_receipt()
 
         printer = QPrinter(QPrinter.HighResolution)
@@ -1,4 +1,4 @@
-import sys, csv, requests
+import sys
 import sqlite3, os, subprocess 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QMessageBox, QTableWidget, QTableWidgetItem, QHBoxLayout, QComboBox, QTextEdit, QDialog, QSpinBox, QDateEdit, QDialogButtonBox, QCheckBox, QMenuBar, QMenu, QFileDialog)
@@ -6,28 +6,23 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget,
 from PyQt5.QtCore import Qt, QTimer, QDate, QStringListModel
 from PyQt5.QtWidgets import QInputDialog,QGridLayout, QHBoxLayout, QTextEdit, QGroupBox, QAction, QSizePolicy, QCompleter
 from PyQt5.QtGui import QPalette, QFont
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 
 import math
 
-import datetime
-from csv_to_pdf import csv_to_pdf
+import db_manager
+import queries
+import sale_lines
+import aggregates
+import audit
+import sms_dispatcher
+import table_export
+from table_models import SqlTableView
+from filter_controller import FilterController
 
-FAYASMS_API_KEY = "your_fayasms_api_key"
-FAYASMS_SENDER_ID = "YourBusinessName"
 
 currency_symbol = "\u20B5"
 
 
-def log_text(text):
-    # Get the current timestamp
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Open the file in append mode (creates the file if it doesn't exist)
-    with open("log.txt", "a") as file:
-        # Write the timestamp followed by the input text
-        file.write(f"[{timestamp}] {text}\n")
-
 class PaymentHistoryWindow(QWidget):
     def __init__(self, database, parent=None):
         super().__init__(parent)
@@ -58,8 +53,9 @@ class PaymentHistoryWindow(QWidget):
         self.print_receipt.clicked.connect(self.print_sales_receipt)
 
         self.load_customers()
+        self.history_filter = FilterController(self.prepare_payment_history, parent=self)
         self.customer_filter.currentIndexChanged.connect(self.load_payment_history)
-        self.product_filter.textChanged.connect(self.load_payment_history)
+        self.product_filter.textChanged.connect(self.history_filter.schedule)
         self.start_date.dateChanged.connect(self.load_payment_history)
         self.end_date.dateChanged.connect(self.load_payment_history)
 
@@ -75,10 +71,9 @@ class PaymentHistoryWindow(QWidget):
         self.main_row_selected = -1;
 
         # Payment Table
-        self.payment_table = QTableWidget()
-        self.payment_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.payment_table.setColumnCount(9)
-        self.payment_table.setHorizontalHeaderLabels(["Tansaction ID","Customer", "Product", f"Amount Paid {currency_symbol}  ", "Mode", "Cheque No.", "Bank", "Date","Payment Date"])
+        self.payment_table = SqlTableView(["Tansaction ID","Customer", "Product", f"Amount Paid {currency_symbol}  ", "Mode", "Cheque No.", "Bank", "Date","Payment Date"],
+                                          format_row=self.format_payment_row, monospace_columns=[2])
+        self.payment_table.setEditTriggers(SqlTableView.NoEditTriggers)
         self.payment_table.setColumnHidden(7,True) # Hide date column, this will be used to query the table to apply unique changes. Display rather the date set by user in the data entry
         # Enable sorting
         self.payment_table.setSortingEnabled(True)
@@ -89,8 +84,8 @@ class PaymentHistoryWindow(QWidget):
         # Export Buttons
         self.export_csv_button = QPushButton("Resend Queued SMS")
         self.export_pdf_button = QPushButton("Export PDF")
-        #self.export_csv_button.clicked.connect(lambda: self.export_payments_csv("None"))
-        self.export_csv_button.clicked.connect(lambda: self.send_queued_sms(relog=False))
+        #self.export_csv_button.clicked.connect(self.export_payments_csv)
+        self.export_csv_button.clicked.connect(self.send_queued_sms)
         self.export_pdf_button.clicked.connect(self.export_payments_pdf)
          
         
@@ -119,86 +114,56 @@ class PaymentHistoryWindow(QWidget):
 
     def load_customers(self):
         """Load customer names into the dropdown."""
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
         cursor.execute("SELECT DISTINCT customer_name FROM payments ORDER BY customer_name")
         customers = cursor.fetchall()
         self.customer_filter.clear()
-        self.customer_filter.addItem("All Customers")
+        self.customer_filter.addItem(queries.ALL_CUSTOMERS)
         for customer in customers:
             self.customer_filter.addItem(customer[0])
-        conn.close()
 
-    def format_products_and_quantities(self, products, quantities):
-        product_list = products.split(", ")
-        quantity_list = quantities.split(", ")
-        formatted_text = "\n".join(f"{p.ljust(20)} - {q.rjust(3)}" for p, q in zip(product_list, quantity_list))
-        return formatted_text
+    def format_payment_row(self, record):
+        """Displayed texts of a payment; the sale's products and quantities (record[9]) go into the product cell."""
+        texts = [str(value) for value in record[:9]]
+        if record[9]:
+            texts[2] = sale_lines.format_summary(record[9])
+        texts[3] = str(float(f'{record[3]:.2f}'))
+        return texts
 
-    def load_payment_history(self):
-        """Load payments based on filters and update summary statistics."""
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
+    def prepare_payment_history(self):
+        """(database, job, apply) of the payment query for the current filters; see FilterController."""
         customer = self.customer_filter.currentText()
         product = self.product_filter.text().strip()
         start_date = self.start_date.date().toString("yyyy-MM-dd")
         end_date = self.end_date.date().toString("yyyy-MM-dd")
+        query, params = queries.payment_history(customer, product, start_date, end_date)
 
-        query = """SELECT transaction_id, customer_name, item_name, amount_paid, payment_mode, cheque_number, cheque_bank, entry_date_and_time, transaction_date 
-                   FROM payments WHERE DATE(entry_date_and_time) BETWEEN ? AND ?"""
-        params = [start_date, end_date]
+        def job(conn):
+            first_page = self.payment_table.read_page(conn, query, params)
+            if not queries.customer_name(customer) and not product:
+                total_paid = aggregates.paid_between(conn, start_date, end_date)  # one row per day
+            else:
+                result = conn.execute(f"SELECT SUM(amount_paid) FROM ({query})", params).fetchone()
+                total_paid = result[0] if result and result[0] else 0
 
-        if customer and customer != "All Customers":
-            query += " AND customer_name = ?"
-            params.append(customer)
-        if product:
-            query += " AND item_name LIKE ?"
-            params.append(f"%{product}%")
+            # Get outstanding debt
+            total_outstanding = aggregates.outstanding(conn)
+            return first_page, total_paid, total_outstanding
+
+        def apply(result):
+            first_page, total_paid, total_outstanding = result
+            self.payment_table.load(self.data, query, params, first_page)
+
+            # Update Summary
+            self.summary_label.setText(f"<b> <font color='blue' size =3> Total Paid: {currency_symbol} {total_paid:.2f} </font> | <font color='red' size =3 >Total Outstanding: {currency_symbol} {total_outstanding:.2f} </font>  | <font size=3 color='green' >Total Sales Value: {currency_symbol} {total_outstanding+total_paid:.2f}</font></b>")
+
+        return self.data, job, apply
+
+    def load_payment_history(self):
+        """Load payments based on filters and update summary statistics."""
+        self.history_filter.run_now()
 
-        query += " ORDER BY entry_date_and_time DESC"
-        cursor.execute(query, params)
-        records = cursor.fetchall()
-        
-        #fetch quantities 
-
-        monospaced_font = QFont("Courier New", 10)  # Use a monospaced font consolas
-        self.payment_table.setRowCount(len(records))
-        self.payment_table.setWordWrap(True)  # Enable word wrap
-        total_paid = 0
-        for row, record in enumerate(records):
-            for col, data in enumerate(record):
-                if col == 2:  # Index 4 corresponds to 'product_name'
-                    #product_names = data.split(", ") 
-                    #fetch quantities
-                    cursor.execute(""" SELECT quantity FROM customers WHERE transaction_id = ? """, (records[row][0],))
-                    qty = cursor.fetchall()
-                    #print(qty, qty[0])
-                    combined_text = self.format_products_and_quantities(data, qty[0][0])
-                    #combined_text = "\n".join(product_names)
-
-                    cell_value = QTableWidgetItem(combined_text)
-                    cell_value.setFont(monospaced_font)  # Set monospaced font
-                    cell_value.setTextAlignment(Qt.AlignLeft | Qt.AlignTop)
-                    
-                    # Allow cell to expand vertically
-                    self.payment_table.setItem(row, col, cell_value)
-                else:                    
-                    if col == 3 : data = float(f'{data:.2f}')
-                    self.payment_table.setItem(row, col, QTableWidgetItem(str(data)))
-            total_paid += float(record[3])
-
-        # Get outstanding debt
-        cursor.execute("SELECT SUM(remaining_debt) FROM customers")
-        result = cursor.fetchone()
-        total_outstanding = result[0] if result and result[0] else 0
-
-        # Update Summary
-        self.summary_label.setText(f"<b> <font color='blue' size =3> Total Paid: {currency_symbol} {total_paid:.2f} </font> | <font color='red' size =3 >Total Outstanding: {currency_symbol} {total_outstanding:.2f} </font>  | <font size=3 color='green' >Total Sales Value: {currency_symbol} {total_outstanding+total_paid:.2f}</font></b>")
-        # Resize row heights to fit contents
-        self.payment_table.resizeRowsToContents()
-        conn.close()
-        
-    
     def reverse_payment(self):
         """ Reverse a selected payment and restore previous state. """
         selected_row = self.payment_table.currentRow()
@@ -206,10 +171,10 @@ class PaymentHistoryWindow(QWidget):
             QMessageBox.warning(self, "Error", "Please select a payment to reverse.")
             return
 
-        trans_id = self.payment_table.item(selected_row, 0).text()  # Get transaction ID and payment date
-        tran_time = self.payment_table.item(selected_row, 7).text()  # Get transaction ID and payment date
-        customer = self.payment_table.item(selected_row, 1).text()  # Get customer name
-        amount_paid = float(self.payment_table.item(selected_row, 3).text())  # Get paid amount 
+        trans_id = self.payment_table.text(selected_row, 0)  # Get transaction ID and payment date
+        tran_time = self.payment_table.text(selected_row, 7)  # Get transaction ID and payment date
+        customer = self.payment_table.text(selected_row, 1)  # Get customer name
+        amount_paid = float(self.payment_table.text(selected_row, 3))  # Get paid amount 
 
         # Admin Authentication
         password, ok = QInputDialog.getText(self, "Admin Authentication", "Enter Your Password:", QLineEdit.Password)
@@ -225,21 +190,22 @@ class PaymentHistoryWindow(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
         
                 
-        # Restore previous debt`
-        cursor.execute("UPDATE customers SET remaining_debt = remaining_debt + ?, total_paid = total_paid - ? WHERE transaction_id = ?",
-                    (amount_paid, amount_paid, trans_id))
-
-        #log reversals in red color in either a new table/window or same database
-        # Remove the payment record
-        cursor.execute("DELETE FROM payments WHERE transaction_id = ? AND entry_date_and_time = ?", (trans_id,tran_time))
+        # One transaction on the shared connection: committed together, or rolled back if either write fails
+        with conn:
+            # Restore previous debt`
+            cursor.execute("UPDATE customers SET remaining_debt = remaining_debt + ?, total_paid = total_paid - ? WHERE transaction_id = ?",
+                        (amount_paid, amount_paid, trans_id))
+
+            #log reversals in red color in either a new table/window or same database
+            # Remove the payment record
+            cursor.execute("DELETE FROM payments WHERE transaction_id = ? AND entry_date_and_time = ?", (trans_id,tran_time))
+        db_manager.manager.notify_changed(self.data, customer)
         log = f"{self.main_window .user_manager.logged_in_user} deleted payment with transaction id: {trans_id} and value {amount_paid}."
-        log_text(log)
-        conn.commit()
-        conn.close()
+        audit.record(self.main_window.user_manager.logged_in_user, audit.PAYMENT_REVERSAL, log, trans_id, amount_paid)
 
         QMessageBox.information(self, "Success", "Pa`yment reversed successfully.")
         self.load_payment_history()  # Refresh table
@@ -251,10 +217,9 @@ class PaymentHistoryWindow(QWidget):
         with payment dates strictly before the specified date
         """
         total = 0.0
-        conn = None
         
         try:
-            conn = sqlite3.connect(self.data)
+            conn = db_manager.connect(self.data)
             cursor = conn.cursor()
             
             # Parameterized query with explicit date comparison
@@ -270,9 +235,6 @@ class PaymentHistoryWindow(QWidget):
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             return 0.0
-        finally:
-            if conn:
-                conn.close()
         
         return float(total)
         
@@ -285,17 +247,16 @@ class PaymentHistoryWindow(QWidget):
             QMessageBox.warning(self, "Error", "Please select a payment to reprint receipt.")
             return
 
-        trans_id = self.payment_table.item(selected_row, 0).text()  # Get transaction ID and payment date
-        tran_time = self.payment_table.item(selected_row, 7).text()  # Get transaction ID and payment date
-        customer = self.payment_table.item(selected_row, 1).text()  # Get customer name 
-        items = self.payment_table.item(selected_row, 2).text()  # Get items
-        paid = self.payment_table.item(selected_row, 3).text()  # Get transaction amt
-        #sour = self.payment_table.item(selected_row, 8).text()  # Get payment source
-        payment_mode  = self.payment_table.item(selected_row, 4).text()  # Get customer name
-        cheque_bank =  self.payment_table.item(selected_row, 6).text()
+        trans_id = self.payment_table.text(selected_row, 0)  # Get transaction ID and payment date
+        tran_time = self.payment_table.text(selected_row, 7)  # Get transaction ID and payment date
+        customer = self.payment_table.text(selected_row, 1)  # Get customer name 
+        paid = self.payment_table.text(selected_row, 3)  # Get transaction amt
+        #sour = self.payment_table.text(selected_row, 8)  # Get payment source
+        payment_mode  = self.payment_table.text(selected_row, 4)  # Get customer name
+        cheque_bank =  self.payment_table.text(selected_row, 6)
         
         
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
 
         # Fetch payment details from database
@@ -304,23 +265,18 @@ class PaymentHistoryWindow(QWidget):
             FROM payments WHERE entry_date_and_time = ?
         """, (tran_time,))
         payment_data = cursor.fetchone()
-        conn.close()
 
         if not payment_data:
             return "*** PAYMENT RECEIPT ***\nTransaction not found."
 
         # Unpack data from database
         source = payment_data[0]
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT    unit_price, quantity, bulk_discount,  total_owed, remaining_debt
+            SELECT    total_owed, remaining_debt
             FROM customers WHERE transaction_id = ?
         """, (trans_id,))
-        quans = cursor.fetchone()
-        conn.close()
-        unit_price, quantity, bulk_discounted_price,total_owed, remaining_debt = quans
+        total_owed, remaining_debt = cursor.fetchone()
         # {self.main_window.company_name}
         receipt_text = f"""
         ****** SALES RECEIPT ******  
@@ -339,20 +295,14 @@ class PaymentHistoryWindow(QWidget):
         -----------------------------------
         """
 
-        items = items.split(", ")
-        unit_price = list(map(float, unit_price.split(", ")))
-        quantity = list(map(int, quantity.split(", ")))
-        bulk_discounted_price = list(map(float, bulk_discounted_price.split(", "))) 
-        
         # Handle multiple items
-        for i in range(len(items)):
-            original_price = unit_price[i]
-            discounted_price = bulk_discounted_price[i] if bulk_discounted_price[i] > 0 else original_price 
+        for i, (item, original_price, quantity, bulk_discounted_price) in enumerate(sale_lines.read(conn, trans_id)):
+            discounted_price = bulk_discounted_price if bulk_discounted_price > 0 else original_price 
 
-            receipt_text += f"              {items[i]} - {quantity[i]} units\n" if i != 0 else f"{items[i]} - {quantity[i]} units\n"
+            receipt_text += f"              {item} - {quantity} units\n" if i != 0 else f"{item} - {quantity} units\n"
             receipt_text += f"        Unit Price: {currency_symbol}  {original_price:.2f}\n"
             
-            if bulk_discounted_price[i] > 0:
+            if bulk_discounted_price > 0:
                 receipt_text += f"        Bulk Discounted Price: {currency_symbol}  {discounted_price:.2f}\n"
              
 
@@ -389,7 +339,7 @@ class PaymentHistoryWindow(QWidget):
             return
 
         #get the time of the transaction to use it as a key to query payments table so that even if user edits transaction time, query will be successful
-        self.query_time = self.payment_table.item(selected_row, 7).text()
+        self.query_time = self.payment_table.text(selected_row, 7)
         # Admin Authentication
         password, ok = QInputDialog.getText(self, "Admin Authentication", "Enter Your Password:", QLineEdit.Password)
         auth = self.main_window.user_manager.validate_user(self.main_window.user_manager.logged_in_user, password)
@@ -398,18 +348,11 @@ class PaymentHistoryWindow(QWidget):
             return
         
         # Enable editing in the entire table (needed for changes to take effect)
-        self.payment_table.setEditTriggers(QTableWidget.AllEditTriggers)
+        self.payment_table.setEditTriggers(SqlTableView.AllEditTriggers)
 
         # Allow editing for amount_paid, payment_mode, cheque_number, cheque_bank, cheque_clearance_date
         editable_columns = [3, 4, 5, 6, 7]  # Corresponding column indexes
-
-        for col in editable_columns:
-            item = self.payment_table.item(selected_row, col)
-            if not item:
-                item = QTableWidgetItem("")
-                self.payment_table.setItem(selected_row, col, item)
-
-            item.setFlags(item.flags() | Qt.ItemIsEditable)  # Enable editing
+        self.payment_table.set_editable(selected_row, editable_columns)
 
         # Enable "Lock in Edited" button
         self.lock_payment_button.setEnabled(True)
@@ -427,16 +370,17 @@ class PaymentHistoryWindow(QWidget):
             selected_row = self.main_row_selected
             QMessageBox.warning(self, "Error", "Changes will be applied only to the row you selected initially")
 
-        trans_id = self.payment_table.item(selected_row, 0).text()  # Transaction ID
-        payment_mode = self.payment_table.item(selected_row, 4).text()  # Updated payment mode
-        cheque_number = self.payment_table.item(selected_row, 5).text()
-        cheque_bank = self.payment_table.item(selected_row, 6).text()
-        trans_time = self.query_time #self.payment_table.item(selected_row, 7).text() 
+        trans_id = self.payment_table.text(selected_row, 0)  # Transaction ID
+        customer = self.payment_table.text(selected_row, 1)
+        payment_mode = self.payment_table.text(selected_row, 4)  # Updated payment mode
+        cheque_number = self.payment_table.text(selected_row, 5)
+        cheque_bank = self.payment_table.text(selected_row, 6)
+        trans_time = self.query_time #self.payment_table.text(selected_row, 7) 
         try:            
-            amount_paid = abs(float(self.payment_table.item(selected_row, 3).text()))  # Updated amount 
+            amount_paid = abs(float(self.payment_table.text(selected_row, 3)))  # Updated amount 
         except ValueError as e:
             QMessageBox.warning(self, "Error", "Enter numeric value into amount paid!")            
-            self.payment_table.setEditTriggers(QTableWidget.NoEditTriggers)
+            self.payment_table.setEditTriggers(SqlTableView.NoEditTriggers)
             self.lock_payment_button.setEnabled(False) 
             return 
         
@@ -456,7 +400,7 @@ class PaymentHistoryWindow(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
 
         # Fetch previous payment amount
@@ -464,9 +408,8 @@ class PaymentHistoryWindow(QWidget):
         previous_payment = cursor.fetchone()
         if not previous_payment:
             QMessageBox.warning(self, "Error", "Payment record not found.")
-            conn.close()
             # Disable editing again
-            self.payment_table.setEditTriggers(QTableWidget.NoEditTriggers)
+            self.payment_table.setEditTriggers(SqlTableView.NoEditTriggers)
             self.lock_payment_button.setEnabled(False)
             QMessageBox.information(self, "Success", "Payment details updated successfully.")
             self.load_payment_history()  # Refresh table
@@ -475,68 +418,45 @@ class PaymentHistoryWindow(QWidget):
         previous_amount = previous_payment[0]
         amount_difference = amount_paid - previous_amount  # New amount - old amount
 
-        # Update payments table
-        cursor.execute("""
-            UPDATE payments SET amount_paid=?, payment_mode=?, cheque_number=?, cheque_bank=?
-            WHERE entry_date_and_time=?
-        """, (amount_paid, payment_mode, cheque_number, cheque_bank,  trans_time))
+        # One transaction on the shared connection: committed together, or rolled back if either write fails
+        with conn:
+            # Update payments table
+            cursor.execute("""
+                UPDATE payments SET amount_paid=?, payment_mode=?, cheque_number=?, cheque_bank=?
+                WHERE entry_date_and_time=?
+            """, (amount_paid, payment_mode, cheque_number, cheque_bank,  trans_time))
 
-        # Update customers table (total_paid & remaining_debt must reflect change)
-        cursor.execute("""
-            UPDATE customers SET total_paid = total_paid + ?, remaining_debt = remaining_debt - ?
-            WHERE transaction_id=?
-        """, (amount_difference, amount_difference, trans_id))
+            # Update customers table (total_paid & remaining_debt must reflect change)
+            cursor.execute("""
+                UPDATE customers SET total_paid = total_paid + ?, remaining_debt = remaining_debt - ?
+                WHERE transaction_id=?
+            """, (amount_difference, amount_difference, trans_id))
 
-        conn.commit()
-        conn.close()
+        db_manager.manager.notify_changed(self.data, customer)
         log = f"{self.main_window .user_manager.logged_in_user} edited payment with transaction id: {trans_id}. New amount:   {amount_paid}"
-        log_text(log)
+        audit.record(self.main_window.user_manager.logged_in_user, audit.PAYMENT_EDIT, log, trans_id, amount_paid)
  
         # Disable editing again
-        self.payment_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.payment_table.setEditTriggers(SqlTableView.NoEditTriggers)
         self.lock_payment_button.setEnabled(False) 
         QMessageBox.information(self, "Success", "Payment details updated successfully.")
         self.load_payment_history()  # Refresh table
 
 
 
-    def export_payments_csv(self, ff="None", show_success = True):
-        """Export payment records to CSV."""
-    
-        if ff == "None":
-            file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "CSV Files (*.csv)", options=QFileDialog.Options())
-        else:
-            file_path = os.getcwd()+'\\'+ff +".csv"
+    def export_payments_csv(self):
+        """Export every payment matching the filters to CSV, not only the pages loaded so far."""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "CSV Files (*.csv)", options=QFileDialog.Options())
         if file_path:
-            data = []
-            for row in range(self.payment_table.rowCount()):
-                row_data = [self.payment_table.item(row, col).text() if self.payment_table.item(row, col) else "" for col in range(self.payment_table.columnCount())]
-                data.append(row_data)
-
-            headers = self.get_table_headers(self.payment_table)
-            with open(file_path, mode="w", newline="", encoding="utf-8") as file:
-                writer = csv.writer(file)
-                writer.writerow(headers)
-                writer.writerows(data)
-
-            if(show_success): QMessageBox.information(self, "Success", "Export completed successfully!")
+            table_export.export_csv(self, self.payment_table, file_path)
     
-    def get_table_headers(self, table_widget):
-        """Retrieve the column headers of the given QTableWidget."""
-        headers = []
-        for col in range(table_widget.columnCount()):
-            headers.append(table_widget.horizontalHeaderItem(col).text())
-        return headers        
-
 
     def export_payments_pdf(self):
         """Export payment records to a PDF file."""
-        #first convert to csv, then convert from csv to pdf using reportlab module        
-        self.export_payments_csv("temp",False)
         file_path, _ = QFileDialog.getSaveFileName(self, "Save File", "", "PDF Files (*.pdf)", options=QFileDialog.Options())
         if file_path:         
-            csv_to_pdf("temp.csv", file_path)
-            os.remove('temp.csv')
+            title = f"Payment Records {self.start_date.date().toString('yyyy-MM-dd')} to {self.end_date.date().toString('yyyy-MM-dd')}"
+            table_export.export_pdf(self, self.payment_table, file_path, title)
             
 
     def show_print_dialog(self):
@@ -553,12 +473,13 @@ class PaymentHistoryWindow(QWidget):
 
     def print_sales_receipt(self):
         """ Print the sales receipt or save as PDF if no printer is available """
+        from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
         receipt_text = self.generate_payment_receipt()
         if not receipt_text: return 
         printer = QPrinter(QPrinter.HighResolution)
         
         log = f"{self.main_window.user_manager.logged_in_user} reprinting receipt"
-        log_text(log)
+        audit.record(self.main_window.user_manager.logged_in_user, audit.RECEIPT_REPRINT, log)
         try:
             dialog = QPrintDialog(printer, self)
             
@@ -596,72 +517,11 @@ class PaymentHistoryWindow(QWidget):
         
         except Exception as e:
             pass
-    
-        
-    def create_sms_table(self):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sms_queue (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                recipient TEXT NOT NULL,
-                message TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
-        conn.close()
-    
-
-    def faya_sms(self, recipient, message):
-        url = "https://fayasms.com/api/v1/send"
-        data = {
-            "key": FAYASMS_API_KEY,
-            "sender_id": FAYASMS_SENDER_ID,
-            "to": recipient,
-            "message": message
-        }
 
-        try:
-            response = requests.post(url, json=data)
-            response_json = response.json()
-            if response_json.get("status") == "success":
-                return True  # SMS sent successfully
-            else:
-                return False  # SMS failed
-        except requests.exceptions.RequestException:
-            return False  # Device is offline
-    
-    
-    def send_sms_notification(self, contact, message, log=True):        
-        sent = self.faya_sms(contact, message)
-        if not sent and log:
-            self.queue_sms(contact, message) 
-    
-    def queue_sms(self, recipient, message):
-        self.create_sms_table()
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO sms_queue (recipient, message) VALUES (?, ?)", (recipient, message))
-        conn.commit()
-        conn.close()
-        
-    def send_queued_sms(self,relog=False):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT id, recipient, message FROM sms_queue WHERE status = 'pending'")
-            queued_sms = cursor.fetchall()
-
-            for sms_id, recipient, message in queued_sms:
-                if self.send_sms_notification(recipient, message,log=False):  # If SMS is sent successfully
-                    cursor.execute("DELETE FROM sms_queue WHERE id = ?", (sms_id,))  # Remove from queue
-                    QMessageBox.information(self, "Succes", "SMS sent successfully to {}.".format(recipient))
-                else:                
-                    QMessageBox.warning(self,"SMS sending failed", f"Sending SMS to {recipient} failed")
-            conn.commit()
-        except:
+    def send_queued_sms(self):
+        """Send every queued or failed SMS now; the dispatcher reports each result in the status bar."""
+        count = sms_dispatcher.dispatcher.resend(self.data)
+        if count:
+            QMessageBox.information(self, "SMS Queue", f"{count} SMS queued for sending.")
+        else:
             QMessageBox.warning(self,"No SMS Queue", "No record of SMS found")
-        finally:
-            conn.close()
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""PDF reports straight from a table view's query.
+
+csv_to_pdf read a temporary CSV back with pandas and drew it as a single
+reportlab Table at a fixed spot on one landscape page, so everything past
+about thirty rows fell off the page. write_pdf() lays the rows out with
+SimpleDocTemplate instead: as many pages as the rows need, the title and
+the column headers repeated at the top of every page, and a page number at
+the bottom.
+
+The rows are read from the cursor CHUNK_ROWS at a time and each chunk
+becomes one Table only when the layout reaches it (see LazyStory), so the
+flowables in memory stay the same size however long the report is.
+"""
+import itertools
+import os
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.units import inch
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+import table_export
+
+CHUNK_ROWS = 200
+PAGE_SIZE = landscape(letter)
+MARGIN = 0.5 * inch
+FONT, BOLD_FONT, FONT_SIZE = "Helvetica", "Helvetica-Bold", 7
+MAX_COLUMN_CHARS = 40  # a wider column than this wraps its text
+FRAME_PADDING = 6  # SimpleDocTemplate's frame padding; the rows start this far below the top margin
+
+HEADER_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, -1), BOLD_FONT),
+    ('FONTSIZE', (0, 0), (-1, -1), FONT_SIZE),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+])
+BODY_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), FONT),
+    ('FONTSIZE', (0, 0), (-1, -1), FONT_SIZE),
+    ('LEADING', (0, 0), (-1, -1), FONT_SIZE + 1.5),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TOPPADDING', (0, 0), (-1, -1), 1),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.beige]),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+])
+
+
+class LazyStory(list):
+    """The story handed to build(), filled from a generator as the layout consumes it.
+
+    build() only looks at the front of the list and checks len() on every
+    turn, so keeping a couple of flowables queued is enough.
+    """
+
+    def __init__(self, flowables, ahead=2):
+        super().__init__()
+        self.source = iter(flowables)
+        self.ahead = ahead
+
+    def __len__(self):
+        while list.__len__(self) < self.ahead:
+            flowable = next(self.source, None)
+            if flowable is None:
+                break
+            self.append(flowable)
+        return list.__len__(self)
+
+
+def pdf_text(value):
+    # The base-14 fonts have no cedi sign
+    return str(value).replace("\u20B5", "GHS")
+
+
+def column_widths(headers, sample, width):
+    """Split the page width between the columns by the longest line of the header and the first rows."""
+    weights = []
+    for column, header in enumerate(headers):
+        lines = [header] + [line for row in sample if column < len(row) for line in str(row[column]).splitlines()]
+        weights.append(min(MAX_COLUMN_CHARS, max(4, max(len(line.rstrip()) for line in lines))))
+    return [width * weight / sum(weights) for weight in weights]
+
+
+def fit_cell(text, width):
+    """The text wrapped to the column width; most cells are short enough to skip measuring."""
+    text = pdf_text(text)
+    if len(text) * FONT_SIZE * 0.6 < width:
+        return text
+    lines = []
+    for line in text.splitlines() or [""]:
+        if stringWidth(line, FONT, FONT_SIZE) <= width:
+            lines.append(line)
+        else:
+            lines += simpleSplit(line, FONT, FONT_SIZE, width)
+    return "\n".join(lines)
+
+
+def write_pdf(conn, file_path, headers, query, params, format_row, progress=None, title="Report"):
+    """Write every row of `query` to a paginated PDF at `file_path`; returns the number of rows.
+
+    `progress(rows laid out)` is called after each chunk, as for
+    table_export.write_csv; when it returns False the report stops, the
+    partial file is removed and None is returned.
+    """
+    headers = [pdf_text(header) for header in headers]
+    width = PAGE_SIZE[0] - 2 * MARGIN
+    chunks = table_export.stream_rows(conn, query, params, format_row, CHUNK_ROWS)
+    first_chunk = next(chunks, [])
+    widths = column_widths(headers, first_chunk, width)
+    cell_widths = [column_width - 6 for column_width in widths]  # minus the cell padding on both sides
+
+    header = Table([[fit_cell(text, cell_width) for text, cell_width in zip(headers, cell_widths)]], colWidths=widths, style=HEADER_STYLE)
+    _, header_height = header.wrap(width, PAGE_SIZE[1])
+    title_height = 0.3 * inch
+    printed = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    def draw_page(canvas, doc):
+        canvas.saveState()
+        top = PAGE_SIZE[1] - MARGIN
+        canvas.setFont(BOLD_FONT, 11)
+        canvas.drawString(MARGIN, top - 11, pdf_text(title))
+        canvas.setFont(FONT, FONT_SIZE)
+        canvas.drawRightString(PAGE_SIZE[0] - MARGIN, top - 11, f"Printed {printed}")
+        header.drawOn(canvas, MARGIN, top - title_height - header_height)
+        canvas.drawCentredString(PAGE_SIZE[0] / 2, MARGIN / 2, f"Page {doc.page}")
+        canvas.restoreState()
+
+    state = {"rows": 0, "stopped": False}
+
+    def tables():
+        for chunk in itertools.chain([first_chunk] if first_chunk else [], chunks):
+            state["rows"] += len(chunk)
+            yield Table([[fit_cell(text, cell_width) for text, cell_width in zip(row, cell_widths)] for row in chunk],
+                        colWidths=widths, style=BODY_STYLE)
+            if progress and progress(state["rows"]) is False:
+                state["stopped"] = True
+                return
+
+    document = SimpleDocTemplate(file_path, pagesize=PAGE_SIZE, title=pdf_text(title), pageCompression=1,
+                                 leftMargin=MARGIN, rightMargin=MARGIN, bottomMargin=MARGIN,
+                                 topMargin=MARGIN + title_height + header_height - FRAME_PADDING)
+    story = LazyStory(tables())
+    if not first_chunk:
+        story.append(Table([["No rows to report."]], style=BODY_STYLE))
+    document.build(story, onFirstPage=draw_page, onLaterPages=draw_page)
+    if state["stopped"]:
+        os.remove(file_path)
+        return None
+    return state["rows"]
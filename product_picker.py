@@ -0,0 +1,220 @@
+"""Product picker of the Record Sale dialog.
+
+The dialog used to list every inventory item with a QSpinBox and a
+QDoubleSpinBox cell widget per row, so opening it with thousands of
+products built thousands of widgets. The picker instead searches the
+inventory (paged, through the inventory_fts index) and keeps the basket as
+a short list of chosen lines; quantities and discounts are edited through a
+delegate, which creates a spin box only for the cell being edited.
+"""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableView, QSpinBox,
+                             QDoubleSpinBox, QStyledItemDelegate, QAbstractItemView, QHeaderView)
+
+import queries
+from table_models import SqlTableView
+from filter_controller import FilterController
+
+
+class BasketModel(QAbstractTableModel):
+    """The lines of a sale: product, unit price, quantity, discounted price and amount.
+
+    Prices come from the InventoryCache; a change to one line recomputes
+    that line only and moves the total by the difference.
+    """
+
+    HEADERS = ["Product", "Unit Price", "Quantity", "Discounted Price", "Amount"]
+    QUANTITY, DISCOUNT = 2, 3
+
+    total_changed = pyqtSignal(float)
+
+    def __init__(self, inventory, parent=None):
+        super().__init__(parent)
+        self.inventory = inventory
+        self.lines = []  # [item id, item name, quantity, discounted price, amount]
+        self.total = 0.0
+
+    def add(self, item_id, item_name):
+        """Add a product with quantity 1, or return the row it already has."""
+        for row, line in enumerate(self.lines):
+            if line[0] == item_id:
+                return row
+        row = len(self.lines)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.lines.append([item_id, item_name, 1, 0.0, 0.0])
+        self.endInsertRows()
+        self.update_line(row)
+        return row
+
+    def remove(self, row):
+        if not 0 <= row < len(self.lines):
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        amount = self.lines.pop(row)[4]
+        self.endRemoveRows()
+        self.move_total(-amount)
+
+    def set_line(self, row, quantity, discount):
+        self.lines[row][self.QUANTITY] = quantity
+        self.lines[row][self.DISCOUNT] = discount
+        self.update_line(row)
+
+    def update_line(self, row):
+        item_id, _, quantity, discount, amount = self.lines[row]
+        unit_price = self.inventory.price(item_id)
+        price = unit_price if discount == 0 else min(discount, unit_price)
+        self.lines[row][4] = quantity * price
+        self.dataChanged.emit(self.index(row, 1), self.index(row, len(self.HEADERS) - 1))
+        self.move_total(self.lines[row][4] - amount)
+
+    def move_total(self, difference):
+        self.total += difference
+        if not self.lines or abs(self.total) < 0.005:
+            self.total = 0.0  # no drift left over once the basket is back to zero
+        self.total_changed.emit(self.total)
+
+    def reprice(self):
+        """Recompute every line after the inventory prices changed."""
+        for row in range(len(self.lines)):
+            self.update_line(row)
+
+    def products(self):
+        """(item_name, quantity, bulk_discount) of the lines with a quantity, as the sale engine takes them."""
+        return [(name, quantity, discount) for _, name, quantity, discount, _ in self.lines if quantity > 0]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item_id, name, quantity, discount, amount = self.lines[index.row()]
+        column = index.column()
+        if role == Qt.EditRole:
+            return quantity if column == self.QUANTITY else discount
+        if role == Qt.DisplayRole:
+            return [name, f"{self.inventory.price(item_id):.2f}", str(quantity), f"{discount:.2f}", f"{amount:.2f}"][column]
+        if role == Qt.TextAlignmentRole and column > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() in (self.QUANTITY, self.DISCOUNT):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() not in (self.QUANTITY, self.DISCOUNT):
+            return False
+        self.lines[index.row()][index.column()] = int(value) if index.column() == self.QUANTITY else float(value)
+        self.update_line(index.row())
+        return True
+
+
+class LineEditorDelegate(QStyledItemDelegate):
+    """Spin box editors for the quantity and discounted price of a basket line."""
+
+    def createEditor(self, parent, option, index):
+        if index.column() == BasketModel.QUANTITY:
+            editor = QSpinBox(parent)
+            editor.setRange(0, 9999)
+        else:
+            editor = QDoubleSpinBox(parent)
+            editor.setRange(0, 9999)
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value())
+
+
+class ProductPicker(QWidget):
+    """Search box and result list over the inventory, above the basket of chosen lines."""
+
+    def __init__(self, database, inventory, parent=None):
+        super().__init__(parent)
+        self.database = database
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Search Products")
+        self.results = SqlTableView(["Product", "Unit Price", "In Stock"], format_row=lambda record: [str(value) for value in record[1:]])
+        self.results.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.results.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.results.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.results.doubleClicked.connect(self.add_selected)
+
+        self.basket = BasketModel(inventory, self)
+        self.basket_view = QTableView()
+        self.basket_view.setModel(self.basket)
+        self.basket_view.setItemDelegate(LineEditorDelegate(self.basket_view))
+        self.basket_view.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.basket_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.basket_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+
+        add_button = QPushButton("Add to Sale")
+        add_button.clicked.connect(self.add_selected)
+        remove_button = QPushButton("Remove Line")
+        remove_button.clicked.connect(self.remove_selected)
+        buttons = QHBoxLayout()
+        buttons.addWidget(add_button)
+        buttons.addWidget(remove_button)
+        buttons.addStretch()
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.search)
+        layout.addWidget(self.results)
+        layout.addLayout(buttons)
+        layout.addWidget(self.basket_view)
+        self.setLayout(layout)
+
+        self.search_filter = FilterController(self.prepare_search, parent=self)
+        self.search.textChanged.connect(self.search_filter.schedule)
+        self.search.returnPressed.connect(self.add_selected)
+        self.search_filter.run_now()
+
+    def prepare_search(self):
+        """(database, job, apply) of the product search; see FilterController."""
+        query, params = queries.products(self.search.text().strip())
+
+        def job(conn):
+            return self.results.read_page(conn, query, params)
+
+        def apply(first_page):
+            self.results.load(self.database, query, params, first_page)
+            if self.results.rowCount():
+                self.results.selectRow(0)
+
+        return self.database, job, apply
+
+    def add_selected(self):
+        row = self.results.currentRow()
+        if row == -1:
+            return
+        record = self.results.source.record(row)
+        basket_row = self.basket.add(record[0], record[1])
+        # AllEditTriggers opens the quantity editor as the cell becomes current
+        self.basket_view.setCurrentIndex(self.basket.index(basket_row, BasketModel.QUANTITY))
+
+    def remove_selected(self):
+        index = self.basket_view.currentIndex()
+        if index.isValid():
+            self.basket.remove(index.row())
+
+    def refresh(self):
+        """Re-read prices and stock after another window changed the inventory."""
+        self.basket.reprice()
+        self.search_filter.run_now()
@@ -0,0 +1,163 @@
+"""SQL behind the app's list views.
+
+Each function returns (query, params) for the filters a view currently
+shows, so the widget code, benchmarks and exports all run the same SQL.
+"""
+import sale_lines
+
+ALL_CUSTOMERS = "All Customers"  # first entry of the customer pickers: no filter
+
+
+def customer_name(text):
+    """The customer filter as typed or picked; "" for none (ALL_CUSTOMERS included)."""
+    return "" if text == ALL_CUSTOMERS else text
+
+
+def text_search(fts, columns, text, key="rowid"):
+    """(condition, params) selecting rows whose `columns` contain `text`.
+
+    The condition is answered by the FTS5 trigram index `fts` (see
+    migrations.SEARCH_INDEXES). Text of three or more characters is matched
+    as a phrase, which with trigrams means "anywhere in the value"; shorter
+    text has no trigram and falls back to LIKE on the index.
+    """
+    if len(text) >= 3:
+        phrase = '"' + text.replace('"', '""') + '"'
+        return f"{key} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)", [f"{{{' '.join(columns)}}} : {phrase}"]
+    where = " OR ".join(f"{column} LIKE ?" for column in columns)
+    return f"{key} IN (SELECT rowid FROM {fts} WHERE {where})", [f"%{text}%"] * len(columns)
+
+
+def payment_history(customer, product, start_date, end_date):
+    """Payments between two dates (yyyy-MM-dd) with the products of each sale.
+
+    The products and quantities (last column, see sale_lines.summary) are
+    read from sale_lines by transaction ID, and only for the rows of the
+    page being displayed. The date filter is written as a range on the raw
+    timestamp so SQLite walks idx_payments_entry_date in order instead of
+    sorting the result.
+    """
+    query = f"""SELECT p.transaction_id, p.customer_name, p.item_name, p.amount_paid, p.payment_mode, p.cheque_number, p.cheque_bank,
+                      p.entry_date_and_time, p.transaction_date, {sale_lines.summary("p.transaction_id")}
+               FROM payments p
+               WHERE p.entry_date_and_time >= ? AND p.entry_date_and_time < DATE(?, '+1 day')"""
+    params = [start_date, end_date]
+
+    customer = customer_name(customer)
+    if customer:
+        query += " AND p.customer_name = ?"
+        params.append(customer)
+    if product:
+        condition, condition_params = text_search("payments_fts", ["item_name"], product, "p.rowid")
+        query += " AND " + condition
+        params += condition_params
+
+    query += " ORDER BY p.entry_date_and_time DESC"
+    return query, params
+
+
+def transaction_history(customer):
+    """A customer's sales, each followed by the payments made against it.
+
+    One LEFT JOIN replaces the per-sale payments lookup; rows arrive grouped
+    by sale (c.id) with payments in the order they were recorded. Sales with
+    no payments come back once with the p.* columns NULL. The fourth column
+    holds the sale's products and quantities (see sale_lines.summary).
+    """
+    query = f"""SELECT c.id, c.transaction_id, c.product_name, {sale_lines.summary("c.transaction_id")}, c.total_paid, c.total_owed, c.remaining_debt, c.transaction_date,
+                      p.id, p.item_name, p.amount_paid, p.transaction_date
+               FROM customers c LEFT JOIN payments p ON p.transaction_id = c.transaction_id
+               WHERE c.name = ?
+               ORDER BY c.transaction_id, c.id, p.id"""
+    return query, [customer]
+
+
+def products(search_text=""):
+    """Inventory items whose name contains `search_text`, for the sales product picker."""
+    query = "SELECT id, item_name, unit_price, quantity_remaining FROM inventory"
+    params = []
+    if search_text:
+        condition, params = text_search("inventory_fts", ["item_name"], search_text)
+        query += " WHERE " + condition
+    return query + " ORDER BY item_name", params
+
+
+def inventory():
+    return ("SELECT item_name, date_received, unit_price, quantity_received, quantity_issued, quantity_remaining, total_cost FROM inventory", [])
+
+
+# The sixth column is the sale's products and quantities (see sale_lines.summary)
+CUSTOMER_COLUMNS = f"name, transaction_id, contact, location, product_name, {sale_lines.summary()}, total_owed, total_paid, remaining_debt, transaction_date"
+
+
+def customers(debtors_only):
+    """Every sale for the Customers view, or only those with debt left."""
+    if debtors_only:
+        return f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE remaining_debt > 0 ORDER BY remaining_debt DESC", []
+    return f"SELECT {CUSTOMER_COLUMNS} FROM customers ORDER BY name ASC", []
+
+
+def customer_search(customer, product):
+    """Sales filtered by customer and product name, newest transaction first."""
+    conditions = []
+    params = []
+    for column, text in (("name", customer_name(customer)), ("product_name", product)):
+        if text:
+            condition, condition_params = text_search("customers_fts", [column], text)
+            conditions.append(condition)
+            params += condition_params
+
+    query = f"SELECT {CUSTOMER_COLUMNS} FROM customers"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY transaction_id DESC"
+    return query, params
+
+
+def customer_records(search_text):
+    """Rows of the customer base (customers_data) matching a search."""
+    query = "SELECT name, location, contact FROM customers_data"
+    params = []
+    if search_text:
+        condition, params = text_search("customers_data_fts", ["name", "location", "contact"], search_text)
+        query += " WHERE " + condition
+    return query, params
+
+
+def customer_of_transaction(text):
+    """Name on the first sale whose transaction ID contains `text`."""
+    condition, params = text_search("customers_fts", ["transaction_id"], text)
+    return f"SELECT name FROM customers WHERE {condition}", params
+
+
+def open_transactions(customer):
+    """IDs of the sales with debt left whose customer name contains `customer`."""
+    condition, params = text_search("customers_fts", ["name"], customer)
+    return f"SELECT transaction_id FROM customers WHERE {condition} AND remaining_debt > 0", params
+
+
+def debtors():
+    """One row per contact with debt left: (contact, name, total remaining debt), largest debt first."""
+    return ("SELECT contact, MAX(name), SUM(remaining_debt) FROM customers "
+            "WHERE remaining_debt > 0 AND IFNULL(contact, '') != '' "
+            "GROUP BY contact ORDER BY SUM(remaining_debt) DESC", [])
+
+
+def audit_log(actions=(), transaction_id="", user=""):
+    """Audit trail entries, newest first, of the given actions (all when empty) and matching transaction ID and user."""
+    conditions = []
+    params = []
+    if actions:
+        conditions.append(f"action IN ({', '.join('?' for _ in actions)})")
+        params += list(actions)
+    if transaction_id:
+        conditions.append("transaction_id = ?")
+        params.append(transaction_id)
+    if user:
+        conditions.append("user = ?")
+        params.append(user)
+    query = "SELECT logged_at, user, action, transaction_id, amount, detail FROM audit_log"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY logged_at DESC, id DESC"
+    return query, params
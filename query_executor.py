@@ -0,0 +1,204 @@
+"""Database reads for the views, run on a thread pool.
+
+The views used to run their queries on the GUI thread, so a slow disk or a
+large file froze the window while a table loaded. The shared `executor`
+runs such reads on a QThreadPool instead:
+
+    executor.submit(database, job, apply, channel)
+
+`job(conn)` runs on a pool thread with that thread's own read-only
+connection (db_manager.open_reader) and `apply(result)` is called with its
+result back on the GUI thread. The pool threads keep their connections
+between jobs; db_manager.manager.close() and close_all() close them
+through close_readers(), so the file can be deleted afterwards. Submitting again on the same `channel` (any
+object, usually the widget being filled) supersedes the earlier request:
+it is interrupted if it is running and its result is dropped. A job that
+fails calls `on_error(exception)` on the GUI thread when one was given.
+"""
+import sqlite3
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, pyqtSignal
+
+import db_manager
+
+MAX_THREADS = 2  # SQLite readers barely scale past this on the single disk of a shop PC
+# SQLite VM instructions between looks at Request.cancelled; catches a cancel
+# that came before the job's first statement, which conn.interrupt() misses
+CHECK_CANCELLED_EVERY = 10000
+
+
+class Request:
+    """One submitted read; cancel() stops it and drops its result."""
+
+    def __init__(self, database, job, apply, channel, on_error=None):
+        self.database = database
+        self.job = job
+        self.apply = apply
+        self.channel = channel
+        self.on_error = on_error
+        self.cancelled = False
+        self.conn = None  # set while the job runs on a pool thread
+        # Guards cancelled and conn: a pool thread only takes a connection
+        # for a request that is not cancelled, and gives it back before the
+        # connection moves on to another job, so cancel() never interrupts
+        # a query that is not this request's
+        self.lock = threading.Lock()
+        self.idle = threading.Event()  # clear while the job holds a connection
+        self.idle.set()
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            if self.conn is not None:
+                self.conn.interrupt()
+
+
+class QueryJob(QRunnable):
+    def __init__(self, executor, request):
+        super().__init__()
+        self.executor = executor
+        self.request = request
+
+    def run(self):
+        request = self.request
+        result = error = None
+        try:
+            with request.lock:
+                if not request.cancelled:
+                    request.conn = self.executor.reader(request.database)
+                    request.idle.clear()
+            if request.conn is not None:
+                request.conn.set_progress_handler(lambda: request.cancelled, CHECK_CANCELLED_EVERY)
+                result = request.job(request.conn)
+        except sqlite3.OperationalError as e:
+            if "interrupted" in str(e):
+                request.cancelled = True
+            else:
+                traceback.print_exc()
+                error = e
+        except Exception as e:
+            traceback.print_exc()
+            error = e
+        finally:
+            with request.lock:
+                if request.conn is not None:
+                    request.conn.set_progress_handler(None, 0)
+                request.conn = None
+            request.idle.set()
+        self.executor.done.emit(request, result, error)
+
+
+class QueryExecutor(QObject):
+    """Runs view queries on a thread pool and hands the results back to the GUI thread."""
+
+    done = pyqtSignal(object, object, object)  # request, result, exception or None (emitted from pool threads)
+    busy_changed = pyqtSignal(bool)  # True while any query is queued or running
+
+    def __init__(self, max_threads=MAX_THREADS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.pool.setExpiryTimeout(-1)  # threads keep their reader connections for the whole session
+        self.readers = {}  # pool thread id -> (file key, read-only connection)
+        self.readers_lock = threading.Lock()
+        self.latest = {}  # channel -> most recent request
+        self.outstanding = set()  # requests submitted and not yet delivered
+        self.pending = 0
+        self.done.connect(self.deliver)
+
+    def submit(self, database, job, apply, channel=None, on_error=None):
+        """Run `job(conn)` on the pool and then `apply(result)` on the GUI thread; returns the Request."""
+        request = Request(database, job, apply, channel, on_error)
+        if channel is not None:
+            self.cancel(channel)
+            self.latest[channel] = request
+        self.outstanding.add(request)
+        self.pending += 1
+        if self.pending == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(QueryJob(self, request))
+        return request
+
+    def cancel(self, channel):
+        """Drop the outstanding request of `channel`, interrupting it if it is running."""
+        request = self.latest.pop(channel, None)
+        if request is not None:
+            request.cancel()
+
+    def deliver(self, request, result, error):
+        self.outstanding.discard(request)
+        self.pending -= 1
+        if self.pending == 0:
+            self.busy_changed.emit(False)
+        if request.cancelled:
+            return
+        if request.channel is not None:
+            if self.latest.get(request.channel) is not request:
+                return
+            del self.latest[request.channel]
+        if error is None:
+            request.apply(result)
+        elif request.on_error is not None:
+            request.on_error(error)
+
+    def reader(self, database):
+        """The calling pool thread's read-only connection to `database`, reopened when the file changes."""
+        key = db_manager.manager.key(database)
+        thread = threading.get_ident()
+        with self.readers_lock:
+            reader = self.readers.get(thread)
+            if reader is not None and reader[0] == key:
+                return reader[1]
+            if reader is not None:
+                del self.readers[thread]
+        if reader is not None:
+            reader[1].close()
+        # Closed from the GUI thread by close_readers(), never while a job uses it
+        conn = db_manager.open_reader(database, check_same_thread=False)
+        with self.readers_lock:
+            self.readers[thread] = (key, conn)
+        return conn
+
+    def close_readers(self, database=None):
+        """Close the pool threads' connections to `database` (None: to every file) once their queries stop.
+
+        Queries on that file are cancelled first, and only those that are
+        running are waited for; queries on other files carry on. Subscribed
+        to db_manager.manager.subscribe_close, so runs before a file is closed.
+        """
+        key = None if database is None else db_manager.manager.key(database)
+        closing = [request for request in self.outstanding
+                   if key is None or db_manager.manager.key(request.database) == key]
+        for request in closing:
+            if self.latest.get(request.channel) is request:
+                del self.latest[request.channel]
+            request.cancel()  # a queued request will not take a connection now
+        for request in closing:
+            request.idle.wait()  # an interrupted query gives its connection back within a step
+        with self.readers_lock:
+            for thread, (reader_key, conn) in list(self.readers.items()):
+                if key is None or reader_key == key:
+                    conn.close()
+                    del self.readers[thread]
+
+    def is_busy(self):
+        return self.pending > 0
+
+    def shutdown(self):
+        """Drop queued queries and wait for the running ones; connect to QApplication.aboutToQuit."""
+        for channel in list(self.latest):
+            self.cancel(channel)
+        self.pool.clear()
+        self.pool.waitForDone()
+
+    def wait(self):
+        """Block until every submitted query has run and been applied (scripts and benchmarks)."""
+        while self.pending:
+            self.pool.waitForDone()
+            QCoreApplication.processEvents()
+
+
+executor = QueryExecutor()
+db_manager.manager.subscribe_close(executor.close_readers)
@@ -0,0 +1,148 @@
+"""Recording a sale in one transaction.
+
+SalesWindow.record_sale used to read the inventory row, insert into sales
+and update the stock once per product, and then ran an UPDATE over every
+sale of the customer whose debt was untouched. record() instead prices and
+checks the whole basket with one inventory query, so a sale is refused
+before anything is written, and then writes every table with executemany
+inside a single BEGIN IMMEDIATE transaction.
+"""
+from datetime import datetime
+
+import sale_lines
+
+
+class SaleError(Exception):
+    """A sale that cannot be recorded; nothing was written."""
+
+    def __init__(self, message, items=()):
+        super().__init__(message)
+        self.items = list(items)
+
+
+class Sale:
+    """A basket as entered in the Record Sale dialog.
+
+    `products` holds (item_name, quantity, bulk_discount) tuples; a bulk
+    discount above 0 is the unit price charged instead of the inventory
+    price. record() fills in lines, total_owed and remaining_debt.
+    """
+
+    def __init__(self, transaction_id, customer, location, contact, products, paid=0.0, payment_mode="Cash",
+                 cheque_number=None, cheque_bank=None, cheque_clearance_date=None, transaction_date=None, user=None):
+        self.transaction_id = transaction_id
+        self.customer = customer
+        self.location = location
+        self.contact = contact
+        self.products = list(products)
+        self.paid = paid
+        self.payment_mode = payment_mode
+        self.cheque_number = cheque_number
+        self.cheque_bank = cheque_bank
+        self.cheque_clearance_date = cheque_clearance_date
+        self.transaction_date = transaction_date
+        self.user = user
+
+        self.lines = []  # (item_name, unit_price, quantity, bulk_discount) as written to sale_lines
+        self.total_owed = 0.0
+        self.remaining_debt = 0.0
+
+    @property
+    def items(self):
+        return sale_lines.label(self.lines)
+
+
+def price(cursor, products):
+    """(lines, total owed) of a basket, checked against the stock in one query.
+
+    Raises SaleError naming every product that is unknown or short of stock.
+    """
+    names = sorted({item for item, _, _ in products})
+    stock = {}
+    cursor.execute(f"SELECT item_name, unit_price, quantity_remaining FROM inventory WHERE item_name IN ({', '.join('?' * len(names))})", names)
+    for item, unit_price, remaining in cursor.fetchall():
+        stock.setdefault(item, (unit_price, remaining))
+
+    missing = [item for item in names if item not in stock]
+    if missing:
+        raise SaleError(f"Not found in inventory: {', '.join(missing)}.", missing)
+
+    wanted = {}
+    for item, quantity, _ in products:
+        wanted[item] = wanted.get(item, 0) + quantity
+    short = [item for item in names if wanted[item] > (stock[item][1] or 0)]
+    if short:
+        raise SaleError(f"Not enough stock for: {', '.join(short)}.", short)
+
+    lines = []
+    total_owed = 0.0
+    for item, quantity, bulk_discount in products:
+        unit_price = stock[item][0]
+        applied_price = bulk_discount if bulk_discount > 0 else unit_price
+        total_owed += quantity * applied_price
+        lines.append((item, unit_price, quantity, bulk_discount))
+    return lines, total_owed
+
+
+def record(conn, sale):
+    """Write `sale` to sales, inventory, customers, sale_lines, customers_data and payments.
+
+    Everything happens in one transaction, taken with BEGIN IMMEDIATE so the
+    stock read by price() cannot change before it is written back. On any
+    error the transaction is rolled back and the exception re-raised.
+    """
+    if not sale.products:
+        raise SaleError("No products selected.")
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cursor = conn.cursor()
+    if not conn.in_transaction:
+        cursor.execute("BEGIN IMMEDIATE")
+    try:
+        sale.lines, sale.total_owed = price(cursor, sale.products)
+        sale.remaining_debt = sale.total_owed - sale.paid
+
+        # The amount paid is spread over the lines in order, so each sales row
+        # is written with its final amount_paid and remaining_debt
+        sales_rows = []
+        unallocated = sale.paid
+        for item, unit_price, quantity, bulk_discount in sale.lines:
+            item_total = quantity * (bulk_discount if bulk_discount > 0 else unit_price)
+            amount_paid = min(max(unallocated, 0), item_total)
+            unallocated -= amount_paid
+            sales_rows.append((sale.customer, sale.location, sale.contact, item, quantity, unit_price, item_total,
+                               amount_paid, item_total - amount_paid, sale.payment_mode, sale.user))
+        cursor.executemany("""
+            INSERT INTO sales (customer_name, location, contact, item_name, quantity, unit_price, total_owed, amount_paid, remaining_debt, payment_mode, sale_date, user_logged)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, date('now'), ?)
+        """, sales_rows)
+
+        cursor.executemany("""
+            UPDATE inventory
+            SET quantity_issued = quantity_issued + ?, quantity_remaining = quantity_remaining - ?
+            WHERE item_name = ?
+        """, [(quantity, quantity, item) for item, _, quantity, _ in sale.lines])
+
+        cursor.execute("""
+            INSERT INTO customers (transaction_id, name, location, contact, product_name, total_owed, total_paid, remaining_debt, entry_date_and_time, transaction_date, user_logged)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (sale.transaction_id, sale.customer, sale.location, sale.contact, sale.items, sale.total_owed, sale.paid,
+              sale.remaining_debt, now, sale.transaction_date, sale.user))
+        sale_lines.write(cursor, sale.transaction_id, sale.lines)
+
+        cursor.execute("""
+            INSERT INTO customers_data (name, location, contact)
+            VALUES (?, ?, ?)
+            ON CONFLICT(contact) DO NOTHING
+        """, (sale.customer, sale.location, sale.contact))
+
+        if sale.paid > 0:
+            cursor.execute("""
+                INSERT INTO payments (transaction_id, customer_name, item_name, amount_paid, payment_mode, cheque_number, cheque_bank, cheque_clearance_date, entry_date_and_time, transaction_date, user_logged)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (sale.transaction_id, sale.customer, sale.items, sale.paid, sale.payment_mode, sale.cheque_number,
+                  sale.cheque_bank, sale.cheque_clearance_date, now, sale.transaction_date, sale.user))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return sale
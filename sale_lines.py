@@ -0,0 +1,129 @@
+"""The products of each sale, one row per line.
+
+A sale used to keep its products in customers.product_name, unit_price,
+quantity and bulk_discount as ", "-joined strings that every reader split
+again (and that broke on product names containing a comma). The lines now
+live in sale_lines, keyed by customers.transaction_id:
+
+    sale_lines(transaction_id, line_no, item_name, unit_price, quantity, bulk_discount)
+
+customers.product_name is still written as a readable label of the items
+for the search box and payments.item_name; the unit_price, quantity and
+bulk_discount columns are left as they were on old rows and empty on new
+ones. Nothing reads them except backfill().
+"""
+
+COLUMNS = "item_name, unit_price, quantity, bulk_discount"
+
+# Separators of summary() text; control characters cannot occur in product names
+FIELD_SEPARATOR = "\x1f"
+LINE_SEPARATOR = "\x1e"
+
+
+def create_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sale_lines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT NOT NULL,
+            line_no INTEGER NOT NULL,
+            item_name TEXT NOT NULL,
+            unit_price REAL DEFAULT 0,
+            quantity INTEGER DEFAULT 0,
+            bulk_discount REAL DEFAULT 0,
+            UNIQUE (transaction_id, line_no)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sale_lines_item_name ON sale_lines (item_name)")
+
+
+def label(lines):
+    """customers.product_name / payments.item_name text for a list of lines."""
+    return ", ".join(line[0] for line in lines)
+
+
+def read(conn, transaction_id):
+    """[(item_name, unit_price, quantity, bulk_discount), ...] of one sale, in the order sold."""
+    return conn.execute(f"SELECT {COLUMNS} FROM sale_lines WHERE transaction_id = ? ORDER BY line_no",
+                        (transaction_id,)).fetchall()
+
+
+def write(cursor, transaction_id, lines):
+    """Replace the lines of a sale with `lines` ((item_name, unit_price, quantity, bulk_discount) tuples)."""
+    cursor.execute("DELETE FROM sale_lines WHERE transaction_id = ?", (transaction_id,))
+    cursor.executemany(f"INSERT INTO sale_lines (transaction_id, line_no, {COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                       [(transaction_id, n, *line) for n, line in enumerate(lines, 1)])
+
+
+def delete(cursor, transaction_id):
+    cursor.execute("DELETE FROM sale_lines WHERE transaction_id = ?", (transaction_id,))
+
+
+def summary(transaction_id="customers.transaction_id"):
+    """SQL expression giving the (item_name, quantity) pairs of a sale as one text value.
+
+    Lets a list query carry its products in a single column without a
+    GROUP BY over the whole list; split_summary() turns it back into pairs.
+    """
+    return (f"(SELECT group_concat(item_name || char(31) || quantity, char(30)) FROM"
+            f" (SELECT item_name, quantity FROM sale_lines WHERE transaction_id = {transaction_id} ORDER BY line_no))")
+
+
+def split_summary(text):
+    """[(item_name, quantity text), ...] of a summary() value."""
+    if not text:
+        return []
+    return [tuple(line.split(FIELD_SEPARATOR, 1)) for line in text.split(LINE_SEPARATOR)]
+
+
+def format_summary(text, width=20):
+    """Product cell text: one "name  -  qty" line per product."""
+    return "\n".join(f"{name.ljust(width)}  -  {quantity.rjust(3)}" for name, quantity in split_summary(text))
+
+
+def parse_legacy(product_name, unit_price, quantity, bulk_discount):
+    """Lines of a sale stored in the old ", "-joined columns.
+
+    Prices and discounts missing from a row count as 0. A row whose columns
+    do not split into the same number of parts (a product name with a comma
+    in it) is read as a single line holding the whole name.
+    """
+    def parts(text):
+        return [part.strip() for part in str(text).split(", ")] if text not in (None, "") else []
+
+    def number(text, kind):
+        try:
+            return kind(float(text))
+        except (TypeError, ValueError):
+            return kind(0)
+
+    names, prices, quantities, discounts = parts(product_name), parts(unit_price), parts(quantity), parts(bulk_discount)
+    if not names:
+        return []
+    if len(quantities) != len(names):
+        total = sum(number(q, int) for q in quantities)
+        return [(product_name, number(prices[0] if len(prices) == 1 else None, float), total,
+                 number(discounts[0] if len(discounts) == 1 else None, float))]
+    return [(name, number(prices[i] if i < len(prices) else None, float), number(quantities[i], int),
+             number(discounts[i] if i < len(discounts) else None, float))
+            for i, name in enumerate(names)]
+
+
+def backfill(cursor):
+    """Create the lines of every sale that has none yet from its old string columns.
+
+    Run once by the migration and again after an import brought in a
+    customers table from an older file. Returns the number of sales filled in.
+    """
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(customers)")}
+    if not {"transaction_id", "product_name", "unit_price", "quantity", "bulk_discount"} <= existing:
+        return 0
+    rows = cursor.execute("""SELECT transaction_id, product_name, unit_price, quantity, bulk_discount FROM customers
+                             WHERE transaction_id IS NOT NULL
+                               AND transaction_id NOT IN (SELECT transaction_id FROM sale_lines)""").fetchall()
+    filled = 0
+    for transaction_id, *columns in rows:
+        lines = parse_legacy(*columns)
+        if lines:
+            write(cursor, transaction_id, lines)
+            filled += 1
+    return filled
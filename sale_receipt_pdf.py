@@ -13,7 +13,7 @@ class SalesReceiptPDF(FPDF):
         self.set_font("Arial", "", 10)
         
         # Unpack receipt data
-        trans_id, customer, location, contact, items, unit_price, quantity, bulk_discounted_price, total_owed, paid, remaining_debt, payment_mode, cheque_bank = receipt_data
+        trans_id, customer, location, contact, lines, total_owed, paid, remaining_debt, payment_mode, cheque_bank = receipt_data
         sale_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Transaction details
@@ -31,16 +31,11 @@ class SalesReceiptPDF(FPDF):
         self.ln()
         
         self.set_font("Arial", "", 10)
-        items = items.split(", ")
-        unit_price = list(map(float, unit_price.split(", ")))
-        quantity = list(map(int, quantity.split(", ")))
-        bulk_discounted_price = list(map(float, bulk_discounted_price.split(", ")))
-        
-        for i in range(len(items)):
-            self.cell(70, 10, items[i], border=1)
-            self.cell(30, 10, str(quantity[i]), border=1, align="C")
-            self.cell(40, 10, f"{unit_price[i]:.2f}", border=1, align="C")
-            self.cell(40, 10, f"{bulk_discounted_price[i]:.2f}" if bulk_discounted_price[i] > 0 else "-", border=1, align="C")
+        for item, unit_price, quantity, bulk_discounted_price in lines:
+            self.cell(70, 10, item, border=1)
+            self.cell(30, 10, str(quantity), border=1, align="C")
+            self.cell(40, 10, f"{unit_price:.2f}", border=1, align="C")
+            self.cell(40, 10, f"{bulk_discounted_price:.2f}" if bulk_discounted_price > 0 else "-", border=1, align="C")
             self.ln()
         
         # Totals
@@ -6,16 +6,18 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QStackedWidget, QWidget,
 from PyQt5.QtCore import Qt, QTimer, QDate, QStringListModel
 from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QTextEdit, QGroupBox, QAction, QSizePolicy, QCompleter,QDoubleSpinBox
 from PyQt5.QtGui import QPalette, QIntValidator, QDoubleValidator
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 from PyQt5.QtGui import QRegExpValidator
 from PyQt5.QtCore import QRegExp
 from datetime import datetime
-import requests 
 from edit_inventory import TransactionIDGenerator
+import audit
+import db_manager
+import sale_engine
+import sms_dispatcher
+from inventory_cache import InventoryCache
+from product_picker import ProductPicker
 #from sale_receipt_pdf import SalesReceiptPDF       
 
-FAYASMS_API_KEY = "your_fayasms_api_key"
-FAYASMS_SENDER_ID = "YourBusinessName"
 
 
 class SalesWindow(QDialog):
@@ -27,6 +29,8 @@ class SalesWindow(QDialog):
         self.current_transaction_id = ""
         self.receipt_data = []
         self.parent_window = parent
+        self.inventory = InventoryCache(database, self.refresh_products)
+        self.finished.connect(self.inventory.close)
         self.initUI()
 
     def initUI(self):
@@ -44,11 +48,8 @@ class SalesWindow(QDialog):
         # Load auto-complete suggestions from the database
         self.load_customer_suggestions()
 
-        self.product_table = QTableWidget()
-        self.product_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.product_table.setColumnCount(3)  # Added two more columns
-        self.product_table.setHorizontalHeaderLabels(["Product", "Quantity", "Discounted Price"])
-        self.load_inventory_items()
+        self.product_picker = ProductPicker(self.data, self.inventory)
+        self.finished.connect(self.product_picker.search_filter.close)
         
         date_layout = QHBoxLayout()
         self.tran_date = QDateEdit()
@@ -62,10 +63,10 @@ class SalesWindow(QDialog):
         validator = QDoubleValidator(0.0, 999999.99, 2)  # Min 0.0, Max 999999.99, 2 decimal places
         validator.setNotation(QDoubleValidator.StandardNotation)  # Standard notation
         self.amount_paid.setValidator(validator)
+        self.product_picker.basket.total_changed.connect(lambda total: self.amount_paid.setPlaceholderText(f"{total:.2f}"))
         self.payment_mode = QComboBox()
         self.payment_mode.addItems(["Cash", "Cheque", "Credit"])
         self.payment_mode.currentIndexChanged.connect(self.toggle_cheque_details)
-        #self.product_table.cellChanged.connect(self.calculate_total_due)  # Detect cell changes
         date_layout.addWidget(QLabel("Amount Paid: "))
         date_layout.addWidget(self.amount_paid)
 
@@ -127,7 +128,7 @@ class SalesWindow(QDialog):
 
         layout.addLayout(blayout)            
         layout.addWidget(QLabel("Select Products:"))
-        layout.addWidget(self.product_table) 
+        layout.addWidget(self.product_picker) 
         layout.addLayout(date_layout) 
         layout.addLayout(pay_layout)
         layout.addWidget(self.cheque_details)
@@ -138,7 +139,7 @@ class SalesWindow(QDialog):
         
     def load_customer_suggestions(self):
         """ Load customer data for auto-completion and set up bi-directional auto-fill """
-        conn = sqlite3.connect(self.data)
+        conn = db_manager.connect(self.data)
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT name, location, contact FROM customers_data")
@@ -178,9 +179,6 @@ class SalesWindow(QDialog):
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Database Error", f"Error loading customers: {str(e)}")
 
-        finally:
-            conn.close()
-
     def update_from_name(self):
         """ Auto-fill contact & location when customer name is changed """
         customer_name = self.customer_name.text().strip()
@@ -213,69 +211,16 @@ class SalesWindow(QDialog):
         obj = TransactionIDGenerator(self.data)
         return obj.generate_id()    
 
-    def load_inventory_items(self):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("SELECT item_name FROM inventory")
-        items = cursor.fetchall()
-        conn.close()
-
-        self.product_table.setRowCount(len(items))
-        for row, item in enumerate(items):
-            item_name = QTableWidgetItem(item[0])
-            item_name.setFlags(item_name.flags() & ~Qt.ItemIsEditable)
-            self.product_table.setItem(row, 0, item_name)
-            quantity_input = QSpinBox()
-            quantity_input.setMaximum(9999)
-            quantity_input.setMinimum(0)
-            quantity_input.valueChanged.connect(self.calculate_total_due)  # Connect value change
-            self.product_table.setCellWidget(row, 1, quantity_input)
-            bulk_discount = QDoubleSpinBox() 
-            bulk_discount.setMaximum(9999) 
-            bulk_discount.setMinimum(0)
-            bulk_discount.valueChanged.connect(self.calculate_total_due)  # Connect
-            self.product_table.setCellWidget(row, 2, bulk_discount) 
-
-
-    def calculate_total_due(self):
-        """ Calculate total due when quantity or discounted price changes """
-        total_due = 0.0
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("SELECT unit_price FROM inventory")
-        uprice = cursor.fetchall()
-        conn.close()
-        #print("called")
-        for row in range(self.product_table.rowCount()):
-            quantity_item = self.product_table.cellWidget(row, 1)
-            disc_price_item = self.product_table.cellWidget(row, 2)
-            u_price = uprice[row]
-            #print(u_price)
-            price_item = u_price[0] if float(disc_price_item.value()) == 0 else min(float(disc_price_item.value()), u_price[0])
-
-            if quantity_item and price_item:
-                try:
-                    quantity = int(quantity_item.value()) 
-                    total_due += quantity * price_item
-                except ValueError:
-                    continue  # Skip rows with invalid data
-        
-        self.amount_paid.setPlaceholderText(f"{total_due:.2f}")
+    def refresh_products(self):
+        """ Another window changed the inventory: re-price the basket and re-run the product search """
+        self.product_picker.refresh()
 
 
     def toggle_cheque_details(self):
         self.cheque_details.setVisible(self.payment_mode.currentText() == "Cheque")
 
     def get_selected_products(self):
-        selected_products = []
-        for row in range(self.product_table.rowCount()):
-            item = self.product_table.item(row, 0).text()
-            quantity = self.product_table.cellWidget(row, 1).value()
-            bulk_discount = self.product_table.cellWidget(row, 2).value() 
-
-            if quantity > 0:
-                selected_products.append((item, quantity, bulk_discount))
-        return selected_products
+        return self.product_picker.basket.products()
 
     def contact_validation(self, contact):
         if len(contact) != 10:
@@ -296,7 +241,6 @@ class SalesWindow(QDialog):
         cheque_number = self.cheque_number.text() if payment_mode == "Cheque" else None
         cheque_bank = self.cheque_bank.text() if payment_mode == "Cheque" else None
         cheque_clearance_date = self.cheque_clearance_date.date().toString("yyyy-MM-dd") if payment_mode == "Cheque" else None
-        cost_of_sales_per_product = []
 
         if not customer or not contact or not selected_products:
             QMessageBox.warning(self, "Error", "Please fill all required fields and select products.")
@@ -306,190 +250,40 @@ class SalesWindow(QDialog):
             QMessageBox.warning(self, "Error", "Invalid Contact Number")
             return        
 
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
+        sale = sale_engine.Sale(self.generate_transaction_id(), customer, location, contact, selected_products, paid, payment_mode,
+                                cheque_number, cheque_bank, cheque_clearance_date, tran_date, self.parent_window.user_manager.logged_in_user)
+        try:
+            sale_engine.record(db_manager.connect(self.data), sale)
+        except sale_engine.SaleError as e:
+            QMessageBox.warning(self, "Stock Warning", f"{e} The sale was not recorded.")
+            return
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Error", f"Error: {e}")
+            return
+        db_manager.manager.notify_changed(self.data, customer)
 
-        total_owed = 0
-        insufficient_stock_items = []
-        items = ""
-        qty = ""
-        b_disc = ""  
-        u_price = ""
-        trans_id = self.generate_transaction_id()
-        #items = []
-        products_number = len(selected_products)
-        counter = 0
-        
-        for item, quantity, bulk_discount in selected_products:
-            counter += 1
-            cursor.execute("SELECT unit_price, quantity_remaining FROM inventory WHERE item_name = ?", (item,))
-            result = cursor.fetchone()
-            unit_price, stock_remaining = result
-            
-            if quantity > stock_remaining:
-                insufficient_stock_items.append(item)
-                continue  # Skip this item            
-            
-            if quantity <= stock_remaining:            
-                adder = ", " if counter < products_number else ""
-                #items.append(item) # json.dumps(items)
-                items += item + adder if len(selected_products) > 1 else item
-                qty += str(quantity) + adder if len(selected_products) > 1 else str(quantity)
-                b_disc += str(bulk_discount) + adder if len(selected_products) > 1 else str(bulk_discount) 
-                u_price += str(result[0]) + adder if len(selected_products) > 1 else str(result[0])          
-                
-                if not result:
-                    QMessageBox.warning(self, "Error", f"Item '{item}' not found in inventory.")
-                    continue            
-                applied_price = unit_price
-                if bulk_discount > 0:
-                    applied_price = bulk_discount  
-                item_total = quantity * applied_price
-                total_owed += item_total  # Accumulate total owed
-                cost_of_sales_per_product.append((item, bulk_discount))
-
-                cursor.execute("""
-                    INSERT INTO sales (customer_name, location, contact, item_name, quantity, total_owed, amount_paid, remaining_debt, payment_mode, sale_date, user_logged)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, date('now'), ?)
-                """, (customer, location, contact, item, quantity, item_total, 0, item_total, payment_mode, self.parent_window.user_manager.logged_in_user))
-                
-                cursor.execute("""
-                    UPDATE inventory 
-                    SET quantity_issued = quantity_issued + ?, quantity_remaining = quantity_remaining - ? 
-                    WHERE item_name = ?
-                """, (quantity, quantity, item))
-
-
-        if insufficient_stock_items:
-            QMessageBox.warning(self, "Stock Warning", f"Not enough stock for: {', '.join(insufficient_stock_items)}. These items were not added.")
- 
-        remaining_debt = total_owed - paid
-
-        if total_owed > 0:
-            cursor.execute("""
-                UPDATE sales SET amount_paid = ?, remaining_debt = ? 
-                WHERE customer_name = ? AND remaining_debt = total_owed
-            """, (paid, remaining_debt, customer))
-
-        if items:
-            cur_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-            cursor.execute("""
-                INSERT INTO customers (transaction_id,name, location, contact, product_name,unit_price, quantity, bulk_discount, total_owed, total_paid, remaining_debt, entry_date_and_time,transaction_date, user_logged) 
-                VALUES (?,?, ?,?,?,?,?, ?, ?,?, ?, ?,?,?) 
-                ON CONFLICT(transaction_id) DO NOTHING
-            """, (trans_id, customer, location, contact, items,u_price,qty,b_disc, total_owed, paid, remaining_debt, cur_time, tran_date, self.parent_window.user_manager.logged_in_user))
-            
-            
-            cursor.execute("""
-                INSERT INTO customers_data (name, location, contact) 
-                VALUES (?,?,?) 
-                ON CONFLICT(contact) DO NOTHING
-            """, (customer, location, contact))
-            
-            
-            log = f"{self.parent_window.user_manager.logged_in_user} sold {items} to {customer} for an amount of {total_owed}. Transaction id is: {trans_id}"
-            self.log_text(log)
-        
-            # Log the payment in the payments table, including product details
-         # Log the payment in the payments table, including product details
-        
-        if paid > 0 and items: 
-            try:            
-                cursor.execute("""
-                        INSERT INTO payments (transaction_id,customer_name, item_name, amount_paid, payment_mode, cheque_number, cheque_bank, cheque_clearance_date,entry_date_and_time,transaction_date, user_logged)
-                        VALUES (?,?, ?, ?, ?, ?, ?,?, ?,?,?)
-                    """, (trans_id,customer, items, paid, payment_mode, cheque_number, cheque_bank, cheque_clearance_date, str(cur_time), tran_date, self.parent_window.user_manager.logged_in_user))
-                conn.commit()
-                #print("Logging about to begin!")
-                log = f"{self.parent_window.user_manager.logged_in_user} received GHS {paid} in respect of {items} purchased."
-                self.log_text(log)
-                if cursor.rowcount > 0: 
-                    QMessageBox.information(self, "Success", "Sale recorded successfully.")
-                else:
-                    QMessageBox.warning(self, "Error", "Insert Failed.")
-            except sqlite3.Error as e:
-                QMessageBox.warning(self, "Error", f"Error: {e}")        
-        
-        if items:
-            self.receipt_data = [trans_id, customer, location, contact, items,u_price,qty,b_disc, total_owed, paid, remaining_debt,payment_mode,cheque_bank,]
-        conn.commit()
-        conn.close() 
+        items = sale.items
+        log = f"{self.parent_window.user_manager.logged_in_user} sold {items} to {customer} for an amount of {sale.total_owed}. Transaction id is: {sale.transaction_id}"
+        audit.record(self.parent_window.user_manager.logged_in_user, audit.SALE, log, sale.transaction_id, sale.total_owed)
+        if paid > 0:
+            log = f"{self.parent_window.user_manager.logged_in_user} received GHS {paid} in respect of {items} purchased."
+            audit.record(self.parent_window.user_manager.logged_in_user, audit.PAYMENT, log, sale.transaction_id, paid)
+            QMessageBox.information(self, "Success", "Sale recorded successfully.")
+
+        self.receipt_data = [sale.transaction_id, customer, location, contact, sale.lines, sale.total_owed, paid, sale.remaining_debt, payment_mode, cheque_bank,]
         
-        if self.send_sms.isChecked() and items:         
+        if self.send_sms.isChecked():         
             sms_message = f"GHS {paid} paid to {self.parent_window.company_name} in respect of {items} purchased."
-            if remaining_debt > 0:
-                sms_message += f'\nRemaining debt is GHS {remaining_debt}'
+            if sale.remaining_debt > 0:
+                sms_message += f'\nRemaining debt is GHS {sale.remaining_debt}'
                 
-            self.send_sms_notification(contact,  sms_message)
-            #QMessageBox.information(self, "Success", "Sale recorded successfully.")
+            sms_dispatcher.dispatcher.enqueue(self.data, contact, sms_message)  # sent in the background
         
         #show print dialog before closing the sales window
-        if self.print_receipt.isChecked() and items: 
+        if self.print_receipt.isChecked(): 
             self.show_print_dialog()
         self.accept()
         
-    def create_sms_table(self):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sms_queue (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                recipient TEXT NOT NULL,
-                message TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
-        conn.close()    
-
-    def faya_sms(self, recipient, message):
-        url = "https://fayasms.com/api/v1/send"
-        data = {
-            "key": FAYASMS_API_KEY,
-            "sender_id": FAYASMS_SENDER_ID,
-            "to": recipient,
-            "message": message
-        }
-
-        try:
-            response = requests.post(url, json=data)
-            response_json = response.json()
-            if response_json.get("status") == "success":
-                return True  # SMS sent successfully
-            else:
-                return False  # SMS failed
-        except requests.exceptions.RequestException:
-            return False  # Device is offline
-    
-    
-    def send_sms_notification(self, contact, message):        
-        sent = self.faya_sms(contact, message)
-        if not sent:
-            self.queue_sms(contact, message) 
-    
-    def queue_sms(self, recipient, message):
-        self.create_sms_table()
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO sms_queue (recipient, message) VALUES (?, ?)", (recipient, message))
-        conn.commit()
-        conn.close()
-        
-    def send_queued_sms(self):
-        conn = sqlite3.connect(self.data)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, recipient, message FROM sms_queue WHERE status = 'pending'")
-        queued_sms = cursor.fetchall()
-
-        for sms_id, recipient, message in queued_sms:
-            if self.send_sms_notification(recipient, message):  # If SMS is sent successfully
-               cursor.execute("DELETE FROM sms_queue WHERE id = ?", (sms_id,))  # Remove from queue
-
-        conn.commit()
-        conn.close()
-       
     def toggle_cheque_details(self):
         self.cheque_details.setVisible(self.payment_mode.currentText() == "Cheque")  
 
@@ -514,7 +308,7 @@ class SalesWindow(QDialog):
     def generate_sales_receipt(self):
         """Generate a detailed sales receipt with bulk discounts """
         # Unpack receipt data
-        trans_id, customer, location, contact, items, unit_price, quantity, bulk_discounted_price,  total_owed, paid, remaining_debt, payment_mode, cheque_bank = self.receipt_data
+        trans_id, customer, location, contact, lines, total_owed, paid, remaining_debt, payment_mode, cheque_bank = self.receipt_data
 
         sale_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         #{self.parent_window.company_name}
@@ -535,20 +329,14 @@ class SalesWindow(QDialog):
         -----------------------------------
         """
 
-        items = items.split(", ")
-        unit_price = list(map(float, unit_price.split(", ")))
-        quantity = list(map(int, quantity.split(", ")))
-        bulk_discounted_price = list(map(float, bulk_discounted_price.split(", "))) 
-        
         # Handle multiple items
-        for i in range(len(items)):
-            original_price = unit_price[i]
-            discounted_price = bulk_discounted_price[i] if bulk_discounted_price[i] > 0 else original_price 
+        for i, (item, original_price, quantity, bulk_discounted_price) in enumerate(lines):
+            discounted_price = bulk_discounted_price if bulk_discounted_price > 0 else original_price 
 
-            receipt_text += f"        {items[i]} - {quantity[i]} units\n" if i != 0 else f"{items[i]} - {quantity[i]} units\n"
+            receipt_text += f"        {item} - {quantity} units\n" if i != 0 else f"{item} - {quantity} units\n"
             receipt_text += f"        Unit Price: GHS {original_price:.2f}\n"
             
-            if bulk_discounted_price[i] > 0:
+            if bulk_discounted_price > 0:
                 receipt_text += f"        Bulk Discounted Price: GHS {discounted_price:.2f}\n"
             
 
@@ -575,6 +363,7 @@ class SalesWindow(QDialog):
 
     def print_sales_receipt(self):
         """ Print the sales receipt or save as PDF if no printer is available """
+        from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
         receipt_text = self.generate_sales_receipt()
 
         printer = QPrinter(QPrinter.HighResolution)
@@ -616,12 +405,3 @@ class SalesWindow(QDialog):
         
         except Exception as e:
             pass
-        
-    def log_text(self, text):
-        # Get the current timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Open the file in append mode (creates the file if it doesn't exist)
-        with open("log.txt", "a") as file:
-            # Write the timestamp followed by the input text
-            file.write(f"[{timestamp}] {text}\n")
\ No newline at end of file
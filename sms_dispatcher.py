@@ -0,0 +1,175 @@
+"""Sending the SMS outbox in the background.
+
+SalesWindow, PaymentWindow and PaymentHistoryWindow used to call
+requests.post on the GUI thread with no timeout, so on a flaky network
+recording a sale hung until the TCP stack gave up. They now only add the
+message to the outbox (sms_outbox.enqueue) and the shared `dispatcher`
+sends it:
+
+- due messages are claimed on the GUI thread and handed to a small
+  QThreadPool, at most MAX_CONCURRENT requests at a time; messages with the
+  same text are claimed together, so a provider that takes several numbers
+  per request gets them in one;
+- the pool threads send through a sms_manage.SMSManager, which applies each
+  provider's rate limit and fails over to the next provider;
+- each result comes back through a queued signal and is written to the
+  outbox on the GUI thread, where a failure is scheduled again with
+  exponential backoff and jitter (see sms_outbox);
+- sent, retrying and failed are announced through signals for the UI.
+
+The sender is an argument, so the dispatcher can be pointed at a local
+stand-in gateway or at sms_manage.FakeProvider (`benchmark.py sms-dispatch`
+and `benchmark.py sms-bulk`).
+"""
+import time
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QCoreApplication, pyqtSignal
+
+import db_manager
+import sms_manage
+import sms_outbox
+from sms_manage import SendError
+
+MAX_CONCURRENT = 3
+POLL_INTERVAL_MS = 60 * 1000  # longest sleep between looks at the outbox
+
+
+class SendJob(QRunnable):
+    def __init__(self, dispatcher, database, message, batch):
+        super().__init__()
+        self.dispatcher = dispatcher
+        self.database = database
+        self.message = message
+        self.batch = batch  # [(id, recipient, attempts), ...]
+
+    def run(self):
+        recipients = [recipient for _, recipient, _ in self.batch]
+        try:
+            results = self.dispatcher.sender.send_bulk(recipients, self.message)
+        except Exception as e:
+            traceback.print_exc()
+            error = SendError(f"{type(e).__name__}: {e}")
+            results = dict.fromkeys(recipients, error)
+        for sms_id, recipient, attempts in self.batch:
+            error = results.get(recipient)
+            self.dispatcher.finished.emit(self.database, sms_id, recipient, attempts,
+                                          None if error is None else str(error), bool(error and error.permanent))
+        self.dispatcher.batch_done.emit()
+
+
+class SmsDispatcher(QObject):
+    """Sends the outbox of the open database file in the background."""
+
+    sent = pyqtSignal(int, str)  # id, recipient
+    retrying = pyqtSignal(int, str, str)  # id, recipient, error
+    failed = pyqtSignal(int, str, str)  # id, recipient, error; the message will not be tried again
+    finished = pyqtSignal(str, int, str, int, object, bool)  # from pool threads: database, id, recipient, attempts, error, permanent
+    batch_done = pyqtSignal()  # from pool threads, after the last message of a SendJob
+
+    def __init__(self, sender=None, max_concurrent=MAX_CONCURRENT, parent=None):
+        super().__init__(parent)
+        self.sender = sender or sms_manage.default_manager()
+        self.database = None
+        self.in_flight = 0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_concurrent)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.dispatch)
+        self.finished.connect(self.record)
+        self.batch_done.connect(self.job_done)
+
+    def start(self, database):
+        """Send the outbox of `database`, starting with anything a crash left half sent."""
+        self.database = database
+        sms_outbox.recover(db_manager.connect(database))
+        self.wake()
+
+    def stop(self):
+        """Stop taking messages; the ones being sent finish and are recorded."""
+        self.database = None
+        self.timer.stop()
+
+    def enqueue(self, database, recipient, message):
+        """Add a message to the outbox of `database` and send it as soon as a slot is free."""
+        sms_id = sms_outbox.enqueue(db_manager.connect(database), recipient, message)
+        if database == self.database:
+            self.wake()
+        return sms_id
+
+    def enqueue_many(self, database, messages):
+        """Add [(recipient, message), ...] to the outbox of `database` at once (bulk sends); returns how many."""
+        count = sms_outbox.enqueue_many(db_manager.connect(database), messages)
+        if count and database == self.database:
+            self.wake()
+        return count
+
+    def resend(self, database):
+        """Send every waiting or failed message of `database` now; returns how many are queued."""
+        count = sms_outbox.resend(db_manager.connect(database))
+        if count and database == self.database:
+            self.wake()
+        return count
+
+    def wake(self):
+        self.timer.start(0)
+
+    def dispatch(self):
+        if self.database is None or not db_manager.manager.is_open(self.database):
+            return  # stopped, or the file was closed (the main window deletes _temp__.db on exit)
+        conn = db_manager.connect(self.database)
+        free = self.pool.maxThreadCount() - self.in_flight
+        for _ in range(max(0, free)):
+            claimed = sms_outbox.claim_batch(conn, self.sender.max_batch)
+            if claimed is None:
+                break
+            message, batch = claimed
+            self.in_flight += 1
+            self.pool.start(SendJob(self, self.database, message, batch))
+        self.schedule(conn)
+
+    def schedule(self, conn):
+        """Sleep until the next message is due; with every slot busy, job_done() wakes the dispatcher instead."""
+        if self.in_flight >= self.pool.maxThreadCount():
+            return
+        due = sms_outbox.next_due(conn)
+        if due is None:
+            delay_ms = POLL_INTERVAL_MS
+        else:
+            delay_ms = min(POLL_INTERVAL_MS, max(0, int((due - time.time()) * 1000)))
+        self.timer.start(delay_ms)
+
+    def record(self, database, sms_id, recipient, attempts, error, permanent):
+        if not db_manager.manager.is_open(database):
+            return  # the file was closed meanwhile; recover() resends the message when it is opened again
+        status = sms_outbox.record_result(db_manager.connect(database), sms_id, attempts, error, permanent)
+        if status == "sent":
+            self.sent.emit(sms_id, recipient)
+        elif status == "pending":
+            self.retrying.emit(sms_id, recipient, error)
+        else:
+            self.failed.emit(sms_id, recipient, error)
+
+    def job_done(self):
+        self.in_flight -= 1
+        self.wake()
+
+    def shutdown(self):
+        """Drop queued sends and wait for the running ones; connect to QApplication.aboutToQuit."""
+        self.stop()
+        self.pool.clear()
+        self.pool.waitForDone()
+
+    def wait(self):
+        """Block until the outbox has nothing due and nothing in flight (scripts and benchmarks)."""
+        while True:
+            QCoreApplication.processEvents()
+            if self.in_flight == 0:
+                due = sms_outbox.next_due(db_manager.connect(self.database)) if self.database else None
+                if due is None or due > time.time():
+                    return
+            self.pool.waitForDone(50)
+
+
+dispatcher = SmsDispatcher()
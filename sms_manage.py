@@ -1,105 +1,381 @@
-import requests
-import africastalking
-from twilio.rest import Client
+"""SMS providers behind one sending interface.
+
+SMSManager used to create an Africa's Talking client and send a test SMS
+as soon as the module was imported, and nothing in the app used it. It is
+now the provider layer under sms_dispatcher:
+
+- each provider (FayaSMS, Twilio, Nexmo, Africa's Talking, and a fake one
+  for offline runs) sends through the same send_batch() call, and imports
+  its client library only when it first sends;
+- every provider has its own rate limit, so a blast to hundreds of debtors
+  stays within what the account allows;
+- a provider that keeps failing is taken out of rotation for a cooldown
+  that grows while it stays down, and sends fail over to the next one;
+- send_bulk() groups recipients of the same text into one request where
+  the provider accepts several numbers at once.
+
+Importing this module does nothing but define classes.
+"""
+import random
+import threading
+import time
+
+FAYASMS_URL = "https://fayasms.com/api/v1/send"
+FAYASMS_API_KEY = "your_fayasms_api_key"
+FAYASMS_SENDER_ID = "YourBusinessName"
+
+TWILIO_SID = "your_twilio_sid"
+TWILIO_AUTH_TOKEN = "your_twilio_auth_token"
+TWILIO_PHONE_NUMBER = "+123456789"
+
+NEXMO_API_KEY = "your_nexmo_api_key"
+NEXMO_API_SECRET = "your_nexmo_api_secret"
+NEXMO_SENDER = "YourBrand"
+
+AFRICASTALKING_USERNAME = "your_username"
+AFRICASTALKING_API_KEY = "your_api_key"
+
+CONNECT_TIMEOUT_S = 5
+READ_TIMEOUT_S = 15
+FAILURES_BEFORE_DOWN = 3  # consecutive failures that take a provider out of rotation
+COOLDOWN_S = 60  # first time out of rotation; doubles each time it fails again
+MAX_COOLDOWN_S = 15 * 60
+
+
+class SendError(Exception):
+    """A send that failed.
+
+    `permanent` means no provider can deliver it (e.g. an invalid number);
+    otherwise the failure belongs to the provider or the network and the
+    message may be retried, elsewhere or later.
+    """
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` sends per second on average, bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count=1):
+        """Block until `count` sends are allowed (called from the dispatcher's pool threads)."""
+        needed = min(count, self.capacity)  # a batch larger than a burst goes once the bucket is full, and leaves it in debt
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= needed:
+                    self.tokens -= count
+                    return
+                wait = (needed - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Health:
+    """Consecutive failures of one provider and when it may be tried again."""
 
-class SMSManager:
     def __init__(self):
-        # Twilio Credentials
-        self.twilio_sid = "your_twilio_sid"
-        self.twilio_auth_token = "your_twilio_auth_token"
-        self.twilio_phone_number = "+123456789"
+        self.failures = 0
+        self.down_until = 0.0
+        self.cooldown = COOLDOWN_S
+        self.sent = 0
+        self.errors = 0
+        self.last_error = None
+        self.lock = threading.Lock()
 
-        # Nexmo (Vonage) Credentials
-        self.nexmo_api_key = "your_nexmo_api_key"
-        self.nexmo_api_secret = "your_nexmo_api_secret"
+    def available(self, now=None):
+        return (time.monotonic() if now is None else now) >= self.down_until
 
-        # Africa's Talking Credentials
-        self.africastalking_username = "your_username"
-        self.africastalking_api_key = "your_api_key"
-        africastalking.initialize(self.africastalking_username, self.africastalking_api_key)
+    def succeeded(self, count=1):
+        with self.lock:
+            self.sent += count
+            self.failures = 0
+            self.cooldown = COOLDOWN_S
 
-        # FayaSMS Credentials
-        self.fayasms_api_key = "your_fayasms_api_key"
-        self.fayasms_sender_id = "your_sender_id"  # Set your approved sender ID
+    def failed(self, error):
+        with self.lock:
+            self.errors += 1
+            self.failures += 1
+            self.last_error = str(error)
+            if self.failures >= FAILURES_BEFORE_DOWN:
+                self.down_until = time.monotonic() + self.cooldown
+                self.cooldown = min(MAX_COOLDOWN_S, self.cooldown * 2)
+                self.failures = 0
 
-    def send_sms(self, phone_number, message, provider="twilio"):
-        """
-        Sends an SMS using the specified provider.
-        
-        :param phone_number: str - Customer's phone number (include country code).
-        :param message: str - The SMS message to send.
-        :param provider: str - The SMS API to use ('twilio', 'nexmo', 'africastalking', 'fayasms').
-        :return: dict - Response data from the API.
-        """
 
-        if provider == "twilio":
-            return self.send_via_twilio(phone_number, message)
-        elif provider == "nexmo":
-            return self.send_via_nexmo(phone_number, message)
-        elif provider == "africastalking":
-            return self.send_via_africastalking(phone_number, message)
-        elif provider == "fayasms":
-            return self.send_via_fayasms(phone_number, message)
-        else:
-            return {"error": "Invalid SMS provider"}
-
-    def send_via_twilio(self, phone_number, message):
-        """Send SMS using Twilio"""
-        try:
-            client = Client(self.twilio_sid, self.twilio_auth_token)
-            message = client.messages.create(
-                body=message,
-                from_=self.twilio_phone_number,
-                to=phone_number
-            )
-            return {"status": "success", "message_id": message.sid}
-        except Exception as e:
-            return {"error": str(e)}
+class Provider:
+    """One SMS gateway. Subclasses implement deliver()."""
 
-    def send_via_nexmo(self, phone_number, message):
-        """Send SMS using Nexmo (Vonage)"""
-        try:
-            url = "https://rest.nexmo.com/sms/json"
-            data = {
-                "from": "YourBrand",
-                "text": message,
-                "to": phone_number,
-                "api_key": self.nexmo_api_key,
-                "api_secret": self.nexmo_api_secret
-            }
-            response = requests.post(url, json=data)
-            return response.json()
-        except Exception as e:
-            return {"error": str(e)}
+    name = "provider"
+    max_batch = 1  # recipients one request can carry
+    rate_per_second = 5.0
+
+    def __init__(self, rate_per_second=None):
+        self.limiter = RateLimiter(rate_per_second or self.rate_per_second)
+        self.health = Health()
 
-    def send_via_africastalking(self, phone_number, message):
-        """Send SMS using Africa's Talking"""
+    def configured(self):
+        """False while the credentials are still the placeholders shipped in this file."""
+        return True
+
+    def send_batch(self, recipients, message):
+        """Send `message` to up to max_batch `recipients`; returns {recipient: SendError} of the ones that failed.
+
+        Raises SendError when the whole request failed.
+        """
+        self.limiter.acquire(len(recipients))
         try:
-            sms = africastalking.SMS
-            response = sms.send(message, [phone_number])
-            return response
+            failures = self.deliver(list(recipients), message) or {}
+        except SendError as e:
+            if not e.permanent:
+                self.health.failed(e)
+            raise
         except Exception as e:
-            return {"error": str(e)}
+            self.health.failed(e)
+            raise SendError(f"{self.name}: {type(e).__name__}: {e}")
+        self.health.succeeded(len(recipients) - len(failures))
+        return failures
+
+    def deliver(self, recipients, message):
+        raise NotImplementedError
+
+
+def post_json(name, url, timeout=None, **kwargs):
+    """POST with timeouts; returns the decoded JSON reply or raises SendError."""
+    import requests  # deferred until an SMS is actually sent; it costs ~100 ms at startup
+    try:
+        response = requests.post(url, timeout=timeout or (CONNECT_TIMEOUT_S, READ_TIMEOUT_S), **kwargs)
+    except requests.exceptions.Timeout:
+        raise SendError(f"{name} timed out")
+    except requests.exceptions.RequestException as e:
+        raise SendError(f"{name} unreachable: {type(e).__name__}")
+    if response.status_code >= 400:
+        # A refused number or message will be refused by every gateway; bad credentials,
+        # throttling and server errors are the provider's problem
+        permanent = response.status_code in (400, 404, 422)
+        raise SendError(f"{name} answered HTTP {response.status_code}", permanent)
+    try:
+        return response.json()
+    except ValueError:
+        raise SendError(f"{name} answered with something other than JSON")
+
+
+class FayaSMSProvider(Provider):
+    name = "fayasms"
 
-    def send_via_fayasms(self, phone_number, message):
-        """Send SMS using FayaSMS"""
+    def __init__(self, api_key=FAYASMS_API_KEY, sender_id=FAYASMS_SENDER_ID, url=FAYASMS_URL, rate_per_second=None):
+        super().__init__(rate_per_second)
+        self.api_key = api_key
+        self.sender_id = sender_id
+        self.url = url
+
+    def configured(self):
+        return not self.api_key.startswith("your_")
+
+    def deliver(self, recipients, message):
+        data = {
+            "key": self.api_key,
+            "sender_id": self.sender_id,
+            "to": recipients[0],
+            "message": message
+        }
+        status = post_json(self.name, self.url, json=data).get("status")
+        if status != "success":
+            raise SendError(f"{self.name} status {status!r}")
+
+
+class TwilioProvider(Provider):
+    name = "twilio"
+
+    def __init__(self, sid=TWILIO_SID, auth_token=TWILIO_AUTH_TOKEN, phone_number=TWILIO_PHONE_NUMBER, rate_per_second=None):
+        super().__init__(rate_per_second)
+        self.sid = sid
+        self.auth_token = auth_token
+        self.phone_number = phone_number
+        self.client = None
+
+    def configured(self):
+        return not self.sid.startswith("your_")
+
+    def deliver(self, recipients, message):
+        if self.client is None:
+            from twilio.rest import Client
+            self.client = Client(self.sid, self.auth_token)
+        self.client.messages.create(body=message, from_=self.phone_number, to=recipients[0])
+
+
+class NexmoProvider(Provider):
+    name = "nexmo"
+
+    def __init__(self, api_key=NEXMO_API_KEY, api_secret=NEXMO_API_SECRET, sender=NEXMO_SENDER, rate_per_second=None):
+        super().__init__(rate_per_second)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.sender = sender
+
+    def configured(self):
+        return not self.api_key.startswith("your_")
+
+    def deliver(self, recipients, message):
+        data = {
+            "from": self.sender,
+            "text": message,
+            "to": recipients[0],
+            "api_key": self.api_key,
+            "api_secret": self.api_secret
+        }
+        reply = post_json(self.name, "https://rest.nexmo.com/sms/json", json=data)
+        status = (reply.get("messages") or [{}])[0].get("status")
+        if status != "0":
+            raise SendError(f"{self.name} status {status!r}")
+
+
+class AfricasTalkingProvider(Provider):
+    name = "africastalking"
+    max_batch = 100  # one request takes a list of numbers
+
+    def __init__(self, username=AFRICASTALKING_USERNAME, api_key=AFRICASTALKING_API_KEY, rate_per_second=None):
+        super().__init__(rate_per_second)
+        self.username = username
+        self.api_key = api_key
+        self.sms = None
+
+    def configured(self):
+        return not self.api_key.startswith("your_")
+
+    def deliver(self, recipients, message):
+        if self.sms is None:
+            import africastalking
+            africastalking.initialize(self.username, self.api_key)
+            self.sms = africastalking.SMS
+        reply = self.sms.send(message, recipients)
+        results = {item.get("number"): item.get("status") for item in reply.get("SMSMessageData", {}).get("Recipients", [])}
+        return {number: SendError(f"{self.name} status {results.get(number)!r}")
+                for number in recipients if results.get(number) != "Success"}
+
+
+class FakeProvider(Provider):
+    """Sends nothing; records what it was asked to send. For offline runs and benchmarks.
+
+    `failure_rate` of the requests fail as a gateway error would, and
+    numbers in `invalid_numbers` are refused permanently.
+    """
+
+    def __init__(self, name="fake", max_batch=1, rate_per_second=1000.0, latency_s=0.0, failure_rate=0.0, invalid_numbers=()):
+        self.name = name
+        self.max_batch = max_batch
+        super().__init__(rate_per_second)
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.invalid_numbers = set(invalid_numbers)
+        self.requests = 0
+        self.delivered = []  # (recipient, message)
+        self.lock = threading.Lock()
+
+    def deliver(self, recipients, message):
+        time.sleep(self.latency_s)
+        with self.lock:
+            self.requests += 1
+        if random.random() < self.failure_rate:
+            raise SendError(f"{self.name} answered HTTP 503")
+        failures = {number: SendError(f"{self.name} refused {number}", permanent=True)
+                    for number in recipients if number in self.invalid_numbers}
+        with self.lock:
+            self.delivered.extend((number, message) for number in recipients if number not in failures)
+        return failures
+
+
+class SMSManager:
+    """Sends through the first healthy provider, failing over down the list."""
+
+    def __init__(self, providers):
+        self.providers = list(providers)
+
+    @property
+    def max_batch(self):
+        return max(provider.max_batch for provider in self.providers)
+
+    def candidates(self):
+        """Providers to try, in order: the available ones, else the one back soonest."""
+        now = time.monotonic()
+        available = [provider for provider in self.providers if provider.health.available(now)]
+        return available or sorted(self.providers, key=lambda provider: provider.health.down_until)[:1]
+
+    def send(self, recipient, message):
+        """Send one message; raises SendError when every provider failed."""
+        error = self.send_bulk([recipient], message)[recipient]
+        if error is not None:
+            raise error
+
+    def send_bulk(self, recipients, message):
+        """Send the same `message` to every recipient; returns {recipient: SendError or None}.
+
+        Recipients go out in batches as large as each provider takes; a
+        batch that fails as a whole moves on to the next provider.
+        """
+        results = {}
+        remaining = list(dict.fromkeys(recipients))
+        last_error = SendError("no SMS provider configured")
+        for provider in self.candidates():
+            retry = []
+            was_available = provider.health.available()
+            for start in range(0, len(remaining), provider.max_batch):
+                if was_available and not provider.health.available():
+                    retry.extend(remaining[start:])  # it just went out of rotation; the next provider takes the rest
+                    break
+                batch = remaining[start:start + provider.max_batch]
+                try:
+                    failures = provider.send_batch(batch, message)
+                except SendError as e:
+                    if e.permanent:
+                        results.update((number, e) for number in batch)
+                    else:
+                        last_error = e
+                        retry.extend(batch)
+                    continue
+                for number in batch:
+                    error = failures.get(number)
+                    if error is None or error.permanent:
+                        results[number] = error
+                    else:
+                        last_error = error
+                        retry.append(number)
+            remaining = retry
+            if not remaining:
+                break
+        results.update((number, last_error) for number in remaining)
+        return results
+
+    def send_sms(self, phone_number, message):
+        """Send one message; returns {"status": "success"} or {"error": ...} like the old per-provider methods."""
         try:
-            url = "https://fayasms.com/api/send"
-            headers = {
-                "Authorization": f"Bearer {self.fayasms_api_key}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "sender_id": self.fayasms_sender_id,
-                "message": message,
-                "recipient": phone_number
-            }
-            response = requests.post(url, json=payload, headers=headers)
-            return response.json()
-        except Exception as e:
+            self.send(phone_number, message)
+        except SendError as e:
             return {"error": str(e)}
+        return {"status": "success"}
+
+    def status(self):
+        """One line per provider: whether it is in rotation, and its counts."""
+        now = time.monotonic()
+        lines = []
+        for provider in self.providers:
+            health = provider.health
+            state = "up" if health.available(now) else f"down for {health.down_until - now:.0f} s"
+            lines.append(f"{provider.name}: {state}, {health.sent} sent, {health.errors} errors"
+                         + (f", last error: {health.last_error}" if health.last_error else ""))
+        return lines
+
 
-# Example usage:
-sms_manager = SMSManager()
-response = sms_manager.send_sms("+254712345678", "Hello, this is a test message!", provider="fayasms")
-print(response)
+def default_manager():
+    """FayaSMS, which the app has always used, followed by every other provider whose credentials are filled in."""
+    others = [TwilioProvider(), NexmoProvider(), AfricasTalkingProvider()]
+    return SMSManager([FayaSMSProvider()] + [provider for provider in others if provider.configured()])
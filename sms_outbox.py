@@ -0,0 +1,166 @@
+"""The sms_queue table as a durable outbox.
+
+Messages used to be sent on the GUI thread, and only the ones that failed
+were written to sms_queue, to be deleted once a manual resend got through.
+Every message is now written here first and sent by sms_dispatcher, and a
+row is never deleted: its status moves
+
+    pending -> sending -> sent
+                       -> pending (retry later, with backoff)
+                       -> failed  (permanent error, or out of attempts)
+
+and each move is kept in sms_status_log. A row left in 'sending' by a crash
+is sent again at the next start, so a message may go out twice but is never
+lost.
+"""
+import random
+import time
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_S = 30  # delay before the first retry; doubles with every attempt
+BACKOFF_CAP_S = 60 * 60
+
+
+def create_table(cursor):
+    """Outbox columns and the status log; safe to run on any version of sms_queue."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sms_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(sms_queue)")}
+    for column, definition in (("attempts", "INTEGER DEFAULT 0"), ("next_attempt_at", "REAL DEFAULT 0"),
+                               ("last_error", "TEXT"), ("updated_at", "TEXT")):
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE sms_queue ADD COLUMN {column} {definition}")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sms_queue_due ON sms_queue (status, next_attempt_at)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sms_status_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sms_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            detail TEXT,
+            changed_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sms_status_log_sms_id ON sms_status_log (sms_id)")
+
+
+def set_status(cursor, sms_id, status, detail=None, **columns):
+    """Move a message to `status`, updating any other `columns` with it, and log the move."""
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    cursor.execute(f"UPDATE sms_queue SET status = ?, updated_at = datetime('now'){', ' + assignments if columns else ''} WHERE id = ?",
+                   (status, *columns.values(), sms_id))
+    cursor.execute("INSERT INTO sms_status_log (sms_id, status, detail) VALUES (?, ?, ?)", (sms_id, status, detail))
+
+
+def enqueue(conn, recipient, message):
+    """Add a message to the outbox, due now; returns its id."""
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO sms_queue (recipient, message, status, attempts, next_attempt_at, updated_at) "
+                       "VALUES (?, ?, 'pending', 0, 0, datetime('now'))", (recipient, message))
+        sms_id = cursor.lastrowid
+        cursor.execute("INSERT INTO sms_status_log (sms_id, status) VALUES (?, 'pending')", (sms_id,))
+    return sms_id
+
+
+def enqueue_many(conn, messages):
+    """Add [(recipient, message), ...] to the outbox in one transaction; returns how many."""
+    with conn:
+        cursor = conn.cursor()
+        for recipient, message in messages:
+            cursor.execute("INSERT INTO sms_queue (recipient, message, status, attempts, next_attempt_at, updated_at) "
+                           "VALUES (?, ?, 'pending', 0, 0, datetime('now'))", (recipient, message))
+            cursor.execute("INSERT INTO sms_status_log (sms_id, status) VALUES (?, 'pending')", (cursor.lastrowid,))
+    return len(messages)
+
+
+def claim_batch(conn, size, now=None):
+    """Claim the first due message and up to `size` - 1 other due messages with the same text.
+
+    Returns (message, [(id, recipient, attempts), ...]), or None when nothing is due,
+    so a provider that takes several numbers per request can send them together.
+    """
+    now = time.time() if now is None else now
+    with conn:
+        cursor = conn.cursor()
+        first = cursor.execute("""
+            SELECT message FROM sms_queue
+            WHERE status = 'pending' AND IFNULL(next_attempt_at, 0) <= ?
+            ORDER BY IFNULL(next_attempt_at, 0), id LIMIT 1
+        """, (now,)).fetchone()
+        if first is None:
+            return None
+        rows = cursor.execute("""
+            SELECT id, recipient, IFNULL(attempts, 0) FROM sms_queue
+            WHERE status = 'pending' AND IFNULL(next_attempt_at, 0) <= ? AND message = ?
+            ORDER BY IFNULL(next_attempt_at, 0), id LIMIT ?
+        """, (now, first[0], size)).fetchall()
+        for sms_id, _, attempts in rows:
+            set_status(cursor, sms_id, "sending", f"attempt {attempts + 1}", attempts=attempts + 1)
+    return first[0], [(sms_id, recipient, attempts + 1) for sms_id, recipient, attempts in rows]
+
+
+def backoff(attempts):
+    """Seconds to wait before the next try: exponential, capped, with jitter so retries spread out."""
+    delay = min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def record_result(conn, sms_id, attempts, error=None, permanent=False, now=None):
+    """Write the outcome of one attempt; returns the new status ('sent', 'pending' or 'failed')."""
+    now = time.time() if now is None else now
+    with conn:
+        cursor = conn.cursor()
+        if error is None:
+            set_status(cursor, sms_id, "sent", last_error=None)
+            return "sent"
+        if permanent or attempts >= MAX_ATTEMPTS:
+            set_status(cursor, sms_id, "failed", error, last_error=error)
+            return "failed"
+        delay = backoff(attempts)
+        set_status(cursor, sms_id, "pending", f"{error}; retry in {delay:.0f} s", last_error=error, next_attempt_at=now + delay)
+        return "pending"
+
+
+def recover(conn):
+    """Put messages left 'sending' by a crash back in the queue; returns how many."""
+    with conn:
+        cursor = conn.cursor()
+        ids = [row[0] for row in cursor.execute("SELECT id FROM sms_queue WHERE status = 'sending'")]
+        for sms_id in ids:
+            set_status(cursor, sms_id, "pending", "interrupted while sending", next_attempt_at=0)
+    return len(ids)
+
+
+def resend(conn, now=None):
+    """Make every waiting message due now and give failed ones a fresh set of attempts; returns how many."""
+    now = time.time() if now is None else now
+    with conn:
+        cursor = conn.cursor()
+        rows = cursor.execute("""
+            SELECT id, status FROM sms_queue
+            WHERE status = 'failed' OR (status = 'pending' AND IFNULL(next_attempt_at, 0) > ?)
+        """, (now,)).fetchall()
+        for sms_id, status in rows:
+            if status == "failed":
+                set_status(cursor, sms_id, "pending", "resend requested", attempts=0, next_attempt_at=0)
+            else:
+                set_status(cursor, sms_id, "pending", "resend requested", next_attempt_at=0)
+        due = cursor.execute("SELECT COUNT(*) FROM sms_queue WHERE status = 'pending'").fetchone()[0]
+    return due
+
+
+def next_due(conn):
+    """Time of the earliest pending message, or None when nothing is waiting."""
+    return conn.execute("SELECT MIN(IFNULL(next_attempt_at, 0)) FROM sms_queue WHERE status = 'pending'").fetchone()[0]
+
+
+def counts(conn):
+    """{status: number of messages}."""
+    return dict(conn.execute("SELECT status, COUNT(*) FROM sms_queue GROUP BY status").fetchall())
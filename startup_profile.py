@@ -0,0 +1,164 @@
+"""Cold-start report for `python app.py --profile-startup`.
+
+start() has to run before anything else is imported. From then on every
+module import is timed the way `python -X importtime` does it (self and
+cumulative time, nested by who imported what), and the constructors of
+the startup windows are timed as their modules load. When the login
+window paints for the first time, and again when the main window paints
+after a login, everything recorded since is printed to stderr.
+"""
+import sys
+import time
+import importlib.abc
+from functools import wraps
+
+# Constructors worth timing on the way from app.py to the home view
+TIMED_INITS = {
+    "user_mgt": ["UserManager"],
+    "login_2": ["LoginWindow"],
+    "main_window": ["MainWindow"],
+    "home_view": ["HomeView"],
+    "customers": ["CustomersWindow"],
+    "payment_history": ["PaymentHistoryWindow"],
+    "customer_manage": ["ManageCustomersWindow"],
+}
+FIRST_PAINTS = ["LoginWindow", "MainWindow"]  # a report is printed when each of these first paints
+CLOCK_RESETS = {"login_2": [("LoginWindow", "login")]}  # the main window's time counts from the login click, not from startup
+REPORT_MIN_MS = 1.0  # imports below this cumulative time are counted but not listed
+
+since = None  # start of the period the next report covers
+imports = []  # [depth, module name, self seconds, cumulative seconds] in import order
+inits = []  # (qualified class name, seconds)
+stack = []  # [entry, seconds spent in nested imports] of the imports in progress
+
+
+class TimedLoader(importlib.abc.Loader):
+    """Wraps a module's loader and times its exec_module."""
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        entry = [len(stack), module.__name__, 0.0, 0.0]
+        imports.append(entry)
+        stack.append([entry, 0.0])
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            _, nested = stack.pop()
+            entry[2], entry[3] = elapsed - nested, elapsed
+            if stack:
+                stack[-1][1] += elapsed
+        for name in TIMED_INITS.get(module.__name__, ()):
+            time_init(getattr(module, name, None))
+        for name, method in CLOCK_RESETS.get(module.__name__, ()):
+            reset_clock_on(getattr(module, name, None), method)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class TimedFinder(importlib.abc.MetaPathFinder):
+    """First entry of sys.meta_path: lets the other finders find, then wraps the loader."""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def time_init(cls):
+    if cls is None:
+        return
+    init = cls.__init__
+
+    @wraps(init)
+    def timed_init(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            init(self, *args, **kwargs)
+        finally:
+            # A subclass calling super().__init__ is counted in its own entry only
+            if type(self) is cls:
+                inits.append((f"{cls.__module__}.{cls.__name__}", time.perf_counter() - start))
+
+    cls.__init__ = timed_init
+
+
+def reset_clock_on(cls, method):
+    if cls is None:
+        return
+    call = getattr(cls, method)
+
+    @wraps(call)
+    def resetting_call(*args, **kwargs):
+        global since
+        since = time.perf_counter()
+        return call(*args, **kwargs)
+
+    setattr(cls, method, resetting_call)
+
+
+def start():
+    """Start timing imports; call before the application imports anything else."""
+    global since
+    since = time.perf_counter()
+    sys.meta_path.insert(0, TimedFinder())
+
+
+def watch_first_paint(app):
+    """Print a report when each window in FIRST_PAINTS paints for the first time."""
+    from PyQt5.QtCore import QObject, QEvent
+
+    class PaintWatcher(QObject):
+        def __init__(self):
+            super().__init__(app)
+            self.pending = list(FIRST_PAINTS)
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and obj.isWidgetType() and obj.isWindow() and type(obj).__name__ in self.pending:
+                name = type(obj).__name__
+                self.pending.remove(name)
+                report(f"{name} first paint", time.perf_counter() - since)
+                if not self.pending:
+                    app.removeEventFilter(self)
+            return False
+
+    app.watcher = PaintWatcher()
+    app.installEventFilter(app.watcher)
+
+
+def report(title, elapsed):
+    """Print and forget what was recorded since the previous report."""
+    out = sys.stderr
+    print(f"\n=== {title}: {elapsed * 1000:.0f} ms ===", file=out)
+    total = sum(entry[2] for entry in imports)
+    print(f"imports: {len(imports)} modules, {total * 1000:.0f} ms", file=out)
+    print("import time: self [us] | cumulative | imported package", file=out)
+    hidden = 0
+    for depth, name, own, cumulative in imports:
+        if cumulative * 1000 < REPORT_MIN_MS:
+            hidden += 1
+            continue
+        print(f"import time: {own * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}", file=out)
+    if hidden:
+        print(f"({hidden} imports under {REPORT_MIN_MS:g} ms not shown)", file=out)
+    if inits:
+        print("__init__ time [ms] | class", file=out)
+        for name, seconds in inits:
+            print(f"{seconds * 1000:18.1f} | {name}", file=out)
+    if "db_manager" in sys.modules:  # not imported for it: the login window may paint before anything connects
+        print(sys.modules["db_manager"].manager.report(), file=out)
+    imports.clear()
+    inits.clear()
@@ -0,0 +1,125 @@
+"""Exporting a table view to CSV (or PDF, see pdf_report) straight from its query.
+
+The export buttons used to collect every row of the view into a list and
+write it out in one go on the GUI thread, and the PDF exports wrote their
+intermediate CSV to os.getcwd() + '\\' + name, a path that only works on
+Windows. An export now re-runs the view's own query (its filters and sort
+order included) on the query executor's pool and streams the cursor into
+csv.writer CHUNK_ROWS rows at a time, so memory stays flat however many
+rows there are and however few the view has loaded. A progress dialog
+shows how far it got and can cancel it.
+"""
+import csv
+import functools
+import os
+import threading
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox, QProgressDialog
+
+from query_executor import executor
+
+CHUNK_ROWS = 1000
+
+
+def count_rows(conn, query, params):
+    return conn.execute(f"SELECT COUNT(*) FROM ({query})", params).fetchone()[0]
+
+
+def stream_rows(conn, query, params, format_row, chunk_rows=CHUNK_ROWS):
+    """Yield the formatted rows of `query` in lists of up to `chunk_rows`."""
+    cursor = conn.execute(query, params)
+    while True:
+        records = cursor.fetchmany(chunk_rows)
+        if not records:
+            return
+        yield [format_row(record) for record in records]
+
+
+def write_csv(conn, file_path, headers, query, params, format_row, progress=None):
+    """Write `headers` and every row of `query` to `file_path`; returns the number of rows.
+
+    `progress(rows written)` is called after each chunk; when it returns
+    False the export stops, the partial file is removed and None is returned.
+    """
+    written = 0
+    with open(file_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        for chunk in stream_rows(conn, query, params, format_row):
+            writer.writerows(chunk)
+            written += len(chunk)
+            if progress and progress(written) is False:
+                break
+        else:
+            return written
+    os.remove(file_path)
+    return None
+
+
+class TableExport(QObject):
+    """One export of a SqlTableView running on the pool, with its progress dialog.
+
+    `write` is write_csv or anything with its signature (pdf_report.write_pdf).
+    """
+
+    progressed = pyqtSignal(int, int)  # from the pool thread: rows written, rows in all
+
+    def __init__(self, parent, table, file_path, write=write_csv, show_success=True):
+        super().__init__(parent)
+        self.parent_widget = parent
+        self.table = table
+        self.file_path = file_path
+        self.write = write
+        self.show_success = show_success
+        self.cancelled = threading.Event()
+        self.progressed.connect(self.show_progress)
+
+    def start(self):
+        query, params, format_row = self.table.export_query()
+        headers = self.table.header_labels()
+        self.dialog = QProgressDialog("Exporting rows...", "Cancel", 0, 0, self.parent_widget)
+        self.dialog.setWindowTitle("Export")
+        self.dialog.setWindowModality(Qt.WindowModal)
+        self.dialog.setMinimumDuration(300)  # quick exports finish before it shows
+        self.dialog.canceled.connect(self.cancelled.set)
+
+        def job(conn):
+            total = count_rows(conn, query, params)
+
+            def progress(written):
+                self.progressed.emit(written, total)
+                return not self.cancelled.is_set()
+
+            return self.write(conn, self.file_path, headers, query, params, format_row, progress)
+
+        executor.submit(self.table.database(), job, self.finished, self, self.failed)
+
+    def show_progress(self, written, total):
+        self.dialog.setMaximum(max(total, 1))
+        self.dialog.setValue(min(written, total))
+        self.dialog.setLabelText(f"Exporting rows... {written:,} of {total:,}")
+
+    def finished(self, written):
+        self.dialog.reset()
+        if written is None:
+            QMessageBox.information(self.parent_widget, "Export", "Export cancelled.")
+        elif self.show_success:
+            QMessageBox.information(self.parent_widget, "Success", f"Export completed successfully! ({written:,} rows)")
+        self.deleteLater()
+
+    def failed(self, e):
+        self.dialog.reset()
+        QMessageBox.critical(self.parent_widget, "Export Error", f"Error exporting {os.path.basename(self.file_path)}: {str(e)}")
+        self.deleteLater()
+
+
+def export_csv(parent, table, file_path, show_success=True):
+    """Export every row of `table` to a CSV file in the background."""
+    TableExport(parent, table, file_path, write_csv, show_success).start()
+
+
+def export_pdf(parent, table, file_path, title, show_success=True):
+    """Export every row of `table` to a paginated PDF report in the background."""
+    import pdf_report  # reportlab loads only when a PDF is made
+    TableExport(parent, table, file_path, functools.partial(pdf_report.write_pdf, title=title), show_success).start()
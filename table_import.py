@@ -0,0 +1,568 @@
+"""Importing a table from another store's database file or a CSV file.
+
+ImportTableDialog used to read the whole source table with fetchall() and
+insert it positionally, so a file whose columns were in another order
+failed, "Update Table" collided on the primary keys of rows that were
+already there, and a CSV file became an all-TEXT table. import_rows()
+instead:
+
+- reads the source CHUNK_ROWS rows at a time (fetchmany, or csv.reader);
+- maps the source columns onto the target's by name, ignoring case,
+  spaces, punctuation and the currency sign, and knows the headers of the
+  app's own CSV exports ("Tansaction ID", "Cheque No.", ...); source
+  columns with no match are skipped and listed in the result;
+- converts each value to the target column's type ("1,250.00" to 1250.0
+  for a REAL column), setting aside rows that do not convert or leave a
+  NOT NULL column empty (a blank CSV cell counts as empty, NULL);
+- upserts on transaction_id or contact when the target table has a UNIQUE
+  index on one of them (INSERT ... ON CONFLICT DO UPDATE), so importing
+  the same sales twice updates them instead of failing; other tables are
+  appended to, with new row IDs;
+- commits each chunk in its own transaction and reports the rows read and
+  rows per second after each one.
+
+"Overwrite Table" empties the target table in the first chunk's
+transaction but keeps its columns, constraints and triggers. A table the
+target does not have yet is created with the source's column types, or
+with types guessed from the first chunk of a CSV file.
+
+TableImport runs an import on the global QThreadPool with a progress
+dialog, the same way table_export.TableExport runs an export. The dialog
+imports CSV files with import_rows(); another store's database file is
+merged by table_merge, which keeps the rows inside SQLite.
+"""
+import csv
+import itertools
+import sqlite3
+import threading
+import time
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox, QProgressDialog
+
+import db_manager
+import migrations
+
+CHUNK_ROWS = 2000
+CONFLICT_KEYS = [("transaction_id",), ("contact",), ("transaction_id", "line_no")]  # natural keys upserted on, in order of preference
+MAX_REJECTS_LISTED = 10
+
+# Tables the search index, summary totals and SMS outbox columns are derived
+# from; importing into them must re-attach the triggers that keep those current
+DERIVED_FROM_TABLES = {"customers", "customers_data", "payments", "inventory", "sms_queue"}
+
+# Normalised headers of the app's CSV exports -> candidate target columns, first match wins
+ALIASES = {
+    "tansaction_id": ["transaction_id"],
+    "customer": ["customer_name", "name"],
+    "customer_name": ["customer_name", "name"],
+    "product": ["item_name", "product_name"],
+    "items_bought": ["product_name", "item_name"],
+    "mode": ["payment_mode"],
+    "cheque_no": ["cheque_number"],
+    "bank": ["cheque_bank"],
+    "date": ["entry_date_and_time"],
+    "payment_date": ["transaction_date"],
+}
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def normalise(name):
+    """'Amount Paid ₵ ' -> 'amount_paid'"""
+    words = "".join(c if c.isalnum() else " " for c in name.replace("₵", "").lower()).split()
+    return "_".join(words)
+
+
+def map_columns(source_columns, target_columns, mapping=None):
+    """Pair source columns with target columns; returns ([(source index, target column)], [unmatched source columns]).
+
+    `mapping` ({source column: target column}) overrides the matching by name.
+    """
+    by_name = {normalise(column): column for column in target_columns}
+    pairs, unmatched, taken = [], [], set()
+    for index, column in enumerate(source_columns):
+        if mapping and column in mapping:
+            candidates = [mapping[column]]
+        else:
+            key = normalise(column)
+            candidates = [by_name.get(key)] + [by_name.get(alias) for alias in ALIASES.get(key, [])]
+        target = next((name for name in candidates if name in target_columns and name not in taken), None)
+        if target is None:
+            unmatched.append(column)
+        else:
+            pairs.append((index, target))
+            taken.add(target)
+    return pairs, unmatched
+
+
+def affinity(declared_type):
+    """SQLite's column affinity for a declared type (https://sqlite.org/datatype3.html, 3.1)."""
+    declared = (declared_type or "").upper()
+    if "INT" in declared:
+        return "INTEGER"
+    if "CHAR" in declared or "CLOB" in declared or "TEXT" in declared:
+        return "TEXT"
+    if not declared or "BLOB" in declared:
+        return "BLOB"
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return "REAL"
+    return "NUMERIC"
+
+
+def to_number(value):
+    """int or float of a number as the app prints it (currency sign, thousands separators); None when empty."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    text = str(value).replace("₵", "").replace(",", "").strip()
+    if not text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def to_integer(value):
+    number = to_number(value)
+    return int(number) if isinstance(number, float) and number.is_integer() else number
+
+
+def to_real(value):
+    number = to_number(value)
+    return None if number is None else float(number)
+
+
+def to_text(value):
+    return value if value is None or isinstance(value, (str, bytes)) else str(value)
+
+
+def to_numeric(value):
+    try:
+        return to_integer(value)
+    except ValueError:
+        return value  # kept as text, as SQLite itself does
+
+
+CONVERTERS = {"INTEGER": to_integer, "REAL": to_real, "TEXT": to_text, "NUMERIC": to_numeric, "BLOB": lambda value: value}
+
+
+def guess_type(values):
+    """Column type for a new table from sample CSV values."""
+    kinds = set()
+    for value in values:
+        try:
+            number = to_number(value)
+        except ValueError:
+            return "TEXT"
+        if number is not None:
+            kinds.add(type(number))
+    if not kinds:
+        return "TEXT"
+    return "INTEGER" if kinds == {int} else "REAL"
+
+
+class TargetColumn:
+    def __init__(self, name, declared_type, not_null, default, primary_key):
+        self.name = name
+        self.declared_type = declared_type
+        self.required = bool(not_null) and default is None and not primary_key
+        self.primary_key = primary_key
+        self.convert = CONVERTERS[affinity(declared_type)]
+
+
+def target_columns(conn, table, schema="main"):
+    return [TargetColumn(name, declared, not_null, default, pk)
+            for _, name, declared, not_null, default, pk in conn.execute(f"PRAGMA {schema}.table_info({quote(table)})")]
+
+
+def row_id_column(columns):
+    """The INTEGER PRIMARY KEY column (an alias of the rowid), or None."""
+    keys = [column for column in columns if column.primary_key]
+    if len(keys) == 1 and keys[0].declared_type.upper() == "INTEGER":
+        return keys[0].name
+    return None
+
+
+def match_columns(source_columns, columns, keep_row_ids, mapping=None):
+    """map_columns() against TargetColumns, leaving out the row ID unless `keep_row_ids`.
+
+    Row IDs of another file mean nothing in this one; rows merged into a
+    table that has rows of its own get new ones.
+    """
+    pairs, unmatched = map_columns(source_columns, [column.name for column in columns], mapping)
+    row_id = row_id_column(columns)
+    if row_id and not keep_row_ids:
+        unmatched += [source_columns[index] for index, name in pairs if name == row_id]
+        pairs = [(index, name) for index, name in pairs if name != row_id]
+    return pairs, unmatched
+
+
+def missing_columns(columns, mapped):
+    """NOT NULL columns without a default that none of `mapped` fills."""
+    return [column.name for column in columns if column.required and column.name not in mapped]
+
+
+def conflict_key(conn, table, columns):
+    """The first of CONFLICT_KEYS whose columns are all in `columns` and make a UNIQUE index of `table`, or None."""
+    unique = set()
+    for _, index, is_unique, *_ in conn.execute(f"PRAGMA main.index_list({quote(table)})"):
+        if is_unique:
+            unique.add(tuple(row[2] for row in conn.execute(f"PRAGMA main.index_info({quote(index)})")))
+    return next((key for key in CONFLICT_KEYS if key in unique and set(key) <= set(columns)), None)
+
+
+def upsert_clause(columns, key):
+    """ON CONFLICT clause updating the other `columns` of a row whose `key` columns match; '' without a key."""
+    if key is None:
+        return ""
+    updates = [f"{quote(column)} = excluded.{quote(column)}" for column in columns if column not in key]
+    targets = ", ".join(quote(column) for column in key)
+    return f" ON CONFLICT ({targets}) " + (f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING")
+
+
+def insert_statement(table, columns, key=None):
+    names = ", ".join(quote(column) for column in columns)
+    return f"INSERT INTO {quote(table)} ({names}) VALUES ({', '.join('?' for _ in columns)})" + upsert_clause(columns, key)
+
+
+class DatabaseSource:
+    """A table of another SQLite file, read on the importing thread."""
+
+    def __init__(self, path, table):
+        self.path = path
+        self.table = table
+        self.conn = None
+        self.columns = []
+        self.types = {}  # column -> declared type, for creating the table in the target
+
+    def open(self):
+        self.conn = db_manager.open_reader(self.path)
+        info = self.conn.execute(f"PRAGMA table_info({quote(self.table)})").fetchall()
+        if not info:
+            raise ValueError(f"{self.path} has no table {self.table}")
+        self.columns = [row[1] for row in info]
+        self.types = {row[1]: row[2] for row in info}
+
+    def count(self):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {quote(self.table)}").fetchone()[0]
+
+    def chunks(self, chunk_rows):
+        names = ", ".join(quote(column) for column in self.columns)
+        cursor = self.conn.execute(f"SELECT {names} FROM {quote(self.table)}")
+        while True:
+            records = cursor.fetchmany(chunk_rows)
+            if not records:
+                return
+            yield records
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class CsvSource:
+    """A CSV file whose first row names the columns."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.reader = None
+        self.columns = []
+        self.types = {}  # guessed from the first chunk when the table is created
+
+    def open(self):
+        self.file = open(self.path, newline="", encoding="utf-8-sig")  # -sig: Excel starts its CSV files with a BOM
+        self.reader = csv.reader(self.file)
+        self.columns = [column.strip() for column in next(self.reader, [])]
+        if not self.columns:
+            raise ValueError(f"{self.path} is empty")
+
+    def count(self):
+        return None  # unknown without reading the file twice
+
+    def chunks(self, chunk_rows):
+        width = len(self.columns)
+        while True:
+            records = list(itertools.islice(self.reader, chunk_rows))
+            if not records:
+                return
+            # CSV has no NULL: a blank cell, or a missing trailing one, reads as None so that
+            # NOT NULL columns set the row aside and optional ones stay NULL
+            yield [[cell if cell.strip() else None for cell in record] + [None] * (width - len(record)) for record in records]
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ImportResult:
+    def __init__(self, table):
+        self.table = table
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.reasons = []  # (row number, reason) of the first MAX_REJECTS_LISTED rows set aside
+        self.unmatched = []
+        self.key = None
+        self.created = False
+        self.cancelled = False
+        self.elapsed = 0.0
+
+    def reject(self, row_number, reason):
+        self.rejected += 1
+        if len(self.reasons) < MAX_REJECTS_LISTED:
+            self.reasons.append((row_number, reason))
+
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        lines = [f"{'Stopped after' if self.cancelled else 'Read'} {self.read:,} rows for {self.table} "
+                 f"in {self.elapsed:.1f} s ({self.rows_per_second():,.0f} rows/s).",
+                 f"{self.inserted:,} added, {self.updated:,} updated, {self.rejected:,} skipped."]
+        if self.created:
+            lines.append(f"Created table {self.table}.")
+        if self.key:
+            lines.append(f"Existing rows were matched on {' and '.join(self.key)}.")
+        if self.unmatched:
+            lines.append("Columns not imported: " + ", ".join(self.unmatched))
+        lines += [f"Row {row_number}: {reason}" for row_number, reason in self.reasons]
+        return "\n".join(lines)
+
+
+def unconvertible(record, names, converters, positions):
+    """Why a record could not be converted: the first column whose value does not fit."""
+    for name, convert, position in zip(names, converters, positions):
+        try:
+            convert(record[position])
+        except (ValueError, TypeError):
+            return f"{name}: {record[position]!r} is not a number"
+    return "could not be converted"
+
+
+def create_table(conn, table, columns, types):
+    definitions = ", ".join(f"{quote(column)} {types.get(column) or ''}".rstrip() for column in columns)
+    with conn:
+        conn.execute(f"CREATE TABLE {quote(table)} ({definitions})")
+
+
+def suspend_triggers(conn, table):
+    """Drop the triggers on `table` for the length of an import; returns their (name, sql) for refresh_derived().
+
+    Keeping the search index and totals current row by row would be
+    wasted: refresh_derived_tables rebuilds them from scratch afterwards.
+    Should the app die before then, migrations.repair_derived_tables puts
+    the derived triggers back the next time the file is opened.
+    """
+    triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,)).fetchall()
+    with conn:
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER IF EXISTS {quote(name)}")
+    return triggers
+
+
+def refresh_derived(conn, triggers):
+    """Re-create the derived tables' triggers, rebuild them, and put back any other trigger suspend_triggers dropped."""
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        migrations.refresh_derived_tables(cursor)
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        for name, sql in triggers:
+            if name not in existing:
+                cursor.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def write_chunks(conn, table, sql, chunks, converters, positions, names, required, delete_first, result, progress):
+    """Convert and write each chunk in a transaction of its own; returns the number of rows written."""
+    written = 0
+    for chunk in chunks:
+        rows, numbers = [], []
+        for number, record in enumerate(chunk, result.read + 1):
+            try:
+                values = tuple(convert(record[position]) for convert, position in zip(converters, positions))
+            except (ValueError, TypeError):
+                result.reject(number, unconvertible(record, names, converters, positions))
+                continue
+            empty = [names[position] for position in required if values[position] is None]
+            if empty:
+                result.reject(number, f"no {', '.join(empty)}")
+                continue
+            rows.append(values)
+            numbers.append(number)
+        try:
+            with conn:
+                if delete_first:
+                    conn.execute(f"DELETE FROM {quote(table)}")
+                conn.executemany(sql, rows)
+            written += len(rows)
+        except sqlite3.IntegrityError:
+            # A constraint other than the conflict key: redo the chunk row by row to set the offenders aside
+            with conn:
+                if delete_first:
+                    conn.execute(f"DELETE FROM {quote(table)}")
+                for number, values in zip(numbers, rows):
+                    try:
+                        conn.execute(sql, values)
+                        written += 1
+                    except sqlite3.IntegrityError as e:
+                        result.reject(number, str(e))
+        delete_first = False
+        result.read += len(chunk)
+        if progress and progress(result.read) is False:
+            result.cancelled = True
+            break
+    if delete_first:  # overwriting with an empty source
+        with conn:
+            conn.execute(f"DELETE FROM {quote(table)}")
+    return written
+
+
+def import_rows(conn, table, source, overwrite=False, progress=None, mapping=None, chunk_rows=CHUNK_ROWS):
+    """Import every row of the opened `source` into `table` of `conn`; returns an ImportResult.
+
+    `progress(rows read)` is called after each chunk is committed; when it
+    returns False the import stops there (the chunks already committed
+    stay). Raises ValueError when the target has a NOT NULL column the
+    source cannot fill.
+    """
+    result = ImportResult(table)
+    start = time.perf_counter()
+    chunks = source.chunks(chunk_rows)
+    columns = target_columns(conn, table)
+    if not columns:
+        first = next(chunks, [])
+        types = source.types or {column: guess_type(record[index] for record in first)
+                                 for index, column in enumerate(source.columns)}
+        create_table(conn, table, source.columns, types)
+        chunks = itertools.chain([first] if first else [], chunks)
+        columns = target_columns(conn, table)
+        result.created = True
+
+    pairs, result.unmatched = match_columns(source.columns, columns, overwrite or result.created, mapping)
+    by_name = {column.name: column for column in columns}
+    mapped = [name for _, name in pairs]
+    missing = missing_columns(columns, mapped)
+    if missing:
+        raise ValueError(f"{table} needs {', '.join(missing)}, which the source does not have "
+                         f"(source columns: {', '.join(source.columns)})")
+    positions = [index for index, _ in pairs]
+    converters = [by_name[name].convert for name in mapped]
+    required = [position for position, name in enumerate(mapped) if by_name[name].required]
+    result.key = conflict_key(conn, table, mapped)
+    sql = insert_statement(table, mapped, result.key)
+
+    count = f"SELECT COUNT(*) FROM {quote(table)}"
+    before = 0 if overwrite else conn.execute(count).fetchone()[0]
+    derived = table in DERIVED_FROM_TABLES
+    triggers = suspend_triggers(conn, table) if derived else []
+    try:
+        imported = write_chunks(conn, table, sql, chunks, converters, positions, mapped, required,
+                                overwrite and not result.created, result, progress)
+    finally:
+        if derived:
+            refresh_derived(conn, triggers)
+    result.inserted = conn.execute(count).fetchone()[0] - before
+    result.updated = max(0, imported - result.inserted)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+class ImportJob(QRunnable):
+    def __init__(self, run):
+        super().__init__()
+        self.run_import = run
+
+    def run(self):
+        self.run_import.work()
+
+
+class TableImport(QObject):
+    """One import running on the global thread pool, with its progress dialog.
+
+    `run(conn, progress)` does the work on the pool thread with a connection
+    of its own to `target_db` and returns a result with a summary();
+    `progress(rows done, rows in all or 0)` returns False once the user
+    cancelled.
+    """
+
+    progressed = pyqtSignal(int, int)  # from the pool thread: rows done, rows in all (0 when unknown)
+    done = pyqtSignal(object, object)  # from the pool thread: result or None, exception or None
+
+    def __init__(self, parent, target_db, run, label):
+        super().__init__(parent)
+        self.parent_widget = parent
+        self.target_db = target_db
+        self.run = run
+        self.label = label
+        self.cancelled = threading.Event()
+        self.progressed.connect(self.show_progress)
+        self.done.connect(self.finished)
+
+    def start(self):
+        self.dialog = QProgressDialog(f"{self.label}...", "Cancel", 0, 0, self.parent_widget)
+        self.dialog.setWindowTitle("Import")
+        self.dialog.setWindowModality(Qt.WindowModal)
+        self.dialog.setMinimumDuration(300)
+        self.dialog.canceled.connect(self.cancelled.set)
+        self.started = time.perf_counter()
+        QThreadPool.globalInstance().start(ImportJob(self))
+
+    def work(self):
+        result = error = None
+        conn = sqlite3.connect(self.target_db, timeout=db_manager.BUSY_TIMEOUT_MS / 1000)
+
+        def progress(done, total):
+            self.progressed.emit(done, total)
+            return not self.cancelled.is_set()
+
+        try:
+            result = self.run(conn, progress)
+        except Exception as e:
+            traceback.print_exc()
+            error = e
+        finally:
+            conn.close()
+        self.done.emit(result, error)
+
+    def show_progress(self, done, total):
+        rate = done / max(time.perf_counter() - self.started, 1e-6)
+        self.dialog.setMaximum(total)
+        self.dialog.setValue(min(done, total))
+        of_total = f" of {total:,}" if total else ""
+        self.dialog.setLabelText(f"{self.label}... {done:,}{of_total} rows ({rate:,.0f} rows/s)")
+
+    def finished(self, result, error):
+        self.dialog.reset()
+        if error is not None:
+            QMessageBox.critical(self.parent_widget, "Import Error", f"{self.label} failed: {error}")
+        else:
+            if not getattr(result, "dry_run", False):
+                db_manager.manager.notify_changed(self.target_db)  # open views of the target file reload
+            QMessageBox.information(self.parent_widget, "Import", result.summary())
+        self.deleteLater()
+
+
+def import_table(parent, source, target_db, table, overwrite):
+    """Import `source` (a DatabaseSource or CsvSource) into `table` of `target_db` in the background."""
+
+    def run(conn, progress):
+        source.open()
+        try:
+            total = source.count() or 0
+            return import_rows(conn, table, source, overwrite, lambda read: progress(read, total))
+        finally:
+            source.close()
+
+    TableImport(parent, target_db, run, f"Importing {table}").start()
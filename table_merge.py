@@ -0,0 +1,251 @@
+"""Merging another store's database file with ATTACH DATABASE.
+
+table_import.import_rows() brings every row through Python to map and
+convert it, which a CSV file needs. Between two store files none of that
+is necessary: merge_tables() attaches the other file and copies each table
+with a single
+
+    INSERT INTO main.t (...) SELECT ... FROM source.t WHERE ... ON CONFLICT ...
+
+so the rows never leave SQLite. Columns are still matched by name
+(table_import.match_columns), rows that would leave a NOT NULL column empty
+are filtered out in the WHERE clause, and tables with a transaction_id,
+contact or (transaction_id, line_no) UNIQUE index are upserted on it. Rows
+that break any other constraint are skipped (INSERT OR IGNORE), and so are
+rows of the tables without such a key that are already in the target (see
+DUPLICATE_KEYS), so merging the same branch file twice adds nothing.
+
+With dry_run=True nothing is written: the same plan is only counted, table
+by table, as rows that would be added, updated or skipped (and removed,
+when overwriting) - "Preview Merge" in ImportTableDialog. Each table is
+copied in a transaction of its own, and the cancel button interrupts the
+statement running through a progress handler.
+"""
+import os
+import sqlite3
+import time
+
+import db_manager
+import migrations
+import table_import
+from table_import import quote
+
+SCHEMA = "source"  # name the other file is attached under
+INTERRUPT_EVERY = 1000000  # SQLite VM instructions between looks at the cancel button
+# Rebuilt from the base tables after every merge (refresh_derived_tables), so never merged themselves
+DERIVED_TABLES = {"summary_totals", "customer_totals", "product_totals", "daily_totals"}
+# Left out of "All Tables": another store's outbox would be sent again from this one
+OWN_TABLES = {"sms_queue", "sms_status_log"}
+# Tables without a UNIQUE natural key -> columns that tell a row already merged
+# (matched with IS, so empty values match too); a payment appended twice would
+# count its amount twice
+DUPLICATE_KEYS = {
+    "payments": ("transaction_id", "entry_date_and_time"),
+    "sales": ("customer_name", "item_name", "sale_date"),
+    "audit_log": ("logged_at", "action", "transaction_id", "detail"),
+}
+
+
+class TableMerge:
+    """The plan for, and the counts of, merging one table."""
+
+    def __init__(self, table):
+        self.table = table
+        self.source_rows = 0
+        self.added = 0
+        self.updated = 0
+        self.skipped = 0
+        self.removed = 0
+        self.created = False
+        self.key = None
+        self.problem = None  # why the table cannot be merged
+        self.statement = None
+
+    def line(self, dry_run):
+        if self.problem:
+            return f"{self.table}: not merged, {self.problem}"
+        if not self.source_rows:
+            return f"{self.table}: empty"
+        verbs = ("to add", "to update", "to skip", "to remove") if dry_run else ("added", "updated", "skipped", "removed")
+        counts = [f"{self.added:,} {verbs[0]}", f"{self.updated:,} {verbs[1]}", f"{self.skipped:,} {verbs[2]}"]
+        if self.removed:
+            counts.append(f"{self.removed:,} {verbs[3]}")
+        if self.created:
+            counts.append("new table")
+        if self.key:
+            counts.append(f"matched on {' and '.join(self.key)}")
+        return f"{self.table}: {', '.join(counts)}"
+
+
+class MergeResult:
+    def __init__(self, source, dry_run):
+        self.source = source
+        self.dry_run = dry_run
+        self.tables = []
+        self.cancelled = False
+        self.elapsed = 0.0
+
+    def summary(self):
+        name = os.path.basename(self.source)
+        if self.dry_run:
+            heading = f"Merging {name} would change:"
+        else:
+            rows = sum(merge.added + merge.updated for merge in self.tables)
+            heading = (f"{'Stopped merging' if self.cancelled else 'Merged'} {name} in {self.elapsed:.1f} s "
+                       f"({rows / self.elapsed if self.elapsed else 0:,.0f} rows/s):")
+        return "\n".join([heading] + [merge.line(self.dry_run) for merge in self.tables])
+
+
+def mergeable_tables(conn, schema="main"):
+    """Tables of `schema` worth merging: not SQLite's own, the search indexes or the derived totals."""
+    names = [row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master "
+                                            "WHERE type = 'table' AND name NOT LIKE 'sqlite%' ORDER BY name")]
+    return [name for name in names if name not in DERIVED_TABLES
+            and not any(name == fts or name.startswith(fts + "_") for fts in migrations.SEARCH_INDEXES)]
+
+
+def default_tables(conn, schema="main"):
+    """The tables "All Tables" merges."""
+    return [name for name in mergeable_tables(conn, schema) if name not in OWN_TABLES]
+
+
+def source_tables(path):
+    """mergeable_tables() of the database file at `path`, for the import dialog's list."""
+    conn = db_manager.open_reader(path)
+    try:
+        return mergeable_tables(conn)
+    finally:
+        conn.close()
+
+
+def count(conn, sql, params=()):
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def plan(conn, table, overwrite):
+    """Work out the statement merging `table` and count what it would do."""
+    merge = TableMerge(table)
+    source = f"{SCHEMA}.{quote(table)}"
+    target = f"main.{quote(table)}"
+    source_columns = [column.name for column in table_import.target_columns(conn, table, SCHEMA)]
+    merge.source_rows = count(conn, f"SELECT COUNT(*) FROM {source}")
+    columns = table_import.target_columns(conn, table)
+    if not columns:
+        merge.created = True
+        merge.added = merge.source_rows
+        names = ", ".join(quote(column) for column in source_columns)
+        merge.statement = f"INSERT INTO {target} ({names}) SELECT {names} FROM {source}"
+        return merge
+
+    pairs, _ = table_import.match_columns(source_columns, columns, overwrite)
+    mapped = [name for _, name in pairs]
+    missing = table_import.missing_columns(columns, mapped)
+    if missing:
+        merge.problem = f"the source has no {', '.join(missing)}"
+        merge.skipped = merge.source_rows
+        return merge
+    selected = {name: source_columns[index] for index, name in pairs}
+    required = {column.name for column in columns if column.required}
+    valid = " AND ".join(f"s.{quote(selected[name])} IS NOT NULL" for name in mapped if name in required) or "1"
+    merge.key = None if overwrite else table_import.conflict_key(conn, table, mapped)
+
+    valid_rows = count(conn, f"SELECT COUNT(*) FROM {source} AS s WHERE {valid}")
+    merge.skipped = merge.source_rows - valid_rows
+    duplicate_key = DUPLICATE_KEYS.get(table, ())
+    if not overwrite and not merge.key and duplicate_key and set(duplicate_key) <= set(mapped):
+        match = " AND ".join(f"t.{quote(column)} IS s.{quote(selected[column])}" for column in duplicate_key)
+        valid += f" AND NOT EXISTS (SELECT 1 FROM {target} AS t WHERE {match})"
+        duplicates = valid_rows - count(conn, f"SELECT COUNT(*) FROM {source} AS s WHERE {valid}")
+        merge.skipped += duplicates
+        valid_rows -= duplicates
+    if overwrite:
+        merge.removed = count(conn, f"SELECT COUNT(*) FROM {target}")
+    elif merge.key:
+        match = " AND ".join(f"t.{quote(column)} = s.{quote(selected[column])}" for column in merge.key)
+        merge.updated = count(conn, f"SELECT COUNT(*) FROM {source} AS s WHERE {valid} "
+                                    f"AND EXISTS (SELECT 1 FROM {target} AS t WHERE {match})")
+    merge.added = valid_rows - merge.updated
+
+    names = ", ".join(quote(name) for name in mapped)
+    values = ", ".join(f"s.{quote(selected[name])}" for name in mapped)
+    merge.statement = (f"INSERT OR IGNORE INTO {target} ({names}) SELECT {values} FROM {source} AS s WHERE {valid}"
+                       + table_import.upsert_clause(mapped, merge.key))
+    return merge
+
+
+def run(conn, merge, overwrite):
+    """Carry out a plan() in one transaction; the counts become what actually happened."""
+    target = f"main.{quote(merge.table)}"
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if merge.created:
+            create = conn.execute(f"SELECT sql FROM {SCHEMA}.sqlite_master WHERE type = 'table' AND name = ?", (merge.table,)).fetchone()[0]
+            conn.execute(create)  # an unqualified CREATE TABLE goes into main
+        elif overwrite:
+            conn.execute(f"DELETE FROM {target}")
+        before = count(conn, f"SELECT COUNT(*) FROM {target}")
+        conn.execute(merge.statement)
+        merge.added = count(conn, f"SELECT COUNT(*) FROM {target}") - before
+        merge.skipped = merge.source_rows - merge.added - merge.updated
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def merge_tables(conn, source_path, tables=None, overwrite=False, dry_run=False, progress=None):
+    """Merge `tables` (default_tables() when None) of the file at `source_path` into `conn`; returns a MergeResult.
+
+    `progress(rows done, rows in all)` is called after each table and
+    every INTERRUPT_EVERY steps of SQLite; when it returns False the table
+    being copied is rolled back and the merge stops there.
+    """
+    if db_manager.manager.key(source_path) == db_manager.manager.key(conn.execute("PRAGMA database_list").fetchone()[2]):
+        raise ValueError("the source and the target are the same file")
+    result = MergeResult(source_path, dry_run)
+    start = time.perf_counter()
+    conn.execute(f"ATTACH DATABASE ? AS {SCHEMA}", (source_path,))
+    triggers = []
+    try:
+        for table in tables or default_tables(conn, SCHEMA):
+            result.tables.append(plan(conn, table, overwrite))
+        if dry_run:
+            return result
+
+        total = sum(merge.source_rows for merge in result.tables if merge.statement)
+        done = 0
+        conn.set_progress_handler(lambda: progress is not None and progress(done, total) is False, INTERRUPT_EVERY)
+        for merge in result.tables:
+            if not merge.statement:
+                continue
+            if merge.table in table_import.DERIVED_FROM_TABLES:
+                triggers += table_import.suspend_triggers(conn, merge.table)
+            try:
+                run(conn, merge, overwrite)
+            except sqlite3.OperationalError as e:
+                if "interrupted" not in str(e):
+                    raise
+                merge.problem = "cancelled"
+                result.cancelled = True
+                break
+            done += merge.source_rows
+            if progress and progress(done, total) is False:
+                result.cancelled = True
+                break
+    finally:
+        conn.set_progress_handler(None, 0)
+        if triggers:
+            table_import.refresh_derived(conn, triggers)
+        conn.execute(f"DETACH DATABASE {SCHEMA}")
+        result.elapsed = time.perf_counter() - start
+    return result
+
+
+def merge_database(parent, source_db, target_db, tables=None, overwrite=False, dry_run=False):
+    """Merge (or with `dry_run` only count) `tables` of `source_db` into `target_db` in the background."""
+
+    def work(conn, progress):
+        return merge_tables(conn, source_db, tables, overwrite, dry_run, progress)
+
+    label = "Counting the rows to merge" if dry_run else f"Merging {os.path.basename(source_db)}"
+    table_import.TableImport(parent, target_db, work, label).start()
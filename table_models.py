@@ -0,0 +1,229 @@
+"""Table views that page their rows in from SQLite.
+
+The list windows used to run a query, call setRowCount(len(rows)) and build a
+QTableWidgetItem for every cell. SqlTableView keeps only the query and fetches
+PAGE_SIZE rows at a time as the user scrolls (canFetchMore/fetchMore), so a
+view opens in the same time whatever the size of the file.
+"""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QTableView
+
+import db_manager
+from query_executor import executor
+
+PAGE_SIZE = 200
+
+
+class SqlTableModel(QAbstractTableModel):
+    """The rows of one SELECT, read a page at a time.
+
+    `format_row(record)` turns a result row into the displayed texts, so a
+    query may return more columns than are shown (e.g. quantities that are
+    folded into the product column). `sort_columns` gives, per displayed
+    column, the position of the result column to ORDER BY when the header is
+    clicked; by default displayed column n sorts on result column n + 1.
+    """
+
+    def __init__(self, headers, format_row=None, monospace_columns=(), sort_columns=None, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.format_row = format_row or (lambda record: [str(value) for value in record])
+        self.monospace_columns = set(monospace_columns)
+        self.sort_columns = sort_columns
+        self.monospace_font = QFont("Courier New", 10)
+        self.database = None
+        self.query = None
+        self.params = []
+        self.order_by = None
+        self.rows = []  # (record, displayed texts) of the pages read so far
+        self.exhausted = True
+        self.editable = {}  # row -> columns the user may edit
+        self.edits = {}  # (row, column) -> edited text
+
+    def set_query(self, database, query, params=(), first_page=None):
+        """Show the result of `query`; only its first page is read now.
+
+        `first_page` is that page when it was already read by read_page() on
+        a worker thread.
+        """
+        self.database = database
+        self.query = query
+        self.params = list(params)
+        self.reload(first_page)
+
+    def reload(self, first_page=None):
+        self.beginResetModel()
+        self.rows = []
+        self.editable = {}
+        self.edits = {}
+        self.exhausted = self.query is None
+        if not self.exhausted:
+            if first_page is None:
+                first_page = self.read_page(db_manager.connect(self.database), self.query, self.params)
+            self.rows = self._format_page(first_page)
+        self.endResetModel()
+
+    def statement(self, query=None):
+        query = query or self.query
+        if self.order_by:
+            return f"SELECT * FROM ({query}) ORDER BY {self.order_by}"
+        return query
+
+    def read_page(self, conn, query, params, offset=0):
+        """Result rows of `query` from `offset` on, in the current sort order.
+
+        Only reads, so a worker thread may call it with its own connection.
+        """
+        return conn.execute(f"{self.statement(query)} LIMIT ? OFFSET ?", list(params) + [PAGE_SIZE, offset]).fetchall()
+
+    def _format_page(self, records):
+        self.exhausted = len(records) < PAGE_SIZE
+        return [(record, self.format_row(record)) for record in records]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self._format_page(self.read_page(db_manager.connect(self.database), self.query, self.params, len(self.rows)))
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def export_query(self):
+        """(query, params, format_row) giving every row as displayed, loaded or not, in the current order (see table_export)."""
+        return self.statement(), list(self.params), self.format_row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def record(self, row):
+        """The raw result row behind a displayed row."""
+        return self.rows[row][0]
+
+    def text(self, row, column):
+        if (row, column) in self.edits:
+            return self.edits[(row, column)]
+        texts = self.rows[row][1]
+        return texts[column] if column < len(texts) else ""
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.text(row, column)
+        if column in self.monospace_columns:
+            if role == Qt.FontRole:
+                return self.monospace_font
+            if role == Qt.TextAlignmentRole:
+                return int(Qt.AlignLeft | Qt.AlignTop)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return section + 1
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() in self.editable.get(index.row(), ()):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def set_editable(self, row, columns):
+        self.editable[row] = set(columns)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() not in self.editable.get(index.row(), ()):
+            return False
+        self.edits[(index.row(), index.column())] = str(value)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Re-run the query ordered by a column; column -1 restores the query's own order."""
+        if column < 0:
+            self.order_by = None
+        else:
+            position = self.sort_columns[column] if self.sort_columns else column + 1
+            self.order_by = f"{position} {'DESC' if order == Qt.DescendingOrder else 'ASC'}"
+        if self.query is not None:
+            self.reload()
+
+
+class SqlProxyModel(QSortFilterProxyModel):
+    """Sorts by handing the column to the source model's SQL.
+
+    Sorting in the proxy would only order the pages already read, so the
+    header click is passed down and the source re-queries with ORDER BY.
+    Filters set on the proxy still apply to the loaded rows as usual.
+    """
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+
+class SqlTableView(QTableView):
+    """QTableView over a SqlTableModel, with the QTableWidget-style accessors
+    (currentRow, rowCount, columnCount) the windows already use."""
+
+    def __init__(self, headers, format_row=None, monospace_columns=(), sort_columns=None, parent=None):
+        super().__init__(parent)
+        self.source = SqlTableModel(headers, format_row, monospace_columns, sort_columns, self)
+        self.proxy = SqlProxyModel(self)
+        self.proxy.setSourceModel(self.source)
+        self.setModel(self.proxy)
+        # No column is sorted until the user clicks a header; the query's ORDER BY applies
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.proxy.rowsInserted.connect(self.fit_new_rows)
+
+    def load(self, database, query, params=(), first_page=None):
+        self.source.set_query(database, query, params, first_page)
+        self.resizeRowsToContents()
+
+    def read_page(self, conn, query, params):
+        """First page of `query` for load(..., first_page=...), readable off the GUI thread."""
+        return self.source.read_page(conn, query, params)
+
+    def load_in_background(self, database, query, params=(), channel=None, on_error=None):
+        """load() with the first page read on the query executor; a newer load on `channel` (default: this view) wins."""
+        executor.submit(database, lambda conn: self.read_page(conn, query, params),
+                        lambda first_page: self.load(database, query, params, first_page), channel or self, on_error)
+
+    def fit_new_rows(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.resizeRowToContents(row)
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return self.proxy.mapToSource(index).row() if index.isValid() else -1
+
+    def rowCount(self):
+        return self.source.rowCount()
+
+    def columnCount(self):
+        return self.source.columnCount()
+
+    def text(self, row, column):
+        return self.source.text(row, column)
+
+    def set_editable(self, row, columns):
+        self.source.set_editable(row, columns)
+
+    def header_labels(self):
+        return list(self.source.headers)
+
+    def database(self):
+        return self.source.database
+
+    def export_query(self):
+        return self.source.export_query()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+import aggregates
+import db_manager
+import queries
+
+
+class CustomerSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.manager = db_manager.ConnectionManager()
+        self.conn = self.manager.connect(os.path.join(self.folder.name, "store.db"))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO customers (name, total_owed, total_paid, remaining_debt, transaction_id) VALUES (?, ?, ?, ?, ?)",
+                [("Ama_K", 10, 4, 6, "T1"), ("AmaXK", 20, 5, 15, "T2"), ("Kofi", 7, 7, 0, "T3"), (None, 3, 1, 2, "T4")])
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.folder.cleanup()
+
+    def test_covers_the_rows_the_search_lists(self):
+        for customer in ["Ama_K", "ama", "Am", "kofi", "nobody", "", queries.ALL_CUSTOMERS]:
+            query, params = queries.customer_search(customer, "")
+            paid, debt = self.conn.execute(f"SELECT IFNULL(SUM(total_paid), 0), IFNULL(SUM(remaining_debt), 0) FROM ({query})", params).fetchone()
+            self.assertEqual(aggregates.customer_summary(self.conn, customer), (paid, debt), customer)
+
+    def test_all_customers_is_no_filter(self):
+        self.assertEqual(aggregates.customer_summary(self.conn, queries.ALL_CUSTOMERS), (17, 23))
+
+
+if __name__ == "__main__":
+    unittest.main()
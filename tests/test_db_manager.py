@@ -0,0 +1,93 @@
+import ntpath
+import nturl2path
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import db_manager
+import migrations
+import table_import
+
+
+class ReaderUriTest(unittest.TestCase):
+    def windows_uri(self, path):
+        # The Windows spellings of abspath and pathname2url, whatever the platform running the test
+        with mock.patch("os.path.abspath", ntpath.abspath), mock.patch("urllib.request.pathname2url", nturl2path.pathname2url):
+            return db_manager.reader_uri(path)
+
+    def test_unc_path_has_empty_authority(self):
+        self.assertEqual(self.windows_uri(r"\\server\share\store.db"), "file:////server/share/store.db?mode=ro")
+
+    def test_drive_path(self):
+        self.assertEqual(self.windows_uri(r"C:\Rosemer Stores\store.db"), "file:///C:/Rosemer%20Stores/store.db?mode=ro")
+
+    def test_sqlite_accepts_unc_uri(self):
+        # There is no server here, so the file cannot be opened; the URI itself must not be refused
+        with self.assertRaises(sqlite3.OperationalError) as raised:
+            sqlite3.connect(self.windows_uri(r"\\server\share\store.db"), uri=True).execute("SELECT 1")
+        self.assertNotIn("authority", str(raised.exception))
+
+    def test_open_reader_reads_but_does_not_write(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "store #1.db")
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE t (x)")
+            conn.execute("INSERT INTO t VALUES (1)")
+            conn.commit()
+            conn.close()
+            reader = db_manager.open_reader(path)
+            try:
+                self.assertEqual(reader.execute("SELECT x FROM t").fetchall(), [(1,)])
+                with self.assertRaises(sqlite3.OperationalError):
+                    reader.execute("INSERT INTO t VALUES (2)")
+            finally:
+                reader.close()
+
+
+class JournalModeTest(unittest.TestCase):
+    def test_unc_path_is_remote(self):
+        with mock.patch("os.path.abspath", ntpath.abspath):
+            self.assertTrue(db_manager.is_remote(r"\\server\share\store.db"))
+
+    def test_local_path_is_not_remote(self):
+        self.assertFalse(db_manager.is_remote(os.path.join(tempfile.gettempdir(), "store.db")))
+
+    def test_journal_mode(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "store.db")
+            manager = db_manager.ConnectionManager()
+            self.assertEqual(manager.connect(path).execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            manager.close_all()
+            # The same file opened again from a network drive goes back to the rollback journal
+            with mock.patch("db_manager.is_remote", return_value=True):
+                conn = manager.connect(path)
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+            manager.set_durability("throughput")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 2)  # FULL
+            manager.close_all()
+
+
+class RepairTest(unittest.TestCase):
+    def test_connect_restores_triggers_dropped_by_an_interrupted_import(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "store.db")
+            manager = db_manager.ConnectionManager()
+            conn = manager.connect(path)
+            self.assertEqual(migrations.missing_derived_triggers(conn.cursor()), [])
+            table_import.suspend_triggers(conn, "customers")
+            # The import dies here: rows go in with the triggers still dropped
+            with conn:
+                conn.execute("INSERT INTO customers (name, total_owed, total_paid, remaining_debt) VALUES ('Ama', 50, 20, 30)")
+            manager.close_all()
+
+            conn = manager.connect(path)
+            self.assertEqual(migrations.missing_derived_triggers(conn.cursor()), [])
+            self.assertEqual(conn.execute("SELECT sales, remaining_debt FROM customer_totals WHERE name = 'Ama'").fetchone(), (1, 30))
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM customers_fts WHERE customers_fts MATCH '\"Ama\"'").fetchone()[0], 1)
+            manager.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
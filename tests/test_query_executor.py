@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from PyQt5.QtCore import QCoreApplication
+
+import query_executor
+
+
+def make_database(folder, name):
+    path = os.path.join(folder, name)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(1000)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+class CloseReadersTest(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.folder = tempfile.TemporaryDirectory()
+        self.executor = query_executor.QueryExecutor()
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.executor.close_readers()
+        self.folder.cleanup()
+
+    def test_does_not_wait_for_queries_on_other_files(self):
+        first = make_database(self.folder.name, "first.db")
+        second = make_database(self.folder.name, "second.db")
+        started, release = threading.Event(), threading.Event()
+
+        def slow(conn):
+            started.set()
+            release.wait(5)
+            return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+        self.executor.submit(second, slow, lambda result: None)
+        self.assertTrue(started.wait(5))
+        begun = time.perf_counter()
+        self.executor.close_readers(first)
+        self.assertLess(time.perf_counter() - begun, 1)
+        release.set()
+
+    def test_interrupts_and_waits_for_queries_on_the_closed_file(self):
+        path = make_database(self.folder.name, "store.db")
+        started = threading.Event()
+
+        def endless(conn):
+            started.set()
+            return conn.execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n").fetchone()
+
+        request = self.executor.submit(path, endless, lambda result: None, channel=self)
+        self.assertTrue(started.wait(5))
+        self.executor.close_readers(path)
+        self.assertTrue(request.cancelled)
+        self.assertTrue(request.idle.is_set())
+        self.assertEqual(self.executor.readers, {})
+
+    def test_cancel_after_the_job_does_not_interrupt_the_next_one(self):
+        path = make_database(self.folder.name, "store.db")
+        first = self.executor.submit(path, lambda conn: conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], lambda result: None)
+        self.executor.pool.waitForDone()
+        self.assertTrue(first.idle.is_set())
+        first.cancel()  # late: the connection has moved on
+        second = self.executor.submit(path, lambda conn: conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], lambda result: None)
+        self.executor.pool.waitForDone()
+        self.assertFalse(second.cancelled)
+
+
+if __name__ == "__main__":
+    unittest.main()